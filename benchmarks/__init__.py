@@ -0,0 +1,8 @@
+"""
+PixelCraft Benchmark Package.
+
+This package contains offline performance benchmarks for the PixelCraft
+hot paths: filters, similarity, image I/O and batch processing. Run it with
+``python -m benchmarks run`` and compare two result files with
+``python -m benchmarks compare``.
+"""
@@ -0,0 +1,125 @@
+"""
+Command line interface for the PixelCraft benchmarks.
+
+Usage:
+    python -m benchmarks run [--sizes 0.2 2 24 100] [--repeat 5] [--output FILE]
+    python -m benchmarks run --save-baseline
+    python -m benchmarks compare [BASELINE] CURRENT [--threshold 0.10]
+    python -m benchmarks concurrency [--sizes 0.2 2 24 100] [--cpus N]
+"""
+
+import sys
+import argparse
+
+from .suite import (
+    DEFAULT_SIZES, BASELINE_PATH, run_suite, save_results, load_results, compare_results,
+    color_overhead
+)
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="PixelCraft performance benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite")
+    run_parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES,
+                            help="Image sizes in megapixels")
+    run_parser.add_argument("--repeat", type=int, default=5,
+                            help="Timed runs per benchmark")
+    run_parser.add_argument("--filter", dest="pattern",
+                            help="Only run benchmarks whose name contains this text")
+    run_parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    run_parser.add_argument("--save-baseline", action="store_true",
+                            help=f"Write results to {BASELINE_PATH}")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("files", nargs="+", metavar="FILE",
+                                help="[BASELINE] CURRENT result files")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="Relative slowdown reported as a regression")
+
+    concurrency_parser = subparsers.add_parser(
+        "concurrency", help="Measure intra-image and inter-image parallelism per image size"
+    )
+    concurrency_parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES,
+                                    help="Image sizes in megapixels")
+    concurrency_parser.add_argument("--cpus", type=int, help="CPUs to use (default: all)")
+
+    return parser.parse_args(argv)
+
+
+def run_command(args):
+    """Run the suite and write the results."""
+    results = run_suite(args.sizes, args.repeat, args.pattern)
+
+    overhead = color_overhead(results)
+    if overhead:
+        print("\nColor time relative to grayscale")
+        for name, ratio in overhead.items():
+            print(f"{name:<32} {ratio:10.2f}x")
+
+    if args.output:
+        save_results(results, args.output)
+        print(f"Results saved to {args.output}")
+    if args.save_baseline:
+        save_results(results, BASELINE_PATH)
+        print(f"Baseline saved to {BASELINE_PATH}")
+    return 0
+
+
+def compare_command(args):
+    """Compare two result files; return 1 if any benchmark regressed."""
+    if len(args.files) > 2:
+        print("Expected at most two result files", file=sys.stderr)
+        return 2
+
+    baseline_path = args.files[0] if len(args.files) == 2 else BASELINE_PATH
+    current = load_results(args.files[-1])
+    comparison = compare_results(load_results(baseline_path), current, args.threshold)
+
+    regressions = 0
+    print(f"{'Benchmark':<32} {'Baseline':>12} {'Current':>12} {'Change':>9}")
+    for name, base_median, median, ratio, regressed in comparison:
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{name:<32} {base_median * 1000:10.2f}ms {median * 1000:10.2f}ms "
+              f"{(ratio - 1) * 100:+8.1f}%{marker}")
+        regressions += regressed
+
+    if regressions:
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+        return 1
+
+    print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def concurrency_command(args):
+    """Print the throughput of each concurrency mode and the mode auto picks."""
+    from src.batch.concurrency import CALIBRATION_MAX_MEGAPIXELS, cpu_count, measure
+
+    cpus = args.cpus or cpu_count()
+    print(f"Images per second on {cpus} CPU(s); sizes above {CALIBRATION_MAX_MEGAPIXELS} MP "
+          f"are measured at {CALIBRATION_MAX_MEGAPIXELS} MP")
+    print(f"{'Size':>10} {'intra-image':>12} {'inter-image':>12}  Best")
+    for megapixels in args.sizes:
+        throughput = measure(megapixels, cpus)
+        best = max(throughput, key=throughput.get)
+        print(f"{megapixels:8g}MP {throughput['intra-image']:12.2f} "
+              f"{throughput['inter-image']:12.2f}  {best}")
+    return 0
+
+
+def main(argv=None):
+    """Main entry point."""
+    args = parse_arguments(argv)
+    if args.command == "run":
+        return run_command(args)
+    if args.command == "concurrency":
+        return concurrency_command(args)
+    return compare_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+"""
+Benchmark suite for PixelCraft.
+
+This module generates synthetic test images, times the PixelCraft hot paths
+on them and compares result files to detect performance regressions.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+import cv2
+
+# Allow running from a source checkout without installing the package
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.core.filters import ImageFilters
+from src.core.similarity import calculate_similarity
+from src.utils.image_io import ImageIO
+from src.batch.engine import BatchEngine
+
+# Image sizes in megapixels
+DEFAULT_SIZES = [0.2, 2, 24, 100]
+
+# Default location of the baseline; timings are machine-specific, so it is
+# recorded locally with --save-baseline and ignored by git
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def synthetic_image(megapixels, seed=0, color=False):
+    """
+    Generate a deterministic 4:3 test image.
+
+    The image is a smooth gradient with added noise, which compresses about
+    as well as a typical photograph.
+
+    Args:
+        megapixels (float): Image size in megapixels
+        seed (int, optional): Random seed for the noise. Defaults to 0.
+        color (bool, optional): Generate a BGR image with a different gradient
+            per channel. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Grayscale or BGR uint8 image
+    """
+    pixels = megapixels * 1e6
+    width = max(1, int(round(math.sqrt(pixels * 4 / 3))))
+    height = max(1, int(round(pixels / width)))
+
+    rng = np.random.default_rng(seed)
+    x_ramp = np.linspace(0, 115, width).astype(np.uint8)
+    y_ramp = np.linspace(0, 115, height).astype(np.uint8)
+
+    image = rng.integers(0, 25, (height, width), dtype=np.uint8)
+    image += x_ramp[np.newaxis, :]
+    image += y_ramp[:, np.newaxis]
+    if not color:
+        return image
+
+    # Blue runs against the gray gradient, red follows it at an offset
+    return np.dstack([255 - image, image, image // 2 + 100])
+
+
+def size_label(megapixels):
+    """Format a size for benchmark names, e.g. ``0.2MP`` or ``24MP``."""
+    return f"{megapixels:g}MP"
+
+
+def time_call(function, repeat):
+    """
+    Time a function.
+
+    Args:
+        function (callable): Function to call without arguments
+        repeat (int): Number of timed calls
+
+    Returns:
+        list: Duration of each call in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def benchmark_cases(image, megapixels, work_dir):
+    """
+    Build the benchmarks for one image size.
+
+    Args:
+        image (numpy.ndarray): Synthetic image
+        megapixels (float): Size of the image in megapixels
+        work_dir (str): Scratch directory for files
+
+    Returns:
+        list: ``(name, function, megapixels)`` tuples, where ``megapixels`` is
+        the amount of image data processed per call
+    """
+    label = size_label(megapixels)
+    cases = []
+
+    # Filters
+    for filter_name in ImageFilters.FILTERS:
+        cases.append((f"filters.{filter_name}@{label}",
+                      lambda name=filter_name: ImageFilters.apply_filter(image, name),
+                      megapixels))
+
+    # Similarity
+    processed = ImageFilters.average_filter(image)
+    cases.append((f"similarity@{label}",
+                  lambda: calculate_similarity(processed, image, 16),
+                  megapixels))
+
+    # Image I/O
+    for ext in (".png", ".jpg"):
+        path = os.path.join(work_dir, f"io_{label}{ext}")
+        ImageIO.save_image(image, path)
+        fmt = ext.lstrip(".")
+        cases.append((f"io.save_{fmt}@{label}",
+                      lambda path=path: ImageIO.save_image(image, path),
+                      megapixels))
+        cases.append((f"io.read_{fmt}@{label}",
+                      lambda path=path: ImageIO.read_image(path),
+                      megapixels))
+
+    # End-to-end batch over enough images to smooth out per-image noise
+    count = max(1, min(32, int(20 / megapixels)))
+    input_dir = os.path.join(work_dir, f"batch_in_{label}")
+    output_dir = os.path.join(work_dir, f"batch_out_{label}")
+    os.makedirs(input_dir, exist_ok=True)
+    source = os.path.join(work_dir, f"io_{label}.jpg")
+    paths = []
+    for index in range(count):
+        path = os.path.join(input_dir, f"{index}.jpg")
+        with open(source, "rb") as src, open(path, "wb") as dst:
+            dst.write(src.read())
+        paths.append(path)
+
+    def run_batch():
+        for result in BatchEngine("average", output_dir).run(paths):
+            if not result.success:
+                raise RuntimeError(result.error)
+
+    cases.append((f"batch.average@{label}", run_batch, megapixels * count))
+    return cases
+
+
+def color_cases(image, megapixels, work_dir):
+    """
+    Build the color benchmarks for one image size.
+
+    The names mirror the grayscale benchmarks with a ``color.`` prefix, so
+    ``color_overhead`` can relate the two. Throughput is in pixels, not
+    channel values, so a color benchmark at a third of the grayscale
+    throughput processes channel values at the same rate.
+
+    Args:
+        image (numpy.ndarray): Synthetic BGR image
+        megapixels (float): Size of the image in megapixels
+        work_dir (str): Scratch directory for files
+
+    Returns:
+        list: ``(name, function, megapixels)`` tuples
+    """
+    label = size_label(megapixels)
+    cases = []
+
+    for filter_name in ImageFilters.FILTERS:
+        cases.append((f"color.filters.{filter_name}@{label}",
+                      lambda name=filter_name: ImageFilters.apply_filter(image, name),
+                      megapixels))
+    cases.append((f"color.filters.sharpen_luminance@{label}",
+                  lambda: ImageFilters.apply_filter(image, "sharpen", luminance=True),
+                  megapixels))
+
+    processed = ImageFilters.average_filter(image)
+    cases.append((f"color.similarity@{label}",
+                  lambda: calculate_similarity(processed, image, 16),
+                  megapixels))
+
+    for ext in (".png", ".jpg"):
+        path = os.path.join(work_dir, f"color_{label}{ext}")
+        ImageIO.save_image(image, path)
+        fmt = ext.lstrip(".")
+        cases.append((f"color.io.save_{fmt}@{label}",
+                      lambda path=path: ImageIO.save_image(image, path),
+                      megapixels))
+        cases.append((f"color.io.read_{fmt}@{label}",
+                      lambda path=path: ImageIO.read_image(path, grayscale=False),
+                      megapixels))
+
+    return cases
+
+
+def color_overhead(results):
+    """
+    Relate color benchmarks to their grayscale counterparts.
+
+    Args:
+        results (dict): Results from ``run_suite``
+
+    Returns:
+        dict: Benchmark name mapped to the ratio of color to grayscale median time
+    """
+    overhead = {}
+    measured = results["results"]
+    for name, result in sorted(measured.items()):
+        gray_name = name[len("color."):]
+        if name.startswith("color.") and gray_name in measured:
+            overhead[gray_name] = result["median"] / measured[gray_name]["median"]
+    return overhead
+
+
+def startup_cases():
+    """
+    Build the startup benchmarks, which time fresh interpreters.
+
+    Returns:
+        list: ``(name, function, megapixels)`` tuples with ``megapixels`` None
+    """
+    def run_python(*args):
+        subprocess.run([sys.executable, *args], cwd=ROOT_DIR, check=True, capture_output=True)
+
+    return [
+        ("startup.help", lambda: run_python("main.py", "--help"), None),
+        ("startup.batch_import", lambda: run_python("-c", "import src.batch.engine"), None),
+    ]
+
+
+def run_case(name, function, megapixels, repeat, log):
+    """
+    Time one benchmark.
+
+    Args:
+        name (str): Benchmark name
+        function (callable): Function to time
+        megapixels (float): Image data processed per call, or None
+        repeat (int): Number of timed calls
+        log (callable): Progress output function
+
+    Returns:
+        dict: Median and minimum duration, repeat count and throughput
+    """
+    # One untimed call warms up caches and lazy initialization
+    function()
+    durations = time_call(function, repeat)
+    median = statistics.median(durations)
+    throughput = megapixels / median if megapixels and median > 0 else None
+
+    log(f"{name:<32} {median * 1000:10.2f} ms" +
+        (f"  {throughput:10.1f} MP/s" if throughput else ""))
+    return {
+        "median": median,
+        "min": min(durations),
+        "repeat": repeat,
+        "megapixels": megapixels,
+        "mp_per_s": throughput,
+    }
+
+
+def environment():
+    """
+    Describe the machine and library versions the benchmarks ran with.
+
+    Returns:
+        dict: Environment metadata
+    """
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+def run_suite(sizes=None, repeat=5, pattern=None, log=print):
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes (list, optional): Image sizes in megapixels. Defaults to DEFAULT_SIZES.
+        repeat (int, optional): Timed calls per benchmark; reduced automatically
+            for images larger than 20 MP. Defaults to 5.
+        pattern (str, optional): Only run benchmarks whose name contains this text.
+            Defaults to None.
+        log (callable, optional): Progress output function. Defaults to print.
+
+    Returns:
+        dict: Results with ``environment`` and ``results`` sections
+    """
+    results = {}
+
+    for name, function, processed_mp in startup_cases():
+        if not pattern or pattern in name:
+            results[name] = run_case(name, function, processed_mp, repeat, log)
+
+    with tempfile.TemporaryDirectory(prefix="pixelcraft-bench-") as work_dir:
+        for megapixels in sizes or DEFAULT_SIZES:
+            image = synthetic_image(megapixels)
+            runs = max(1, min(repeat, int(round(repeat * 20 / megapixels))))
+
+            for name, function, processed_mp in benchmark_cases(image, megapixels, work_dir):
+                if not pattern or pattern in name:
+                    results[name] = run_case(name, function, processed_mp, runs, log)
+
+            color_image = synthetic_image(megapixels, color=True)
+            for name, function, processed_mp in color_cases(color_image, megapixels, work_dir):
+                if not pattern or pattern in name:
+                    results[name] = run_case(name, function, processed_mp, runs, log)
+            del color_image
+
+    return {"environment": environment(), "results": results}
+
+
+def save_results(results, path):
+    """
+    Write benchmark results to a JSON file.
+
+    Args:
+        results (dict): Results from ``run_suite``
+        path (str): Output file path
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=4)
+
+
+def load_results(path):
+    """
+    Read benchmark results from a JSON file.
+
+    Args:
+        path (str): Results file path
+
+    Returns:
+        dict: Benchmark results
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare two benchmark runs.
+
+    Args:
+        baseline (dict): Baseline results
+        current (dict): Results to check
+        threshold (float, optional): Allowed relative slowdown of the median
+            before a benchmark counts as a regression. Defaults to 0.10.
+
+    Returns:
+        list: ``(name, baseline_median, current_median, ratio, regressed)``
+        tuples for the benchmarks present in both runs, sorted by name
+    """
+    comparison = []
+    base_results = baseline["results"]
+    for name, result in sorted(current["results"].items()):
+        if name not in base_results:
+            continue
+        base_median = base_results[name]["median"]
+        ratio = result["median"] / base_median if base_median > 0 else float("inf")
+        comparison.append((name, base_median, result["median"], ratio, ratio > 1 + threshold))
+    return comparison
@@ -19,14 +19,90 @@ def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="PixelCraft - Image Processing Application")
     
-    parser.add_argument("--image", type=str, help="Path to the image to open on startup")
+    parser.add_argument("--image", type=str,
+                       help="Path to the image to open on startup; in batch mode, an image, a directory, "
+                            "or a .zip or .tar(.gz/.bz2/.xz) archive to read the images from")
     parser.add_argument("--batch", action="store_true", help="Run in batch processing mode")
+    parser.add_argument("--serve", action="store_true",
+                       help="Run as a headless service accepting batch jobs over HTTP")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address the service listens on")
+    parser.add_argument("--port", type=int, default=8765, help="Port the service listens on")
+    parser.add_argument("--socket", type=str, help="Serve on this Unix socket instead of TCP")
+    parser.add_argument("--compare", nargs=2, metavar=("DIR_A", "DIR_B"),
+                       help="Compare the images of two folders matched by relative path, e.g. outputs "
+                            "against a golden set; exits with 1 if any pair is under --threshold")
+    parser.add_argument("--similarity-matrix", nargs=2, metavar=("DIR", "MATRIX"),
+                       help="Write the similarity of every pair of images in a folder to a .npy "
+                            "matrix, for duplicate analysis; the image of each row is listed in a "
+                            ".txt file next to it")
+    parser.add_argument("--threshold", type=int, default=100,
+                       help="With --compare, the lowest similarity in percent that passes; with "
+                            "--similarity-matrix, the similarity counted as a duplicate (default: 100)")
     parser.add_argument("--filter", type=str, choices=["average", "negative", "sharpen", "laplacian", "logarithm"],
                        help="Filter to apply in batch mode")
     parser.add_argument("--sensitivity", type=int, default=16, 
                        help="Sensitivity value for comparison (1-255)")
-    parser.add_argument("--output", type=str, help="Output directory for batch processing")
-    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument("--output", type=str,
+                       help="Output directory for batch processing, or a .zip or .tar(.gz/.bz2/.xz) "
+                            "archive to write the processed images into")
+    parser.add_argument("--color", action="store_true",
+                       help="Process images in color instead of grayscale")
+    parser.add_argument("--any-depth", action="store_true",
+                       help="Process 16-bit and floating point images at their bit depth")
+    parser.add_argument("--resize", type=str,
+                       help="Resize opened images: WIDTHxHEIGHT, a single length, or 'none' for "
+                            "full resolution (default: processing.default_resize in the config, 450x450)")
+    parser.add_argument("--resize-mode", choices=["stretch", "fit", "fill", "max"],
+                       help="How to resize: stretch to the size, fit within it, fill and crop it, "
+                            "or scale the longest side to it (default: stretch)")
+    parser.add_argument("--interpolation", choices=["auto", "nearest", "linear", "cubic", "area", "lanczos"],
+                       help="Resize interpolation; auto uses area when shrinking (default: auto)")
+    parser.add_argument("--watch", action="store_true",
+                       help="In batch mode, keep watching the --image directory and process new or "
+                            "changed images as they arrive, until interrupted")
+    parser.add_argument("--frames", action="store_true",
+                       help="In batch mode, process every page of multi-page TIFFs and every frame "
+                            "of animated images, writing multi-page TIFFs")
+    parser.add_argument("--luminance", action="store_true",
+                       help="In batch mode with --color, filter only the luminance and keep the colors")
+    parser.add_argument("--workers", type=int,
+                       help="Number of worker processes (default: chosen by --concurrency in batch mode, "
+                            "all CPUs in service mode)")
+    parser.add_argument("--concurrency", choices=["auto", "intra-image", "inter-image"],
+                       help="Split CPUs between few workers with many OpenCV threads each (intra-image), "
+                            "single-threaded workers on every CPU (inter-image), or whichever measures "
+                            "faster for the image size (auto; default: processing.concurrency in the config)")
+    parser.add_argument("--order", choices=["largest-first", "input"],
+                       help="Batch processing order; largest-first reads all image headers first so "
+                            "giant images do not run last (default: largest-first, input for archives)")
+    parser.add_argument("--memory-budget", type=float, metavar="MB",
+                       help="Memory the images in flight may use together in batch mode; larger images "
+                            "wait until they fit (default: processing.memory_budget_mb in the config, "
+                            "no limit)")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                       help="Seconds an image may take in batch mode before its worker process is "
+                            "ended and the image quarantined; images then always run in worker "
+                            "processes, even with --workers 1. 0 for no limit (default: "
+                            "processing.image_timeout in the config, no limit)")
+    parser.add_argument("--retries", type=int,
+                       help="Retries after transient I/O errors in batch mode (default: "
+                            "processing.io_retries in the config, 2)")
+    parser.add_argument("--quarantine", type=str,
+                       help="Write the images that crashed or hung a worker process in batch mode "
+                            "to this file, one per line with the reason after a tab")
+    parser.add_argument("--report", type=str,
+                       help="Write a JSON report with similarity and image statistics in batch mode; "
+                            "with --compare, stream a JSON line per pair and a summary line")
+    parser.add_argument("--stats", type=str,
+                       help="Write per-stage timings and counters as JSON at the end of batch mode")
+    parser.add_argument("--profile", type=str,
+                       help="Profile batch mode, including worker processes, into this pstats file")
+    parser.add_argument("--profile-top", type=int, default=25,
+                       help="Number of functions in the profile summary")
+    parser.add_argument("--profile-memory", action="store_true",
+                       help="With --profile, also record the biggest allocations per stage")
+    parser.add_argument("--debug", action="store_true",
+                       help="Enable debug logging and record timings for the GUI debug panel")
     
     return parser.parse_args()
 
@@ -44,6 +120,31 @@ def setup_environment():
     # Set up environment variables if needed
     return True
 
+def parse_size(text):
+    """Parse a --resize value: WIDTHxHEIGHT, a single length, or 'none'."""
+    if text.lower() == "none":
+        return None
+    try:
+        parts = [int(part) for part in text.lower().split("x")]
+    except ValueError:
+        parts = []
+    if len(parts) not in (1, 2) or min(parts) <= 0:
+        raise ValueError(f"Invalid --resize value: {text}")
+    return parts[0] if len(parts) == 1 else tuple(parts)
+
+def resize_options(args):
+    """Get the resize options from the configuration, overridden by the command line."""
+    from src.utils.config import get_config
+    
+    options = get_config().resize_options()
+    if args.resize is not None:
+        options["resize"] = parse_size(args.resize)
+    if args.resize_mode:
+        options["resize_mode"] = args.resize_mode
+    if args.interpolation:
+        options["interpolation"] = args.interpolation
+    return options
+
 def start_gui(args):
     """Start the graphical user interface."""
     try:
@@ -51,8 +152,15 @@ def start_gui(args):
         from PyQt5.QtWidgets import QApplication
         from src.gui.main_window import MainWindow
         
+        if args.debug:
+            from src.utils.instrumentation import instrumentation
+            instrumentation.enable()
+        
         app = QApplication(sys.argv)
         window = MainWindow()
+        window.setColorMode(args.color)
+        window.setAnyDepth(args.any_depth)
+        window.resize_options = resize_options(args)
         window.show()
         
         # If an image was provided, open it
@@ -75,58 +183,258 @@ def run_batch_mode(args):
         logger.error("Batch mode requires an output directory to be specified with --output")
         return 1
     
+    if not args.image:
+        logger.error("Batch mode requires an input image or directory to be specified with --image")
+        return 1
+    
     # Import necessary modules
-    from src.core.filters import ImageFilters
-    from src.utils.image_io import ImageIO
-    import os
-    from pathlib import Path
-    import glob
+    from src.batch.archive import ArchiveWriter, is_archive, iter_archive
+    from src.batch.engine import BatchEngine, find_images
+    from src.utils.config import get_config
+    from src.utils.instrumentation import instrumentation
+    import json
+    from contextlib import nullcontext
+    
+    archive_input = is_archive(args.image)
+    archive_output = is_archive(args.output)
+    
+    if args.watch and not Path(args.image).is_dir():
+        logger.error("Watch mode requires an input directory")
+        return 1
+    
+    if args.watch and (archive_output or Path(args.output).resolve() == Path(args.image).resolve()):
+        logger.error("Watch mode requires an output directory outside the watched directory")
+        return 1
+    
+    if args.frames and archive_output:
+        logger.error("Frame mode requires an output directory, not an archive")
+        return 1
     
     # Setup
-    filters = ImageFilters()
-    output_dir = Path(args.output)
-    output_dir.mkdir(exist_ok=True)
+    profiler = None
+    if args.profile:
+        from src.batch.profiling import BatchProfiler
+        profiler = BatchProfiler(args.profile, top=args.profile_top,
+                                 trace_memory=args.profile_memory)
     
-    # Find all images in the input directory or use the specified image
-    if os.path.isdir(args.image):
-        image_paths = glob.glob(os.path.join(args.image, "*.jpg")) + \
-                     glob.glob(os.path.join(args.image, "*.jpeg")) + \
-                     glob.glob(os.path.join(args.image, "*.png"))
-    else:
-        image_paths = [args.image]
+    try:
+        engine = BatchEngine(
+            args.filter.lower(), None if archive_output else args.output, workers=args.workers,
+            concurrency=args.concurrency or get_config().get("processing.concurrency", "auto"),
+            params={"luminance": True} if args.luminance else None, color=args.color,
+            any_depth=args.any_depth, frames=args.frames,
+            # Largest-first would read a whole archive into memory before starting
+            order=args.order or ("input" if archive_input else "largest-first"),
+            memory_budget=(int(args.memory_budget * 2 ** 20) if args.memory_budget
+                           else get_config().memory_budget()),
+            timeout=(args.timeout if args.timeout is not None
+                     else get_config().get("processing.image_timeout")) or None,
+            retries=(args.retries if args.retries is not None
+                     else get_config().get("processing.io_retries", 2)),
+            sensitivity=args.sensitivity if args.report else None,
+            profile_dir=profiler.work_dir if profiler else None,
+            trace_memory=args.profile_memory,
+            **resize_options(args)
+        )
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    
+    watcher = None
+    if args.watch:
+        from src.batch.watch import FolderWatcher, is_stale
+        # Watch before listing, so images arriving in between are not missed
+        watcher = FolderWatcher([args.image])
+    
+    # Find all images in the input directory or archive, or use the specified image
+    try:
+        image_paths = iter_archive(args.image) if archive_input else find_images(args.image)
+    except (OSError, ValueError) as e:
+        logger.error(f"Cannot read {args.image}: {e}")
+        if watcher:
+            watcher.close()
+        return 1
+    if watcher:
+        # Listed images are reported by the watcher only if they change later
+        for path in image_paths:
+            watcher.mark_reported(path)
+        # Outputs already up to date are kept from an earlier run
+        image_paths = [path for path in image_paths if is_stale(path, engine.output_path_for(path))]
+    
+    if args.stats:
+        instrumentation.enable()
+    
+    # Per-image entries for the optional report
+    report = []
+    
+    writer = ArchiveWriter(args.output) if archive_output else None
+    
+    def handle(result):
+        """Log a result and keep its report entry."""
+        if result.success:
+            if writer:
+                writer.write(engine.output_name_for(result.input_path, archive_input),
+                             result.output_data)
+                result.output_data = None
+            if result.report:
+                report.append(result.report)
+            frames = f" ({result.frames} frames)" if result.frames is not None else ""
+            progress = f"[{engine.progress:4.0%}] " if engine.progress is not None else ""
+            logger.info(f"{progress}Processed {Path(result.input_path).name}{frames} "
+                        f"with {engine.filter_name} filter")
+        else:
+            logger.error(f"Error processing {result.input_path}: {result.error}")
     
     # Process each image
-    for img_path in image_paths:
+    with profiler or nullcontext(), instrumentation.timer("batch.total"), writer or nullcontext():
+        if not args.watch:
+            for result in engine.run(image_paths):
+                handle(result)
+        else:
+            # Keep workers warm between arrivals
+            engine.start_pool()
+            try:
+                for result in engine.run(image_paths):
+                    handle(result)
+                logger.info(f"Watching {args.image} "
+                            f"({'inotify' if watcher.uses_inotify else 'polling'}), "
+                            "press Ctrl+C to stop")
+                while True:
+                    for result in engine.run(watcher.wait()):
+                        handle(result)
+            except KeyboardInterrupt:
+                logger.info("Stopped watching")
+            finally:
+                watcher.close()
+                if engine.executor is not None:
+                    engine.executor.shutdown()
+    
+    if writer:
+        logger.info(f"{writer.count} images written to {args.output}")
+    
+    # Write the report
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"filter": args.filter, "sensitivity": args.sensitivity, "images": report}, f, indent=4)
+        logger.info(f"Report written to {args.report}")
+    
+    # Write the quarantined images
+    if engine.quarantined:
+        logger.warning(f"{len(engine.quarantined)} images crashed or hung a worker process")
+    if args.quarantine:
+        with open(args.quarantine, "w") as f:
+            for input_path, reason in engine.quarantined:
+                f.write(f"{input_path}\t{reason}\n")
+        logger.info(f"Quarantine list written to {args.quarantine}")
+    
+    # Write the instrumentation summary
+    if args.stats:
+        instrumentation.save(args.stats)
+        logger.info(f"Statistics written to {args.stats}")
+    
+    if engine.peak_rss:
+        logger.info(f"Peak memory {engine.peak_rss / 2 ** 20:.0f} MiB in the largest process"
+                    + (f", budget {engine.memory_budget / 2 ** 20:.0f} MiB" if engine.memory_budget else ""))
+    
+    if profiler:
+        logger.info(f"Profile written to {profiler.output_path}, summary in {profiler.summary_path}")
+    
+    return 0
+
+def run_compare_mode(args):
+    """Run the application in folder comparison mode."""
+    dir_a, dir_b = args.compare
+    for directory in (dir_a, dir_b):
+        if not Path(directory).is_dir():
+            logger.error(f"Not a directory: {directory}")
+            return 1
+    
+    import json
+    import time
+    from contextlib import nullcontext
+    from src.batch.compare import ComparisonSummary, compare_folders
+    
+    summary = ComparisonSummary()
+    start = time.perf_counter()
+    with open(args.report, "w") if args.report else nullcontext() as report:
+        for result in compare_folders(dir_a, dir_b, sensitivity=args.sensitivity,
+                                      threshold=args.threshold, color=args.color,
+                                      any_depth=args.any_depth, workers=args.workers):
+            summary.add(result)
+            if report:
+                report.write(json.dumps(result) + "\n")
+            if not result["passed"]:
+                reason = result["error"] or f"similarity {result['similarity']}%"
+                logger.error(f"{result['path']}: {reason}")
+        
+        totals = dict(summary.as_dict(), elapsed=time.perf_counter() - start)
+        if report:
+            report.write(json.dumps({"summary": totals}) + "\n")
+    
+    logger.info(f"Compared {summary.total} images in {totals['elapsed']:.2f} s: "
+                f"{summary.passed} passed, {summary.failed} failed ({summary.missing} missing)")
+    if args.report:
+        logger.info(f"Report written to {args.report}")
+    return 1 if summary.failed else 0
+
+def run_matrix_mode(args):
+    """Run the application in similarity matrix mode."""
+    import os
+    import tempfile
+    import time
+    from src.batch.engine import find_images
+    from src.batch.matrix import count_pairs, load_stack, similarity_matrix
+    
+    directory, matrix_path = args.similarity_matrix
+    if not Path(directory).is_dir():
+        logger.error(f"Not a directory: {directory}")
+        return 1
+    paths = find_images(directory)
+    if not paths:
+        logger.error(f"No images found in {directory}")
+        return 1
+    
+    start = time.perf_counter()
+    matrix_dir = os.path.dirname(os.path.abspath(matrix_path))
+    descriptor, stack_path = tempfile.mkstemp(suffix=".npy", dir=matrix_dir)
+    os.close(descriptor)
+    try:
         try:
-            # Load image
-            image = ImageIO.read_image(img_path)
-            
-            # Apply filter
-            filter_name = args.filter.lower()
-            if filter_name == "average":
-                processed = filters.average_filter(image)
-            elif filter_name == "sharpen":
-                processed = filters.sharpen_filter(image)
-            elif filter_name == "negative":
-                processed = filters.negative_filter(image)
-            elif filter_name == "laplacian":
-                processed = filters.laplacian_filter(image)
-            elif filter_name == "logarithm":
-                processed = filters.logarithm_filter(image)
-            else:
-                logger.warning(f"Unknown filter: {filter_name}, skipping {img_path}")
-                continue
-            
-            # Save processed image
-            filename = Path(img_path).name
-            output_path = output_dir / f"{filter_name}_{filename}"
-            ImageIO.save_image(processed, str(output_path))
-            
-            logger.info(f"Processed {filename} with {filter_name} filter")
-            
-        except Exception as e:
-            logger.error(f"Error processing {img_path}: {str(e)}")
+            stack = load_stack(paths, stack_path, color=args.color, any_depth=args.any_depth,
+                               workers=args.workers, **resize_options(args))
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+        logger.info(f"Loaded {len(paths)} images of {stack.shape[1:]} {stack.dtype} "
+                    f"in {time.perf_counter() - start:.2f} s")
+        del stack
+        
+        reported = 0
+        for done in similarity_matrix(stack_path, matrix_path, sensitivity=args.sensitivity,
+                                      workers=args.workers):
+            if done * 10 >= reported + 1:
+                reported = int(done * 10)
+                logger.info(f"Similarity matrix {reported * 10}% done")
+    finally:
+        os.remove(stack_path)
+    
+    names_path = os.path.splitext(matrix_path)[0] + ".txt"
+    with open(names_path, "w") as names:
+        names.writelines(os.path.basename(path) + "\n" for path in paths)
     
+    duplicates = count_pairs(matrix_path, args.threshold)
+    logger.info(f"Compared {len(paths) * (len(paths) - 1) // 2} pairs in "
+                f"{time.perf_counter() - start:.2f} s: {duplicates} at least {args.threshold}% similar")
+    logger.info(f"Matrix written to {matrix_path}, row images listed in {names_path}")
+    return 0
+
+def run_service_mode(args):
+    """Run the application as a headless batch service."""
+    import os
+    from src.service.server import run_service
+    
+    run_service(workers=args.workers or os.cpu_count() or 1,
+                host=args.host, port=args.port, socket_path=args.socket)
     return 0
 
 def main():
@@ -140,13 +448,26 @@ def main():
         
     logger.debug("Starting PixelCraft")
     
+    if args.resize is not None:
+        try:
+            parse_size(args.resize)
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+    
     # Set up environment
     if not setup_environment():
         logger.error("Failed to set up environment")
         return 1
     
     # Determine whether to run in GUI or batch mode
-    if args.batch:
+    if args.serve:
+        return run_service_mode(args)
+    elif args.compare:
+        return run_compare_mode(args)
+    elif args.similarity_matrix:
+        return run_matrix_mode(args)
+    elif args.batch:
         return run_batch_mode(args)
     else:
         return start_gui(args)
@@ -0,0 +1,11 @@
+# Export essential modules; they are imported on first use
+from ..utils.lazy import lazy_exports
+
+__all__ = ['BatchEngine', 'BatchResult', 'find_images', 'process_image']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BatchEngine': '.engine',
+    'BatchResult': '.engine',
+    'find_images': '.engine',
+    'process_image': '.engine',
+})
\ No newline at end of file
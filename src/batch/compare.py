@@ -0,0 +1,235 @@
+"""
+Folder comparison for PixelCraft regression checks.
+
+A new build's outputs are checked against a golden set by comparing the
+images of two folders that share a relative path. Pairs are compared on
+a pool of worker processes in chunks, and results stream back as they
+complete, so thousands of pairs are checked in seconds.
+"""
+
+import os
+
+import numpy as np
+
+from ..core.difference import absolute_difference
+from ..core.depth import value_range
+from ..core.similarity import similarity_from_difference
+from ..utils.image_io import ImageIO
+from .concurrency import plan
+from .engine import IMAGE_EXTENSIONS, create_pool
+
+# Most pairs sent to a worker process in one task
+MAX_CHUNK = 64
+
+
+def _relative_images(directory, extensions):
+    """Get the relative paths of the images under a directory."""
+    images = set()
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if os.path.splitext(name)[1].lower() in extensions:
+                images.add(os.path.relpath(os.path.join(root, name), directory))
+    return images
+
+
+def match_pairs(dir_a, dir_b, extensions=IMAGE_EXTENSIONS):
+    """
+    Match the images of two folders by relative path, subfolders included.
+
+    Args:
+        dir_a (str): First folder, e.g. the golden set
+        dir_b (str): Second folder, e.g. the outputs to check
+        extensions (tuple, optional): Lower-case file extensions to include.
+            Defaults to IMAGE_EXTENSIONS.
+
+    Returns:
+        tuple: ``(pairs, only_a, only_b)``: sorted relative paths present in
+        both folders, only in the first and only in the second
+    """
+    images_a = _relative_images(dir_a, extensions)
+    images_b = _relative_images(dir_b, extensions)
+    return sorted(images_a & images_b), sorted(images_a - images_b), sorted(images_b - images_a)
+
+
+def compare_pair(path_a, path_b, sensitivity=16, color=False, any_depth=False):
+    """
+    Compare two images pixel by pixel.
+
+    Args:
+        path_a (str): First image
+        path_b (str): Second image
+        sensitivity (int, optional): Sensitivity of the similarity, see
+            ``similarity_from_difference``. Defaults to 16.
+        color (bool, optional): Compare in color instead of grayscale.
+            Defaults to False.
+        any_depth (bool, optional): Compare 16-bit and floating point images
+            at their depth. Defaults to False.
+
+    Returns:
+        dict: ``similarity`` in percent, ``mean_difference`` and
+        ``max_difference`` as fractions of the intensity range, and
+        ``error``, set instead if the images cannot be read or differ in
+        size or depth
+    """
+    result = {"similarity": None, "mean_difference": None, "max_difference": None, "error": None}
+    try:
+        image_a = ImageIO.read_image(path_a, grayscale=not color, resize=None, any_depth=any_depth)
+        image_b = ImageIO.read_image(path_b, grayscale=not color, resize=None, any_depth=any_depth)
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+
+    if image_a.shape != image_b.shape or image_a.dtype != image_b.dtype:
+        result["error"] = (f"Images differ in size or depth: {image_a.shape} {image_a.dtype} "
+                           f"and {image_b.shape} {image_b.dtype}")
+        return result
+
+    difference = absolute_difference(image_a, image_b)
+    top = value_range(difference.dtype)
+    result["similarity"] = similarity_from_difference(difference, sensitivity)
+    result["mean_difference"] = float(np.mean(difference)) / top if difference.size else 0.0
+    result["max_difference"] = float(difference.max()) / top if difference.size else 0.0
+    return result
+
+
+def _compare_chunk(pairs, options):
+    """Compare ``(relative, path_a, path_b)`` pairs inside a worker process."""
+    return [dict(compare_pair(path_a, path_b, **options), path=relative)
+            for relative, path_a, path_b in pairs]
+
+
+def compare_folders(dir_a, dir_b, sensitivity=16, threshold=100, color=False, any_depth=False,
+                    workers=None, executor=None, extensions=IMAGE_EXTENSIONS):
+    """
+    Compare the images of two folders, yielding a result per relative path.
+
+    Images present in only one folder fail as missing. A pair fails if its
+    similarity is under ``threshold`` or it cannot be compared.
+
+    Args:
+        dir_a (str): First folder, e.g. the golden set
+        dir_b (str): Second folder, e.g. the outputs to check
+        sensitivity (int, optional): Sensitivity of the similarity. Defaults to 16.
+        threshold (int, optional): Lowest similarity in percent that passes.
+            Defaults to 100.
+        color (bool, optional): Compare in color. Defaults to False.
+        any_depth (bool, optional): Compare at the images' own depth.
+            Defaults to False.
+        workers (int, optional): Worker processes; 1 compares in the calling
+            thread. Defaults to None (one per CPU).
+        executor (concurrent.futures.Executor, optional): Existing pool to
+            run on; it is not shut down. Defaults to None.
+        extensions (tuple, optional): Lower-case file extensions to include.
+            Defaults to IMAGE_EXTENSIONS.
+
+    Yields:
+        dict: ``path`` relative to both folders, the metrics of
+        ``compare_pair`` and ``passed``; missing images instead have
+        ``error`` naming the folder they are missing from
+    """
+    pairs, only_a, only_b = match_pairs(dir_a, dir_b, extensions)
+    for relative in only_a:
+        yield {"path": relative, "error": f"Missing in {dir_b}", "passed": False}
+    for relative in only_b:
+        yield {"path": relative, "error": f"Missing in {dir_a}", "passed": False}
+
+    options = {"sensitivity": sensitivity, "color": color, "any_depth": any_depth}
+    tasks = [(relative, os.path.join(dir_a, relative), os.path.join(dir_b, relative))
+             for relative in pairs]
+
+    def finish(result):
+        result["passed"] = result["error"] is None and result["similarity"] >= threshold
+        return result
+
+    if executor is None:
+        workers = min(plan("inter-image", workers)[0], len(tasks))
+        if workers <= 1:
+            for task in tasks:
+                yield finish(_compare_chunk([task], options)[0])
+            return
+        with create_pool(workers, threads=1) as pool:
+            yield from (finish(result) for result in _compare_on_pool(pool, workers, tasks, options))
+        return
+
+    yield from (finish(result) for result in _compare_on_pool(executor, workers or 1, tasks, options))
+
+
+def _compare_on_pool(pool, workers, tasks, options):
+    """Compare pairs on a pool in chunks, yielding results as they complete."""
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    # Enough chunks to balance the workers, few enough to amortize round trips
+    size = max(1, min(MAX_CHUNK, len(tasks) // (workers * 4)))
+    chunks = iter([tasks[start:start + size] for start in range(0, len(tasks), size)])
+    pending = set()
+    while True:
+        while len(pending) < workers * 2:
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            pending.add(pool.submit(_compare_chunk, chunk, options))
+        if not pending:
+            return
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield from future.result()
+
+
+class ComparisonSummary:
+    """
+    Running totals of comparison results, kept without storing the results.
+
+    Attributes:
+        total (int): Results added
+        passed (int): Pairs that passed
+        missing (int): Images present in only one folder
+        min_similarity (int): Lowest similarity of the compared pairs, or None
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.passed = 0
+        self.missing = 0
+        self.min_similarity = None
+        self._similarity_sum = 0
+        self._compared = 0
+
+    def add(self, result):
+        """
+        Count a result.
+
+        Args:
+            result (dict): Result from ``compare_folders``
+        """
+        self.total += 1
+        self.passed += result["passed"]
+        if "similarity" not in result:
+            self.missing += 1
+        elif result["similarity"] is not None:
+            similarity = result["similarity"]
+            self._compared += 1
+            self._similarity_sum += similarity
+            if self.min_similarity is None or similarity < self.min_similarity:
+                self.min_similarity = similarity
+
+    @property
+    def failed(self):
+        """int: Results that did not pass."""
+        return self.total - self.passed
+
+    def as_dict(self):
+        """
+        Get the totals as a dictionary.
+
+        Returns:
+            dict: Counts of results, passed, failed and missing images, and the
+            lowest and mean similarity of the compared pairs
+        """
+        return {
+            "total": self.total,
+            "passed": self.passed,
+            "failed": self.failed,
+            "missing": self.missing,
+            "min_similarity": self.min_similarity,
+            "mean_similarity": self._similarity_sum / self._compared if self._compared else None,
+        }
@@ -0,0 +1,240 @@
+"""
+Concurrency policy for PixelCraft batch runs.
+
+OpenCV parallelizes filters and resizing across all CPUs by default. Inside
+a pool of worker processes that multiplies: 64 workers with 64 OpenCV
+threads each thrash the machine. This module splits the CPUs between
+worker processes and the threads inside each of them:
+
+- ``intra-image``: few workers, each using many OpenCV threads on one image
+- ``inter-image``: one worker per CPU, each single-threaded
+- ``auto``: whichever of the two measures faster for the image size
+
+This module is imported by worker processes before numpy and OpenCV, so
+keep its imports light.
+"""
+
+import os
+import json
+import math
+import time
+
+MODES = ("auto", "intra-image", "inter-image")
+
+# Environment variables limiting the thread pools of BLAS and OpenMP; they
+# only take effect in processes that load those libraries afterwards
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                    "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+# Calibration images are capped at this size; larger images behave alike
+CALIBRATION_MAX_MEGAPIXELS = 16
+
+# File calibration results are kept in across runs; None for calibration.json
+# in the configuration directory
+CALIBRATION_PATH = None
+
+# Best mode per calibrated size bucket, loaded or measured once per process
+_best_modes = {}
+
+
+def cpu_count():
+    """
+    Get the number of CPUs this process may run on.
+
+    Returns:
+        int: Number of usable CPUs
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def set_threads(threads):
+    """
+    Limit the threads OpenCV and BLAS libraries use in this process.
+
+    Args:
+        threads (int): Number of threads
+    """
+    for name in THREAD_VARIABLES:
+        os.environ[name] = str(threads)
+
+    import cv2
+    cv2.setNumThreads(threads)
+
+
+def init_worker(threads=None):
+    """
+    Initialize a batch worker process.
+
+    Leaves Ctrl+C handling to the parent, which shuts the pool down, and
+    limits the worker's threads.
+
+    Args:
+        threads (int, optional): Threads per worker; None keeps the defaults.
+            Defaults to None.
+    """
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if threads:
+        set_threads(threads)
+
+
+def measure(megapixels, cpus=None, repeat=2):
+    """
+    Measure the throughput of both modes on a synthetic image.
+
+    Each mode processes ``cpus`` images per round: ``intra-image`` one after
+    another with all OpenCV threads, ``inter-image`` all at once on
+    single-threaded OpenCV. The concurrent images run on threads, which
+    OpenCV releases the GIL for, so they compete for cores and memory
+    bandwidth like worker processes would.
+
+    Args:
+        megapixels (float): Image size; capped at CALIBRATION_MAX_MEGAPIXELS
+        cpus (int, optional): CPUs to use. Defaults to all usable CPUs.
+        repeat (int, optional): Rounds per mode; the fastest counts. Defaults to 2.
+
+    Returns:
+        dict: Images per second for each of "intra-image" and "inter-image"
+    """
+    import cv2
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+    from ..core.filters import ImageFilters
+
+    cpus = cpus or cpu_count()
+    side = max(8, int(math.sqrt(min(megapixels, CALIBRATION_MAX_MEGAPIXELS) * 1e6)))
+    image = np.random.default_rng(0).integers(0, 256, (side, side), dtype=np.uint8)
+
+    def work(_=None):
+        ImageFilters.apply_filter(cv2.resize(image, (side // 2, side // 2),
+                                             interpolation=cv2.INTER_AREA), "sharpen")
+
+    def best_time(function):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    previous = cv2.getNumThreads()
+    try:
+        work()
+        cv2.setNumThreads(cpus)
+        intra = best_time(lambda: [work() for _ in range(cpus)])
+
+        cv2.setNumThreads(1)
+        with ThreadPoolExecutor(cpus) as threads:
+            inter = best_time(lambda: list(threads.map(work, range(cpus))))
+    finally:
+        cv2.setNumThreads(previous)
+
+    return {"intra-image": cpus / intra, "inter-image": cpus / inter}
+
+
+def _calibration_path():
+    """Get the file calibration results are kept in."""
+    if CALIBRATION_PATH:
+        return CALIBRATION_PATH
+    from ..utils.config import get_config
+    return os.path.join(get_config().config_dir, "calibration.json")
+
+
+def _machine_key(cpus):
+    """Get the key of calibration results, which hold for one CPU count and OpenCV build."""
+    import cv2
+    return f"opencv {cv2.__version__}, {cpus} cpus"
+
+
+def _load_calibration(path):
+    """Read stored calibration results; empty if there are none or they are unreadable."""
+    try:
+        with open(path) as f:
+            calibration = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return calibration if isinstance(calibration, dict) else {}
+
+
+def _store_calibration(path, cpus, bucket, mode):
+    """Add a calibration result to the stored ones; failing to store it is not an error."""
+    calibration = _load_calibration(path)
+    calibration.setdefault(_machine_key(cpus), {})[f"{bucket:g}"] = mode
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "w") as f:
+            json.dump(calibration, f, indent=4)
+        # Replacing keeps the file whole for concurrent runs
+        os.replace(temporary, path)
+    except OSError:
+        pass
+
+
+def best_mode(megapixels, cpus=None):
+    """
+    Pick the faster mode for an image size, calibrating on first use.
+
+    Sizes are grouped in power-of-two buckets. Each is measured once per
+    machine: the result is stored in the configuration directory, keyed by
+    the CPU count and OpenCV version, so later runs start without measuring.
+
+    Args:
+        megapixels (float): Image size
+        cpus (int, optional): CPUs to use. Defaults to all usable CPUs.
+
+    Returns:
+        str: "intra-image" or "inter-image"
+    """
+    cpus = cpus or cpu_count()
+    if cpus == 1:
+        return "inter-image"
+
+    bucket = 2.0 ** round(math.log2(max(megapixels, 1 / 16)))
+    bucket = min(bucket, CALIBRATION_MAX_MEGAPIXELS)
+    key = (bucket, cpus)
+    if key not in _best_modes:
+        path = _calibration_path()
+        mode = _load_calibration(path).get(_machine_key(cpus), {}).get(f"{bucket:g}")
+        if mode not in ("intra-image", "inter-image"):
+            throughput = measure(bucket, cpus)
+            mode = max(throughput, key=throughput.get)
+            _store_calibration(path, cpus, bucket, mode)
+        _best_modes[key] = mode
+    return _best_modes[key]
+
+
+def plan(mode="auto", workers=None, megapixels=None, cpus=None):
+    """
+    Split the CPUs between worker processes and threads per worker.
+
+    Workers times threads never exceeds the number of CPUs, unless more
+    workers than CPUs are requested.
+
+    Args:
+        mode (str, optional): One of MODES. Defaults to "auto".
+        workers (int, optional): Number of workers; None lets the mode choose.
+            Defaults to None.
+        megapixels (float, optional): Typical image size for "auto"; without
+            it, "auto" picks "inter-image". Defaults to None.
+        cpus (int, optional): CPUs to use. Defaults to all usable CPUs.
+
+    Returns:
+        tuple: ``(workers, threads)``
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown concurrency mode: {mode}")
+
+    cpus = cpus or cpu_count()
+    if mode == "auto":
+        mode = best_mode(megapixels, cpus) if megapixels else "inter-image"
+
+    if mode == "intra-image":
+        workers = workers or 1
+        return workers, max(1, cpus // workers)
+    return workers or cpus, 1
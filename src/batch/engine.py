@@ -0,0 +1,804 @@
+"""
+Batch processing engine for PixelCraft.
+
+This module applies a filter to many images, either serially or on a pool
+of worker processes. It is shared by the command line batch mode and the
+GUI batch processor.
+"""
+
+import faulthandler
+import os
+import time
+from collections import deque
+
+from ..core.filters import ImageFilters
+from ..core.difference import absolute_difference
+from ..core.similarity import similarity_from_difference
+from ..core.statistics import get_statistics
+from ..utils.image_io import ImageIO, MultiPageWriter
+from ..utils.instrumentation import instrumentation
+from .concurrency import cpu_count, init_worker, plan, MODES
+from .profiling import memory_tracker, peak_rss, worker_profiling
+from .scheduling import ChunkSizer, WorkQueue, estimate_footprint, is_small
+from .transport import SharedImage, SharedMemoryRing
+
+# File extensions picked up when a directory is given as input
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".gif", ".webp")
+
+# I/O errors that retrying cannot fix
+PERMANENT_ERRORS = (FileNotFoundError, IsADirectoryError, NotADirectoryError, PermissionError)
+
+# Seconds before the first retry of a transient I/O error; doubles with each retry
+RETRY_DELAY = 0.1
+
+
+def find_images(path, extensions=IMAGE_EXTENSIONS):
+    """
+    Find the images to process.
+
+    Args:
+        path (str): Image file or directory containing images
+        extensions (tuple, optional): Lower-case file extensions to include.
+            Defaults to IMAGE_EXTENSIONS.
+
+    Returns:
+        list: Sorted image paths; ``[path]`` if ``path`` is not a directory
+    """
+    if not os.path.isdir(path):
+        return [path]
+
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if os.path.splitext(name)[1].lower() in extensions
+    )
+
+
+def safe_relative_path(name):
+    """
+    Turn an untrusted name, such as an archive member, into a relative path.
+
+    Args:
+        name (str): Name with "/" or "\\" separated folders
+
+    Returns:
+        str: Path without empty, "." or ".." parts, so it cannot leave the
+        directory it is joined to; empty if nothing is left
+    """
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".", "..")]
+    return os.path.join(*parts) if parts else ""
+
+
+def create_pool(workers, threads=None):
+    """
+    Create a pool of worker processes for batch processing.
+
+    Workers are spawned rather than forked, so they never inherit GUI or
+    thread state from the parent process.
+
+    Args:
+        workers (int): Number of worker processes
+        threads (int, optional): OpenCV and BLAS threads per worker. Defaults
+            to None, which splits the CPUs evenly between the workers.
+
+    Returns:
+        concurrent.futures.ProcessPoolExecutor: The pool
+    """
+    # Imported here so serial runs do not pay for loading multiprocessing
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    if threads is None:
+        threads = max(1, cpu_count() // workers)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=init_worker, initargs=(threads,))
+
+
+class InMemoryImage:
+    """
+    An encoded image held in memory instead of a file.
+
+    Attributes:
+        name (str): File name of the image; its extension selects the output format
+        data (bytes): Encoded image, e.g. the contents of a PNG file
+    """
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+
+
+class BatchResult:
+    """
+    Outcome of processing a single image.
+
+    Attributes:
+        input_path (str): Path of the input image, or name of an in-memory image
+        output_path (str): Path of the saved image, None on failure or for
+            in-memory output
+        error (str): Error message, None on success
+        report (dict): Similarity and statistics, if requested
+        elapsed (float): Processing time in seconds
+        metrics (dict): Instrumentation snapshot recorded in a worker process
+        output_data (bytes): Encoded processed image for in-memory output
+        frames (int): Number of frames processed in frame mode, None otherwise
+        shared_output (int): Size of ``output_data`` while it is still held in a
+            shared memory slot on its way from a worker process; None otherwise
+        pixels (int): Pixels of the input from its header, None if not probed
+        peak_rss (int): Peak resident memory in bytes of the worker process
+            that processed the image, None for images processed in the calling
+            process
+    """
+
+    def __init__(self, input_path, output_path=None, error=None, report=None, elapsed=0.0,
+                 metrics=None, output_data=None, frames=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.error = error
+        self.report = report
+        self.elapsed = elapsed
+        self.metrics = metrics
+        self.output_data = output_data
+        self.frames = frames
+        self.shared_output = None
+        self.pixels = None
+        self.peak_rss = None
+
+    @property
+    def success(self):
+        """bool: True if the image was processed and saved."""
+        return self.error is None
+
+
+def is_transient(error):
+    """
+    Check whether an error may go away when the operation is retried.
+
+    Args:
+        error (Exception): Error raised while processing an image
+
+    Returns:
+        bool: True for I/O errors other than PERMANENT_ERRORS, e.g. a network
+        share timing out or a failed write
+    """
+    return isinstance(error, OSError) and not isinstance(error, PERMANENT_ERRORS)
+
+
+def _frame_report(image, processed, sensitivity):
+    """Get the similarity and statistics of one processed image."""
+    difference = absolute_difference(image, processed)
+    return {
+        "similarity": similarity_from_difference(difference, sensitivity),
+        "statistics": {
+            "original": get_statistics(image).as_dict(),
+            "processed": get_statistics(processed).as_dict(),
+            "difference": get_statistics(difference).as_dict(),
+        },
+    }
+
+
+def _process_frames(input_path, output_path, filter_name, params, sensitivity, read_options):
+    """
+    Filter every frame of a multi-page or animated image into a multi-page TIFF.
+
+    Frames are read, filtered and written one at a time.
+
+    Returns:
+        tuple: Number of frames and the list of per-frame reports
+    """
+    reports = []
+    with MultiPageWriter(output_path) as writer:
+        for image in ImageIO.iter_frames(input_path, **read_options):
+            with memory_tracker.stage("filter"):
+                processed = ImageFilters.apply_filter(image, filter_name, **params)
+            with memory_tracker.stage("save"):
+                writer.write(processed)
+            if sensitivity is not None:
+                with memory_tracker.stage("report"):
+                    reports.append(_frame_report(image, processed, sensitivity))
+            instrumentation.count("batch.frames_processed")
+    return writer.pages, reports
+
+
+def process_image(input_path, output_path, filter_name, params=None, sensitivity=None,
+                  color=False, any_depth=False, resize=(450, 450), resize_mode="stretch",
+                  interpolation="auto", frames=False, retries=0, output_format=None):
+    """
+    Read, filter and save one image.
+
+    Args:
+        input_path (str or InMemoryImage): Path of the input image, or the
+            encoded image itself
+        output_path (str): Path to save the processed image to, or None to
+            return the encoded image in ``BatchResult.output_data``
+        filter_name (str): Name of the filter to apply
+        params (dict, optional): Filter parameters. Defaults to None.
+        sensitivity (int, optional): If given, the result includes a report with
+            the similarity at this sensitivity and image statistics. Defaults to None.
+        color (bool, optional): Process the image in color instead of grayscale.
+            Defaults to False.
+        any_depth (bool, optional): Process 16-bit and floating point images at
+            their depth instead of reducing them to 8 bits. Defaults to False.
+        resize (tuple, optional): Size to resize the image to, or None to process
+            it at full resolution. Defaults to (450, 450).
+        resize_mode (str, optional): How to resize, see ``ImageIO.RESIZE_MODES``.
+            Defaults to "stretch".
+        interpolation (str, optional): Interpolation for resizing, see
+            ``ImageIO.resize_image``. Defaults to "auto".
+        frames (bool, optional): Process every page of a multi-page TIFF or
+            frame of an animated image, streaming them one at a time, and save
+            a multi-page TIFF. The report then has an entry per frame under
+            ``frames``. Needs an image file and an output path. Defaults to False.
+        retries (int, optional): Times to retry after a transient I/O error,
+            see ``is_transient``, waiting RETRY_DELAY seconds and doubling
+            it each time. Defaults to 0.
+        output_format (str, optional): Extension selecting the format of
+            in-memory output, e.g. ".png". Defaults to None (the input's).
+
+    Returns:
+        BatchResult: Result of the processing; errors are reported, not raised
+    """
+    start = time.perf_counter()
+    in_memory = isinstance(input_path, InMemoryImage)
+    if in_memory:
+        input_path, data = input_path.name, input_path.data
+
+    read_options = {"grayscale": not color, "any_depth": any_depth, "resize": resize,
+                    "resize_mode": resize_mode, "interpolation": interpolation}
+    for attempt in range(retries + 1):
+        try:
+            output_data = None
+            report = None
+            frame_count = None
+            if frames:
+                if in_memory or output_path is None:
+                    raise ValueError("Frame mode needs an image file and an output directory")
+                frame_count, reports = _process_frames(input_path, output_path, filter_name,
+                                                       params or {}, sensitivity, read_options)
+                if sensitivity is not None:
+                    report = {"input": input_path, "output": output_path, "frames": reports}
+            else:
+                with memory_tracker.stage("read"):
+                    if in_memory:
+                        image = ImageIO.decode_image(data, **read_options)
+                    else:
+                        image = ImageIO.read_image(input_path, **read_options)
+                with memory_tracker.stage("filter"):
+                    processed = ImageFilters.apply_filter(image, filter_name, **(params or {}))
+
+                with memory_tracker.stage("save"):
+                    if output_path is None:
+                        output_data = ImageIO.encode_image(
+                            processed, output_format or os.path.splitext(input_path)[1] or ".png")
+                    elif not ImageIO.save_image(processed, output_path):
+                        # The encoder rejected the image or format; retrying cannot help
+                        raise ValueError("Failed to save processed image")
+
+                if sensitivity is not None:
+                    with memory_tracker.stage("report"):
+                        report = {"input": input_path, "output": output_path,
+                                  **_frame_report(image, processed, sensitivity)}
+
+            result = BatchResult(input_path, output_path, report=report,
+                                 elapsed=time.perf_counter() - start, output_data=output_data,
+                                 frames=frame_count)
+            instrumentation.count("batch.images_processed")
+            break
+
+        except Exception as e:
+            if attempt < retries and is_transient(e):
+                instrumentation.count("batch.retries")
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+                continue
+            result = BatchResult(input_path, error=str(e), elapsed=time.perf_counter() - start)
+            instrumentation.count("batch.images_failed")
+            break
+
+    instrumentation.record_time("batch.image", result.elapsed)
+    return result
+
+
+def _process_task(task, options):
+    """
+    Run ``process_image`` on a task tuple inside a worker process.
+
+    Args:
+        task (tuple): Arguments for ``process_image``; the input may be a
+            ``SharedImage``, whose slot then also carries the output back
+        options (dict): Worker options from ``BatchEngine._worker_options``.
+            With ``record`` set, the worker's instrumentation for this image is
+            returned with the result so the parent can merge it. With
+            ``profile_dir`` set, the worker profiles itself into that directory.
+            With ``timeout`` set, the worker process exits if the image takes
+            longer than that many seconds.
+
+    Returns:
+        BatchResult: Result of the processing
+    """
+    if options["record"]:
+        instrumentation.enable()
+        instrumentation.reset()
+
+    if options["timeout"]:
+        # The watchdog runs on its own thread, so it also ends a worker that
+        # hangs inside native code; the parent replaces the worker
+        faulthandler.dump_traceback_later(options["timeout"], exit=True)
+    try:
+        with worker_profiling(options["profile_dir"], options["trace_memory"]):
+            if isinstance(task[0], SharedImage):
+                with task[0].attach() as slot:
+                    result = process_image(InMemoryImage(task[0].name, slot.data), *task[1:])
+                    slot.write_result(result)
+            else:
+                result = process_image(*task)
+    finally:
+        if options["timeout"]:
+            faulthandler.cancel_dump_traceback_later()
+
+    if options["record"]:
+        result.metrics = instrumentation.snapshot()
+    result.peak_rss = peak_rss()
+    return result
+
+
+def _process_chunk(tasks, options):
+    """
+    Run ``_process_task`` on several small images in one round trip.
+
+    Args:
+        tasks (list): Task tuples; their inputs are never ``SharedImage``
+        options (dict): Worker options from ``BatchEngine._worker_options``
+
+    Returns:
+        list: ``BatchResult`` for each task, in order
+    """
+    return [_process_task(task, options) for task in tasks]
+
+
+class BatchEngine:
+    """
+    Applies one filter to a sequence of images.
+
+    With ``workers`` greater than one, a ``timeout`` or an ``executor``,
+    images are processed on a pool of worker processes. Only a bounded number
+    of images is in flight at any time, so memory use does not grow with the
+    number of inputs. A pool broken by a crashed or hung worker is replaced.
+
+    Attributes:
+        quarantined (list): ``(input, reason)`` for each image of the last run
+            that crashed or hung a worker process; the image is reported as
+            failed and not retried
+    """
+
+    def __init__(self, filter_name, output_dir, params=None, workers=1,
+                 name_template="{filter}_{name}", sensitivity=None,
+                 profile_dir=None, trace_memory=False, executor=None, color=False,
+                 any_depth=False, resize=(450, 450), resize_mode="stretch",
+                 interpolation="auto", frames=False, shared_memory=True,
+                 concurrency="auto", order="largest-first", memory_budget=None,
+                 chunking=True, timeout=None, retries=2):
+        """
+        Initialize the engine.
+
+        Args:
+            filter_name (str): Name of the filter to apply
+            output_dir (str): Directory for processed images, or None to return
+                them encoded in ``BatchResult.output_data``, in the format of
+                the extension of their ``output_name_for``
+            params (dict, optional): Filter parameters. Defaults to None.
+            workers (int, optional): Number of worker processes; 1 processes
+                images in the calling thread, None lets the ``concurrency``
+                mode choose. With an ``executor``, the number of its workers.
+                Defaults to 1.
+            name_template (str, optional): Output file name template with the
+                fields ``filter``, ``name``, ``stem`` and ``ext``.
+                Defaults to "{filter}_{name}".
+            sensitivity (int, optional): If given, each result carries a report
+                with similarity and statistics. Defaults to None.
+            profile_dir (str, optional): Directory worker processes write their
+                profiles to when they exit, see ``BatchProfiler``; shut an
+                ``executor`` down before the profiler finishes. Defaults to None.
+            trace_memory (bool, optional): Record allocations per stage in worker
+                processes. Defaults to False.
+            executor (concurrent.futures.Executor, optional): Existing pool from
+                ``create_pool`` to run on, e.g. one kept warm across runs. The
+                engine does not shut it down. Defaults to None.
+            color (bool, optional): Process images in color instead of grayscale.
+                Defaults to False.
+            any_depth (bool, optional): Process 16-bit and floating point images
+                at their depth; save them to a format that keeps it, such as
+                PNG or TIFF. Defaults to False.
+            resize (tuple, optional): Size to resize images to, or None to process
+                them at full resolution. Defaults to (450, 450).
+            resize_mode (str, optional): How to resize, see ``ImageIO.RESIZE_MODES``.
+                Defaults to "stretch".
+            interpolation (str, optional): Interpolation for resizing, see
+                ``ImageIO.resize_image``. Defaults to "auto".
+            frames (bool, optional): Process every page of multi-page TIFFs and
+                every frame of animated images into multi-page TIFFs, see
+                ``process_image``. Defaults to False.
+            shared_memory (bool, optional): Pass in-memory images to and from
+                worker processes through shared memory instead of pickling
+                them, see ``SharedMemoryRing``. Defaults to True.
+            concurrency (str, optional): How to split the CPUs between worker
+                processes and OpenCV threads in pools the engine creates, see
+                ``concurrency.MODES``. Defaults to "auto".
+            order (str, optional): Processing order, see ``WorkQueue.ORDERS``;
+                "largest-first" probes all image headers before starting so
+                that giant images do not run last. Defaults to "largest-first".
+            memory_budget (int, optional): Bytes the images in flight on a pool
+                may use together. Each image's footprint is estimated from its
+                header, see ``estimate_footprint``, and new images are only
+                submitted while they fit. Defaults to None (no limit).
+            chunking (bool, optional): Send small images to worker processes
+                in chunks, sized from their measured processing time so that
+                each round trip does about ``ChunkSizer.TARGET_SECONDS`` of
+                work, see ``WorkQueue.take_chunk``. Defaults to True.
+            timeout (float, optional): Seconds an image may take before its
+                worker process is ended. Images are then processed on a pool
+                even with one worker, so a hang or crash never takes down the
+                calling process; a run of a few small images then takes
+                a few tenths of a second longer to start the pool. Images in flight when a worker dies are rerun
+                as single images, fewer at a time after each further crash,
+                and the one that kills a worker again while alone in flight is
+                quarantined, see ``quarantined``. Defaults to None (no limit).
+            retries (int, optional): Times to retry an image after a transient
+                I/O error, see ``process_image``. Defaults to 2.
+
+        Raises:
+            ValueError: If the filter, resize mode, interpolation, concurrency
+                mode or order is unknown
+        """
+        if filter_name.lower() not in ImageFilters.FILTERS:
+            raise ValueError(f"Unknown filter: {filter_name}")
+        if resize_mode not in ImageIO.RESIZE_MODES:
+            raise ValueError(f"Unknown resize mode: {resize_mode}")
+        if interpolation != "auto" and interpolation not in ImageIO.INTERPOLATIONS:
+            raise ValueError(f"Unknown interpolation: {interpolation}")
+        if concurrency not in MODES:
+            raise ValueError(f"Unknown concurrency mode: {concurrency}")
+        if order not in WorkQueue.ORDERS:
+            raise ValueError(f"Unknown order: {order}")
+
+        self.filter_name = filter_name
+        self.output_dir = output_dir
+        self.params = dict(params or {})
+        self.workers = max(1, int(workers)) if workers else None
+        self.name_template = name_template
+        self.sensitivity = sensitivity
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.executor = executor
+        self.color = color
+        self.any_depth = any_depth
+        self.resize = resize
+        self.resize_mode = resize_mode
+        self.interpolation = interpolation
+        self.frames = frames
+        self.shared_memory = shared_memory
+        self.concurrency = concurrency
+        self.order = order
+        self.memory_budget = memory_budget
+        self.chunking = chunking
+        self.timeout = timeout
+        self.retries = retries
+        self.quarantined = []
+        self.total_pixels = None
+        self.done_pixels = 0
+        self.worker_peak_rss = None
+        self.is_canceled = False
+
+    def cancel(self):
+        """Stop submitting new images; images already in progress still finish."""
+        self.is_canceled = True
+
+    def output_name_for(self, input_path, keep_folders=False):
+        """
+        Get the name of the processed image for an input image.
+
+        Args:
+            input_path (str or InMemoryImage): Path of the input image, the
+                image, or its name
+            keep_folders (bool, optional): Keep the folders of the input
+                name, made safe with ``safe_relative_path``; always done for
+                in-memory images, e.g. from archives. Defaults to False.
+
+        Returns:
+            str: File name from ``name_template``. In frame mode, the extension
+            is changed to ".tif" unless it already is a multi-page format.
+        """
+        folder = ""
+        if isinstance(input_path, InMemoryImage):
+            input_path, keep_folders = input_path.name, True
+        if keep_folders:
+            folder, name = os.path.split(safe_relative_path(input_path))
+        else:
+            name = os.path.basename(input_path)
+        stem, ext = os.path.splitext(name)
+        output_name = os.path.join(folder, self.name_template.format(
+            filter=self.filter_name, name=name, stem=stem, ext=ext
+        ))
+        output_stem, output_ext = os.path.splitext(output_name)
+        if self.frames and output_ext.lower() not in ImageIO.MULTIPAGE_EXTENSIONS:
+            output_name = output_stem + ".tif"
+        return output_name
+
+    def output_path_for(self, input_path):
+        """
+        Get the output path for an input image.
+
+        Args:
+            input_path (str or InMemoryImage): Path of the input image, or the image
+
+        Returns:
+            str: Path to save the processed image to, see ``output_name_for``;
+            None for in-memory output
+        """
+        if self.output_dir is None:
+            return None
+        return os.path.join(self.output_dir, self.output_name_for(input_path))
+
+    def expected_megapixels(self, info):
+        """
+        Estimate the size images are processed at, for the concurrency policy.
+
+        Args:
+            info (ImageInfo): Header of a typical input, or None if unknown
+
+        Returns:
+            float: Size in megapixels, or None if unknown
+        """
+        if self.resize and self.resize_mode != "none":
+            width, height = (self.resize, self.resize) if isinstance(self.resize, int) else self.resize
+            return width * height / 1e6
+        return info.megapixels if info else None
+
+    def _task(self, input_path):
+        """Build the task tuple for an input image."""
+        output_path = self.output_path_for(input_path)
+        # In-memory output, e.g. archive members, is encoded as its name says
+        output_format = (None if output_path is not None
+                         else os.path.splitext(self.output_name_for(input_path))[1])
+        return (input_path, output_path, self.filter_name,
+                self.params, self.sensitivity, self.color, self.any_depth,
+                self.resize, self.resize_mode, self.interpolation, self.frames,
+                self.retries, output_format)
+
+    def _worker_options(self):
+        """Get the options passed to worker processes with each task."""
+        return {
+            "record": instrumentation.enabled,
+            "profile_dir": self.profile_dir,
+            "trace_memory": self.trace_memory,
+            "timeout": self.timeout,
+        }
+
+    @property
+    def progress(self):
+        """float: Fraction of the pixels of the current run processed, None if unknown."""
+        if not self.total_pixels:
+            return None
+        return self.done_pixels / self.total_pixels
+
+    @property
+    def peak_rss(self):
+        """int: Peak resident memory in bytes of the largest process of the run, or None."""
+        own = peak_rss()
+        if own is None or self.worker_peak_rss is None:
+            return own or self.worker_peak_rss
+        return max(own, self.worker_peak_rss)
+
+    def footprint(self, info):
+        """
+        Estimate the memory needed to process an image with this engine.
+
+        Args:
+            info (ImageInfo): Header of the image, or None if unknown
+
+        Returns:
+            int: Estimated bytes, see ``estimate_footprint``
+        """
+        return estimate_footprint(info, self.color, self.any_depth, self.resize,
+                                  self.resize_mode, self.sensitivity is not None)
+
+    def _finish(self, result, info):
+        """Account a result towards the progress of the run."""
+        result.pixels = info.pixels if info else None
+        self.done_pixels += result.pixels or 0
+        if result.peak_rss is not None:
+            self.worker_peak_rss = max(self.worker_peak_rss or 0, result.peak_rss)
+        if result.metrics:
+            instrumentation.merge(result.metrics)
+        return result
+
+    def run(self, image_paths):
+        """
+        Process images, yielding results as they complete.
+
+        Args:
+            image_paths (iterable): Paths of the images to process, or
+                ``InMemoryImage`` objects
+
+        Yields:
+            BatchResult: Result for each processed image
+        """
+        if self.output_dir is not None:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+        queue = WorkQueue(image_paths, self.order, self.memory_budget, self.footprint)
+        self.total_pixels = queue.total_pixels
+        self.done_pixels = 0
+        self.worker_peak_rss = None
+        self.quarantined = []
+
+        if self.executor is not None:
+            yield from self._run_on_pool(self.executor, self.workers or 1, queue)
+            return
+
+        workers, threads = 1, None
+        if self.workers != 1 or self.timeout:
+            # Plan for the size of the first, i.e. largest, input
+            head = queue.peek()
+            if head is None:
+                return
+            workers, threads = plan(self.concurrency, self.workers,
+                                    self.expected_megapixels(head[1]))
+            if self.workers is None and hasattr(image_paths, "__len__"):
+                workers = min(workers, len(image_paths))
+
+        if workers == 1 and not self.timeout:
+            while not self.is_canceled:
+                entry = queue.take()
+                if entry is None:
+                    break
+                yield self._finish(process_image(*self._task(entry[0])), entry[1])
+            return
+
+        with create_pool(workers, threads) as pool:
+            yield from self._run_on_pool(pool, workers, queue, threads)
+
+    def start_pool(self):
+        """
+        Start a worker pool that later runs reuse, e.g. when watching a folder.
+
+        The pool is sized by the ``concurrency`` mode for the configured
+        resize, since the images are not known yet. Without a pool (one
+        worker and no timeout), images keep being processed in the calling
+        thread.
+
+        Returns:
+            concurrent.futures.Executor: The pool, also set as ``executor``;
+            the caller shuts it down, or None if no pool is needed
+        """
+        if self.executor is None and (self.workers != 1 or self.timeout):
+            workers, threads = plan(self.concurrency, self.workers,
+                                    self.expected_megapixels(None))
+            self.executor = create_pool(workers, threads)
+            self.workers = workers
+        return self.executor
+
+    def _submit(self, pool, ring, chunk):
+        """Submit a chunk of queue entries to a pool; returns the future and its record."""
+        if len(chunk) > 1:
+            tasks = [self._task(entry[0]) for entry in chunk]
+            return pool.submit(_process_chunk, tasks, self._worker_options()), None
+
+        task = self._task(chunk[0][0])
+        handle = None
+        if ring is not None and isinstance(chunk[0][0], InMemoryImage):
+            handle = ring.put(chunk[0][0].name, chunk[0][0].data)
+            task = (handle,) + task[1:]
+        return pool.submit(_process_task, task, self._worker_options()), handle
+
+    def _quarantine(self, entry, elapsed):
+        """Report an image that crashed or hung a worker process as failed."""
+        input_path = entry[0].name if isinstance(entry[0], InMemoryImage) else entry[0]
+        if self.timeout and elapsed >= self.timeout:
+            reason = f"timed out after {self.timeout:g} s"
+        else:
+            reason = "crashed the worker process"
+        self.quarantined.append((input_path, reason))
+        instrumentation.count("batch.images_quarantined")
+        return BatchResult(input_path, error=f"Quarantined: {reason}", elapsed=elapsed)
+
+    def _replace_pool(self, pool, workers, threads):
+        """Replace a pool broken by a dead worker process."""
+        instrumentation.count("batch.pool_restarts")
+        pool.shutdown(wait=False)
+        replacement = create_pool(workers, threads)
+        if pool is self.executor:
+            # The caller owns the executor, so it gets the replacement
+            self.executor = replacement
+        return replacement
+
+    def _run_on_pool(self, pool, workers, queue, threads=None):
+        """Process images on a pool, yielding results as they complete."""
+        from concurrent.futures import FIRST_COMPLETED, wait
+        from concurrent.futures.process import BrokenProcessPool
+
+        max_in_flight = workers * 2
+        pending = {}
+        in_flight_bytes = 0
+        sizer = ChunkSizer()
+        # Images in flight when a worker died, rerun as single images; each
+        # crash among the reruns halves how many run at once, until the image
+        # that kills a worker is the only one in flight
+        suspects = deque()
+        suspect_limit = max_in_flight
+        owned_pools = []
+        ring = SharedMemoryRing(max_in_flight) if self.shared_memory else None
+
+        try:
+            while True:
+                if suspects or any(record[4] for record in pending.values()):
+                    # New images wait until the reruns have found the culprit
+                    while not self.is_canceled and suspects and len(pending) < suspect_limit:
+                        entry = suspects.popleft()
+                        future, handle = self._submit(pool, ring, [entry])
+                        pending[future] = (handle, [entry], entry[2], time.perf_counter(), True)
+                        in_flight_bytes += entry[2]
+                else:
+                    # Keep the pool busy without queueing every image up front
+                    while not self.is_canceled and len(pending) < max_in_flight:
+                        chunk = queue.take_chunk(sizer.size if self.chunking else 1, in_flight_bytes)
+                        if not chunk:
+                            break
+                        footprint = sum(entry[2] for entry in chunk)
+                        future, handle = self._submit(pool, ring, chunk)
+                        pending[future] = (handle, chunk, footprint, time.perf_counter(), False)
+                        in_flight_bytes += footprint
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                crashed = []
+                while done:
+                    for future in done:
+                        handle, chunk, footprint, submitted, rerun = pending.pop(future)
+                        in_flight_bytes -= footprint
+                        try:
+                            results = future.result()
+                        except BrokenProcessPool:
+                            results = None
+                        if isinstance(results, BatchResult):
+                            results = [results]
+
+                        if handle is not None:
+                            if results and results[0].shared_output is not None:
+                                results[0].output_data = ring.read(handle, results[0].shared_output)
+                                results[0].shared_output = None
+                            ring.release(handle)
+
+                        if results is None:
+                            crashed.append((chunk, submitted, rerun))
+                            continue
+
+                        infos = [entry[1] for entry in chunk]
+                        if all(is_small(info) for info in infos):
+                            sizer.record(sum(result.elapsed for result in results), len(results))
+                        for result, info in zip(results, infos):
+                            yield self._finish(result, info)
+
+                    # A dead worker breaks every task in flight; settle them all first
+                    done = wait(pending)[0] if crashed else ()
+
+                if crashed:
+                    chunk, submitted, rerun = crashed[0]
+                    if len(crashed) == 1 and rerun:
+                        # A rerun alone in flight killed the worker again
+                        entry = chunk[0]
+                        yield self._finish(
+                            self._quarantine(entry, time.perf_counter() - submitted), entry[1])
+                        suspect_limit = max_in_flight
+                    else:
+                        suspects.extendleft(reversed([entry for chunk, _, _ in crashed
+                                                      for entry in chunk]))
+                        suspect_limit = max(1, len(crashed) // 2) if rerun else max_in_flight
+                    pool = self._replace_pool(pool, workers, threads)
+                    if pool is not self.executor:
+                        owned_pools.append(pool)
+        finally:
+            for owned in owned_pools:
+                owned.shutdown()
+            if ring is not None:
+                ring.close()
@@ -0,0 +1,251 @@
+"""
+All-pairs similarity matrix for PixelCraft dedup analysis.
+
+Calling ``calculate_similarity`` for every pair of N images decodes each
+image N times and pays Python overhead N² times. This module decodes every
+image once into a memory-mapped stack, then counts the pixels within the
+similarity band for whole blocks of image pairs at a time with OpenCV,
+tiled along the pixels so each block stays in cache. Blocks run on worker
+processes, which read the stack and write their part of the memory-mapped
+matrix directly, so neither the images nor the matrix have to fit in
+memory.
+"""
+
+import numpy as np
+import cv2
+
+from ..core.similarity import similarity_band
+from ..utils.image_io import ImageIO
+from .concurrency import plan
+from .engine import create_pool
+
+# Images per block side; a block is one task for a worker process
+BLOCK = 128
+
+# Bytes of a block of column images compared at once, sized to stay in L2 cache
+TILE_BYTES = 2 ** 18
+
+# Images decoded per task while loading the stack
+LOAD_CHUNK = 64
+
+
+def _load_chunk(stack_path, start, paths, read_options):
+    """
+    Decode images into rows of the stack inside a worker process.
+
+    Returns:
+        list: ``(path, error)`` for each image that could not be loaded
+    """
+    stack = np.load(stack_path, mmap_mode="r+")
+    errors = []
+    for offset, path in enumerate(paths):
+        try:
+            image = ImageIO.read_image(path, **read_options)
+        except (OSError, ValueError) as e:
+            errors.append((path, str(e)))
+            continue
+        if image.shape != stack.shape[1:] or image.dtype != stack.dtype:
+            errors.append((path, f"Size or depth {image.shape} {image.dtype} differs from "
+                                 f"{stack.shape[1:]} {stack.dtype}"))
+            continue
+        stack[start + offset] = image
+    stack.flush()
+    return errors
+
+
+def load_stack(paths, stack_path, color=False, any_depth=False, resize=(450, 450),
+               resize_mode="stretch", interpolation="auto", workers=None):
+    """
+    Decode images into one contiguous, memory-mapped array.
+
+    Args:
+        paths (list): Image files; all must have the same size after resizing
+        stack_path (str): ``.npy`` file to create for the stack
+        color (bool, optional): Load in color instead of grayscale. Defaults to False.
+        any_depth (bool, optional): Keep 16-bit and floating point images at
+            their depth. Defaults to False.
+        resize (tuple, optional): Size to resize images to, or None to keep
+            their size. Defaults to (450, 450).
+        resize_mode (str, optional): How to resize, see ``ImageIO.RESIZE_MODES``.
+            Defaults to "stretch".
+        interpolation (str, optional): Interpolation for resizing. Defaults to "auto".
+        workers (int, optional): Worker processes; 1 loads in the calling
+            thread. Defaults to None (one per CPU).
+
+    Returns:
+        numpy.memmap: Stack of shape ``(N, height, width[, channels])``
+
+    Raises:
+        ValueError: If there are no images, or an image cannot be read or
+            differs in size or depth from the first
+    """
+    if not paths:
+        raise ValueError("No images to compare")
+
+    read_options = {"grayscale": not color, "any_depth": any_depth, "resize": resize,
+                    "resize_mode": resize_mode, "interpolation": interpolation}
+    first = ImageIO.read_image(paths[0], **read_options)
+    stack = np.lib.format.open_memmap(stack_path, mode="w+", dtype=first.dtype,
+                                      shape=(len(paths),) + first.shape)
+    stack.flush()
+
+    chunks = [(start, paths[start:start + LOAD_CHUNK]) for start in range(0, len(paths), LOAD_CHUNK)]
+    workers = min(plan("inter-image", workers)[0], len(chunks))
+    if workers <= 1:
+        errors = [error for start, chunk in chunks
+                  for error in _load_chunk(stack_path, start, chunk, read_options)]
+    else:
+        with create_pool(workers, threads=1) as pool:
+            futures = [pool.submit(_load_chunk, stack_path, start, chunk, read_options)
+                       for start, chunk in chunks]
+            errors = [error for future in futures for error in future.result()]
+
+    if errors:
+        path, message = errors[0]
+        raise ValueError(f"Cannot load {path}: {message}"
+                         + (f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""))
+    return np.load(stack_path, mmap_mode="r")
+
+
+def band_counts(rows, cols, band, channels=1):
+    """
+    Count the pixels within the similarity band for every pair of two sets of images.
+
+    Each row image is compared against the whole block of column images at
+    once with OpenCV, a tile of pixels at a time so the block stays in cache.
+
+    Args:
+        rows (numpy.ndarray): Images as flat arrays, shape ``(m, pixels * channels)``
+        cols (numpy.ndarray): Images as flat arrays, shape ``(n, pixels * channels)``
+        band (int or float): Largest absolute difference counted as similar
+        channels (int, optional): Channels per pixel; a pixel counts only if
+            all its channels are within the band. Defaults to 1.
+
+    Returns:
+        numpy.ndarray: Counts of shape ``(m, n)``
+    """
+    counts = np.zeros((len(rows), len(cols)), dtype=np.int64)
+    size = rows.shape[1]
+    tile = max(1, TILE_BYTES // (len(cols) * cols.itemsize * channels)) * channels
+    # reduce cannot sum 16-bit or floating point masks into integers
+    sum_depth = cv2.CV_32S if cols.dtype == np.uint8 else cv2.CV_64F
+    weights = np.ones((1, channels), dtype=np.float32)
+    repeated = np.empty((len(cols), min(tile, size)), dtype=cols.dtype)
+
+    for start in range(0, size, tile):
+        block = cols[:, start:start + tile]
+        row_tile = repeated[:, :block.shape[1]]
+        for index, row in enumerate(rows):
+            row_tile[:] = row[start:start + tile]
+            difference = cv2.absdiff(block, row_tile)
+            if channels > 1:
+                # Count the channels outside the band; a pixel is within if none is
+                outside = cv2.threshold(difference, band, 1, cv2.THRESH_BINARY)[1]
+                outside = cv2.transform(outside.reshape(len(cols), -1, channels), weights)
+                within = cv2.threshold(outside, 0, 1, cv2.THRESH_BINARY_INV)[1]
+            else:
+                within = cv2.threshold(difference, band, 1, cv2.THRESH_BINARY_INV)[1]
+            sums = cv2.reduce(within, 1, cv2.REDUCE_SUM, dtype=sum_depth)
+            counts[index] += sums.ravel().astype(np.int64)
+    return counts
+
+
+def _matrix_block(stack_path, matrix_path, row_start, col_start, size, band):
+    """Compute one block of the matrix, and its mirror, inside a worker process."""
+    stack = np.load(stack_path, mmap_mode="r")
+    matrix = np.load(matrix_path, mmap_mode="r+")
+    count = len(stack)
+    channels = stack.shape[3] if stack.ndim == 4 else 1
+    flat = stack.reshape(count, -1)
+    pixels = flat.shape[1] // channels
+
+    row_end = min(row_start + size, count)
+    col_end = min(col_start + size, count)
+    counts = band_counts(np.ascontiguousarray(flat[row_start:row_end]),
+                         np.ascontiguousarray(flat[col_start:col_end]), band, channels)
+    # Rounds half to even like calculate_similarity
+    similarity = np.round(counts * 100 / pixels).astype(np.uint8)
+    matrix[row_start:row_end, col_start:col_end] = similarity
+    matrix[col_start:col_end, row_start:row_end] = similarity.T
+    matrix.flush()
+
+
+def similarity_matrix(stack_path, matrix_path, sensitivity=16, workers=None):
+    """
+    Compute the similarity of every pair of stacked images into a ``.npy`` file.
+
+    Entries match ``calculate_similarity`` for each pair. The matrix is
+    symmetric, so only blocks on and above the diagonal are computed.
+
+    Args:
+        stack_path (str): Stack from ``load_stack``
+        matrix_path (str): ``.npy`` file to create for the ``uint8`` matrix
+        sensitivity (int, optional): Sensitivity value (1, 2, 4, 16, 32, 64,
+            128, 255). Defaults to 16.
+        workers (int, optional): Worker processes; 1 computes in the calling
+            thread. Defaults to None (one per CPU).
+
+    Yields:
+        float: Fraction of the blocks done, after each block
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    stack = np.load(stack_path, mmap_mode="r")
+    count = len(stack)
+    band = similarity_band(sensitivity, stack.dtype)
+    matrix = np.lib.format.open_memmap(matrix_path, mode="w+", dtype=np.uint8,
+                                       shape=(count, count))
+    matrix.flush()
+    del matrix
+
+    size = BLOCK
+    blocks = [(row, col) for row in range(0, count, size) for col in range(row, count, size)]
+    workers = min(plan("inter-image", workers)[0], len(blocks))
+    if workers <= 1:
+        for done, (row, col) in enumerate(blocks, 1):
+            _matrix_block(stack_path, matrix_path, row, col, size, band)
+            yield done / len(blocks)
+        return
+
+    with create_pool(workers, threads=1) as pool:
+        queued = iter(blocks)
+        pending = set()
+        done = 0
+        while True:
+            # Keep the pool busy without queueing every block up front
+            for row, col in queued:
+                pending.add(pool.submit(_matrix_block, stack_path, matrix_path,
+                                        row, col, size, band))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                return
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()
+                done += 1
+                yield done / len(blocks)
+
+
+def count_pairs(matrix_path, threshold):
+    """
+    Count the pairs of different images at least as similar as a threshold.
+
+    The matrix is read a block of rows at a time, so it need not fit in memory.
+
+    Args:
+        matrix_path (str): Matrix from ``similarity_matrix``
+        threshold (int): Lowest similarity in percent to count
+
+    Returns:
+        int: Number of unordered pairs, each image compared with itself excluded
+    """
+    matrix = np.load(matrix_path, mmap_mode="r")
+    count = len(matrix)
+    total = 0
+    for start in range(0, count, BLOCK):
+        rows = matrix[start:start + BLOCK]
+        # Strictly above the diagonal, so every pair is counted once
+        above = np.arange(count) > np.arange(start, start + len(rows))[:, None]
+        total += int(np.count_nonzero((rows >= threshold) & above))
+    return total
@@ -0,0 +1,376 @@
+"""
+Profiling for PixelCraft batch runs.
+
+This module runs cProfile around a batch run, including inside worker
+processes, and merges all profiles into one pstats file with a summary of
+the hottest functions. Optionally, tracemalloc records the biggest
+allocations of each processing stage.
+"""
+
+import io
+import os
+import sys
+import glob
+import json
+import shutil
+import pstats
+import cProfile
+import tempfile
+import tracemalloc
+import multiprocessing.util
+from contextlib import contextmanager
+
+# Allocations from these files are bookkeeping, not image processing
+_IGNORED_FILES = [tracemalloc.__file__, "<frozen importlib._bootstrap>",
+                  "<frozen importlib._bootstrap_external>"]
+
+
+class _NullStage:
+    """Stage returned while memory tracing is off; does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _MemoryStage:
+    """Context manager recording the allocations of one stage."""
+
+    def __init__(self, tracker, name):
+        self.tracker = tracker
+        self.name = name
+        self.before = None
+        self.start_size = 0
+
+    def __enter__(self):
+        with self.tracker.paused_profile():
+            self.before = tracemalloc.take_snapshot()
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            self.start_size = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self.tracker.paused_profile():
+            peak = tracemalloc.get_traced_memory()[1] - self.start_size
+            after = tracemalloc.take_snapshot()
+            self.tracker.record(self.name, peak, after.compare_to(self.before, "lineno"))
+        return False
+
+
+class MemoryTracker:
+    """
+    Biggest allocations per processing stage, recorded with tracemalloc.
+
+    For each stage the tracker keeps the peak memory allocated while the
+    stage ran and the source lines that allocated the memory still held when
+    it finished, e.g. the decoded or filtered image.
+    """
+
+    def __init__(self, top=10):
+        """
+        Initialize an inactive tracker.
+
+        Args:
+            top (int, optional): Allocation sites kept per stage. Defaults to 10.
+        """
+        self.top = top
+        self.active = False
+        self.stages = {}
+        self.profile = None
+
+    def start(self):
+        """Start tracing allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.active = True
+
+    def stop(self):
+        """Stop tracing allocations; recorded stages are kept."""
+        self.active = False
+        tracemalloc.stop()
+
+    def stage(self, name):
+        """
+        Record the allocations of a block of code.
+
+        Args:
+            name (str): Stage name, e.g. "read"
+
+        Returns:
+            Context manager recording the stage while tracing is active
+        """
+        if not self.active:
+            return _NULL_STAGE
+        return _MemoryStage(self, name)
+
+    @contextmanager
+    def paused_profile(self):
+        """Keep snapshot overhead out of the running profile, if any."""
+        if self.profile is None:
+            yield
+            return
+
+        self.profile.disable()
+        try:
+            yield
+        finally:
+            self.profile.enable()
+
+    def record(self, name, peak, differences):
+        """
+        Add one run of a stage.
+
+        Args:
+            name (str): Stage name
+            peak (int): Peak bytes allocated during the stage
+            differences (list): ``tracemalloc.StatisticDiff`` between the
+                snapshots before and after the stage
+        """
+        stage = self.stages.setdefault(name, {"runs": 0, "peak": 0, "allocations": {}})
+        stage["runs"] += 1
+        stage["peak"] = max(stage["peak"], peak)
+
+        allocations = stage["allocations"]
+        for difference in differences:
+            if difference.size_diff <= 0:
+                continue
+            frame = difference.traceback[0]
+            if frame.filename in _IGNORED_FILES:
+                continue
+            location = f"{frame.filename}:{frame.lineno}"
+            allocations[location] = allocations.get(location, 0) + difference.size_diff
+
+        # Keep only the biggest sites so long runs use constant memory
+        if len(allocations) > self.top:
+            stage["allocations"] = dict(
+                sorted(allocations.items(), key=lambda item: -item[1])[:self.top]
+            )
+
+    def as_dict(self):
+        """
+        Export the recorded stages.
+
+        Returns:
+            dict: Runs, peak bytes and allocated bytes per source line for each stage
+        """
+        return json.loads(json.dumps(self.stages))
+
+    def merge(self, stages):
+        """
+        Add stages exported with ``as_dict``, e.g. from a worker process.
+
+        Args:
+            stages (dict): Exported stages
+        """
+        for name, data in stages.items():
+            stage = self.stages.setdefault(name, {"runs": 0, "peak": 0, "allocations": {}})
+            stage["runs"] += data["runs"]
+            stage["peak"] = max(stage["peak"], data["peak"])
+            for location, size in data["allocations"].items():
+                stage["allocations"][location] = stage["allocations"].get(location, 0) + size
+
+    def summary(self):
+        """
+        Format the biggest allocations of each stage.
+
+        Returns:
+            str: Human-readable summary
+        """
+        lines = []
+        for name, stage in self.stages.items():
+            lines.append(f"{name}: {stage['runs']} runs, peak {stage['peak'] / 2 ** 20:.2f} MiB, "
+                         f"held after the stage per run:")
+            allocations = sorted(stage["allocations"].items(), key=lambda item: -item[1])
+            for location, size in allocations[:self.top]:
+                lines.append(f"    {size / stage['runs'] / 2 ** 20:10.2f} MiB  {location}")
+        return "\n".join(lines)
+
+
+def peak_rss():
+    """
+    Get the peak resident memory of this process.
+
+    Returns:
+        int: Peak resident set size in bytes, or None where unavailable
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Process-wide tracker used by the batch engine
+memory_tracker = MemoryTracker()
+
+# Profile of the current worker process, accumulated over all its tasks
+_worker_profile = None
+
+# Directory and memory tracing of the worker profile
+_worker_options = None
+
+
+def _dump_worker_profile():
+    """Write the profile of the current worker process to its directory."""
+    global _worker_profile
+
+    if _worker_profile is None:
+        return
+    profile_dir, trace_memory = _worker_options
+    base_path = os.path.join(profile_dir, f"worker-{os.getpid()}")
+    try:
+        _worker_profile.dump_stats(base_path + ".prof")
+        if trace_memory:
+            with open(base_path + ".memory.json", "w") as f:
+                json.dump(memory_tracker.as_dict(), f)
+    except OSError:
+        # The profiler that owned the directory has already finished
+        pass
+    _worker_profile = None
+    memory_tracker.stages = {}
+
+
+@contextmanager
+def worker_profiling(profile_dir, trace_memory=False):
+    """
+    Profile a task inside a worker process.
+
+    The worker's profile accumulates over all tasks it runs and is written to
+    ``profile_dir`` once, when the pool shuts the worker down, so the pool
+    has to be shut down before the profiles are merged. A worker ended by a
+    timeout or crash loses its profile.
+
+    Args:
+        profile_dir (str): Directory for the worker's profile, or None to
+            run without profiling
+        trace_memory (bool, optional): Also record allocations per stage.
+            Defaults to False.
+    """
+    global _worker_profile, _worker_options
+
+    if profile_dir is None:
+        yield
+        return
+
+    if _worker_profile is not None and _worker_options != (profile_dir, trace_memory):
+        # A warm worker serving a new profiler hands the old profile in first
+        _dump_worker_profile()
+    if _worker_profile is None:
+        _worker_profile = cProfile.Profile()
+        _worker_options = (profile_dir, trace_memory)
+        # Finalizers also run in workers that multiprocessing ends with
+        # os._exit, which skips atexit handlers
+        multiprocessing.util.Finalize(None, _dump_worker_profile, exitpriority=10)
+    if trace_memory:
+        if not memory_tracker.active:
+            memory_tracker.start()
+        memory_tracker.profile = _worker_profile
+
+    _worker_profile.enable()
+    try:
+        yield
+    finally:
+        _worker_profile.disable()
+
+
+class BatchProfiler:
+    """
+    Profiles a batch run in the calling process and in all worker processes.
+
+    Example:
+        profiler = BatchProfiler("batch.prof")
+        engine = BatchEngine("average", "output", workers=4,
+                             profile_dir=profiler.work_dir)
+        with profiler:
+            for result in engine.run(paths):
+                ...
+        print(profiler.summary())
+    """
+
+    def __init__(self, output_path, top=25, trace_memory=False):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_path (str): Path of the merged pstats file. The summary is
+                written next to it with a ``.txt`` extension.
+            top (int, optional): Number of functions in the summary. Defaults to 25.
+            trace_memory (bool, optional): Record the biggest allocations per
+                stage with tracemalloc. Defaults to False.
+        """
+        self.output_path = output_path
+        self.summary_path = os.path.splitext(output_path)[0] + ".txt"
+        self.top = top
+        self.trace_memory = trace_memory
+        self.work_dir = tempfile.mkdtemp(prefix="pixelcraft-profile-")
+        self.profile = cProfile.Profile()
+        self.processes = 1
+
+    def __enter__(self):
+        if self.trace_memory:
+            memory_tracker.start()
+            memory_tracker.profile = self.profile
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile.disable()
+        try:
+            self.merge()
+        finally:
+            if self.trace_memory:
+                memory_tracker.stop()
+                memory_tracker.profile = None
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        return False
+
+    def merge(self):
+        """Merge the worker profiles and write the pstats file and summary."""
+        stats = pstats.Stats(self.profile)
+        worker_profiles = sorted(glob.glob(os.path.join(self.work_dir, "*.prof")))
+        for path in worker_profiles:
+            stats.add(path)
+        self.processes = 1 + len(worker_profiles)
+
+        for path in glob.glob(os.path.join(self.work_dir, "*.memory.json")):
+            with open(path) as f:
+                memory_tracker.merge(json.load(f))
+
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stats.dump_stats(self.output_path)
+        with open(self.summary_path, "w") as f:
+            f.write(self.summary())
+
+    def summary(self):
+        """
+        Format the hottest functions and, if traced, the biggest allocations.
+
+        Returns:
+            str: Human-readable summary
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(self.output_path, stream=stream)
+
+        stream.write(f"Profile of {self.processes} process(es)\n\n")
+        stream.write(f"Top {self.top} functions by own time\n")
+        stats.sort_stats("tottime").print_stats(self.top)
+        stream.write(f"Top {self.top} functions by cumulative time\n")
+        stats.sort_stats("cumulative").print_stats(self.top)
+
+        if self.trace_memory:
+            stream.write("Biggest allocations per stage\n\n")
+            stream.write(memory_tracker.summary())
+            stream.write("\n")
+
+        return stream.getvalue()
@@ -0,0 +1,358 @@
+"""
+Size-aware scheduling for PixelCraft batch runs.
+
+Batch inputs range from thumbnails to 100 MP scans. Processed in input
+order, a few giant images that happen to come last run alone on one core
+while the others sit idle. This module reads image headers, without
+decoding, to order work largest first, to keep the images in flight within
+a memory budget and to weight progress by pixel count.
+"""
+
+import io
+import os
+import warnings
+from collections import deque
+
+# Bits per sample of Pillow modes that are not 8-bit
+_MODE_BITS = {"1": 1, "I": 32, "F": 32, "I;16": 16, "I;16B": 16, "I;16L": 16, "I;16N": 16}
+
+# Inputs examined past the head of the queue for one that fits the budget
+LOOKAHEAD = 64
+
+# Largest image, in pixels over all pages, grouped with others into one task
+SMALL_IMAGE_PIXELS = 2 ** 20
+
+
+class ImageInfo:
+    """
+    Image properties read from a file header.
+
+    Attributes:
+        width (int): Width in pixels
+        height (int): Height in pixels
+        channels (int): Number of channels
+        bits (int): Bits per sample
+        pages (int): Number of pages or frames
+    """
+
+    def __init__(self, width, height, channels=1, bits=8, pages=1):
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.bits = bits
+        self.pages = pages
+
+    @property
+    def pixels(self):
+        """int: Pixels in all pages."""
+        return self.width * self.height * self.pages
+
+    @property
+    def megapixels(self):
+        """float: Size of one page in megapixels."""
+        return self.width * self.height / 1e6
+
+    @property
+    def decoded_bytes(self):
+        """int: Size of one decoded page at its own depth and channels."""
+        return self.width * self.height * self.channels * max(1, self.bits // 8)
+
+    def as_dict(self):
+        """
+        Get the properties as a dictionary.
+
+        Returns:
+            dict: Width, height, channels, bits and pages
+        """
+        return {"width": self.width, "height": self.height, "channels": self.channels,
+                "bits": self.bits, "pages": self.pages}
+
+
+def probe_image(source):
+    """
+    Read the dimensions, depth and page count of an image without decoding it.
+
+    Args:
+        source (str or InMemoryImage): Image file, or an object with the
+            encoded image in ``data``
+
+    Returns:
+        ImageInfo: Image properties, or None if the header cannot be read
+    """
+    from PIL import Image
+
+    data = getattr(source, "data", None)
+    if data is None and not os.path.isfile(source):
+        # Opening a pipe or device could block the parent; leave it to a worker
+        return None
+    try:
+        # Only the header is read, so giant images are no decompression bomb
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            image = Image.open(source if data is None else io.BytesIO(data))
+        with image:
+            width, height = image.size
+            # Counting TIFF pages walks the directory chain; no pixel data is read
+            pages = getattr(image, "n_frames", 1)
+            return ImageInfo(width, height, len(image.getbands()),
+                             _MODE_BITS.get(image.mode, 8), pages)
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        return None
+
+
+def estimate_footprint(info, color=False, any_depth=False, resize=(450, 450),
+                       resize_mode="stretch", report=False):
+    """
+    Estimate the peak memory needed to process an image.
+
+    Counts the decoded page, the resized page, the filtered page with a
+    float32 working copy, the encoded output and, with a report, the
+    difference image. In frame mode this is the footprint of one frame.
+
+    Args:
+        info (ImageInfo): Image properties, or None if unknown
+        color (bool, optional): Images are processed in color. Defaults to False.
+        any_depth (bool, optional): Images keep their bit depth. Defaults to False.
+        resize (tuple, optional): Size images are resized to, see
+            ``ImageIO.resize_image``. Defaults to (450, 450).
+        resize_mode (str, optional): How images are resized. Defaults to "stretch".
+        report (bool, optional): A similarity report is computed. Defaults to False.
+
+    Returns:
+        int: Estimated bytes; 0 if the image is unknown
+    """
+    if info is None:
+        return 0
+
+    from ..utils.image_io import ImageIO
+
+    channels = 3 if color else 1
+    sample_bytes = max(1, info.bits // 8) if any_depth else 1
+    decoded = info.width * info.height * channels * sample_bytes
+
+    scaled, output = ImageIO.resize_dimensions(info.width, info.height, resize, resize_mode)
+    resized = scaled[0] * scaled[1] * channels * sample_bytes if scaled != (info.width, info.height) else 0
+    pixels = output[0] * output[1] * channels
+    processed = pixels * sample_bytes
+    working = pixels * 4
+
+    footprint = decoded + resized + working + 2 * processed
+    if report:
+        footprint += processed
+    return footprint
+
+
+def is_small(info):
+    """
+    Check whether an image may share a task with others.
+
+    Args:
+        info (ImageInfo): Image properties, or None if unknown
+
+    Returns:
+        bool: True if the image has at most SMALL_IMAGE_PIXELS; False if it
+        is unknown, since it may be a giant image
+    """
+    return info is not None and info.pixels <= SMALL_IMAGE_PIXELS
+
+
+class ChunkSizer:
+    """
+    Sizes chunks of small images from their measured processing time.
+
+    Every task sent to a worker process costs a round trip: pickling,
+    pipe transfer and wake-ups. For thumbnails that overhead exceeds the
+    processing itself, so small images are sent in chunks that take about
+    TARGET_SECONDS to process.
+    """
+
+    TARGET_SECONDS = 0.05
+    INITIAL_SIZE = 4
+    MAX_SIZE = 512
+
+    # Weight of the newest measurement in the running average
+    SMOOTHING = 0.25
+
+    def __init__(self):
+        """Initialize without measurements."""
+        self.seconds_per_image = None
+
+    def record(self, seconds, images):
+        """
+        Add the processing time of a completed task.
+
+        Args:
+            seconds (float): Processing time of the task
+            images (int): Number of images in the task
+        """
+        if images <= 0:
+            return
+        measured = seconds / images
+        if self.seconds_per_image is None:
+            self.seconds_per_image = measured
+        else:
+            self.seconds_per_image += self.SMOOTHING * (measured - self.seconds_per_image)
+
+    @property
+    def size(self):
+        """int: Number of images for the next chunk."""
+        if self.seconds_per_image is None:
+            return self.INITIAL_SIZE
+        if self.seconds_per_image <= 0:
+            return self.MAX_SIZE
+        return max(1, min(self.MAX_SIZE, int(self.TARGET_SECONDS / self.seconds_per_image)))
+
+
+class WorkQueue:
+    """
+    Inputs of a batch run, handed out in scheduling order.
+
+    With ``largest-first`` ordering, all inputs are probed up front. In
+    ``input`` order, inputs are taken lazily from the iterable and probed
+    one at a time as they are taken, so the queue streams; with a memory
+    budget, up to LOOKAHEAD inputs past the head are taken ahead.
+
+    Attributes:
+        probed (bool): True if all inputs were probed and ``total_pixels`` is known
+        total_pixels (int): Pixels in all probed inputs, None if not probed
+    """
+
+    ORDERS = ("largest-first", "input")
+
+    def __init__(self, inputs, order="largest-first", memory_budget=None,
+                 footprint=estimate_footprint):
+        """
+        Initialize the queue.
+
+        Args:
+            inputs (iterable): Image paths or ``InMemoryImage`` objects
+            order (str, optional): One of ORDERS. Defaults to "largest-first".
+            memory_budget (int, optional): Bytes the images in flight may use
+                together, see ``take``. Defaults to None (no limit).
+            footprint (callable, optional): Estimates the bytes needed for an
+                ``ImageInfo``. Defaults to ``estimate_footprint``.
+
+        Raises:
+            ValueError: If the order is unknown
+        """
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown order: {order}")
+
+        self.memory_budget = memory_budget
+        self.footprint = footprint
+        self.total_pixels = None
+        self.probed = order != "input"
+        self._inputs = None
+        self._entries = deque()
+
+        if not self.probed:
+            self._inputs = iter(inputs)
+            return
+
+        entries = [(source, probe_image(source)) for source in inputs]
+        if order == "largest-first":
+            # Images that cannot be probed go last; the sort is stable
+            entries.sort(key=lambda entry: -entry[1].pixels if entry[1] else 0)
+        self._entries.extend(entries)
+        self.total_pixels = sum(info.pixels for _, info in entries if info)
+
+    def _fill(self):
+        """Take the next input from a lazy iterable; False when exhausted."""
+        if self._inputs is None:
+            return False
+        source = next(self._inputs, None)
+        if source is None:
+            self._inputs = None
+            return False
+        # A header read is cheap next to processing, and chunking needs the size
+        self._entries.append((source, probe_image(source)))
+        return True
+
+    def peek(self):
+        """
+        Get the next input without taking it.
+
+        Returns:
+            tuple: ``(input, info)``, or None if empty
+        """
+        if not self._entries and not self._fill():
+            return None
+        return self._entries[0]
+
+    def take(self, in_flight_bytes=0):
+        """
+        Take the next input that fits the memory budget.
+
+        Inputs are taken in order, except that while the head does not fit
+        next to the images in flight, the first smaller one within
+        LOOKAHEAD that fits is taken instead. With nothing in flight, the
+        head is always taken, even if it alone exceeds the budget.
+
+        Args:
+            in_flight_bytes (int, optional): Estimated footprint of the images
+                in flight. Defaults to 0.
+
+        Returns:
+            tuple: ``(input, info, footprint)``, or None if the queue is empty or
+            nothing fits until images in flight complete
+        """
+        if not self._entries and not self._fill():
+            return None
+
+        index = 0
+        if self.memory_budget is not None and in_flight_bytes:
+            while len(self._entries) <= LOOKAHEAD and self._fill():
+                pass
+            free = self.memory_budget - in_flight_bytes
+            for index, (_, info) in enumerate(self._entries):
+                if self.footprint(info) <= free:
+                    break
+                if index >= LOOKAHEAD:
+                    return None
+            else:
+                return None
+
+        source, info = self._entries[index]
+        del self._entries[index]
+        return source, info, self.footprint(info)
+
+    def take_chunk(self, count, in_flight_bytes=0):
+        """
+        Take small inputs to process together in one task.
+
+        Consecutive inputs of at most SMALL_IMAGE_PIXELS are grouped, as long
+        as they fit the memory budget. A larger input, or one whose header
+        cannot be read, is always taken alone.
+
+        Args:
+            count (int): Most inputs to take
+            in_flight_bytes (int, optional): Estimated footprint of the images
+                in flight. Defaults to 0.
+
+        Returns:
+            list: ``(input, info, footprint)`` tuples; empty if the queue is
+            empty or nothing fits until images in flight complete
+        """
+        entry = self.take(in_flight_bytes)
+        if entry is None:
+            return []
+
+        chunk = [entry]
+        if not is_small(entry[1]):
+            return chunk
+
+        in_flight_bytes += entry[2]
+        while len(chunk) < count and (self._entries or self._fill()):
+            source, info = self._entries[0]
+            if not is_small(info):
+                break
+            footprint = self.footprint(info)
+            if self.memory_budget is not None and in_flight_bytes + footprint > self.memory_budget:
+                break
+            self._entries.popleft()
+            chunk.append((source, info, footprint))
+            in_flight_bytes += footprint
+        return chunk
+
+    def __bool__(self):
+        return bool(self._entries) or self._fill()
@@ -0,0 +1,167 @@
+"""
+Shared memory transport for PixelCraft batch runs.
+
+In-memory images sent to worker processes, and the processed images sent
+back, would otherwise be pickled through the pool's pipes: copied on both
+sides and held twice while in transit. Instead, the parent process writes
+each encoded image into a slot of a shared memory ring and passes a small
+handle; the worker decodes straight from the slot and writes its encoded
+output back into the same slot.
+
+The parent creates and unlinks every segment, so a worker that crashes
+never leaks one; workers only attach for the duration of a task.
+"""
+
+from collections import deque
+from multiprocessing import shared_memory
+
+# Smallest slot; slots grow in powers of two to fit the largest image seen
+MIN_SLOT_BYTES = 2 ** 20
+
+
+class SharedImage:
+    """
+    Handle of an encoded image in a shared memory slot.
+
+    Passed to worker processes in place of an ``InMemoryImage``.
+
+    Attributes:
+        name (str): File name of the image
+        segment (str): Name of the shared memory segment holding the slot
+        index (int): Slot index in the ring
+        size (int): Length of the encoded image in bytes
+    """
+
+    def __init__(self, name, segment, index, size):
+        self.name = name
+        self.segment = segment
+        self.index = index
+        self.size = size
+
+    def attach(self):
+        """
+        Attach to the slot in a worker process.
+
+        Returns:
+            _AttachedSlot: Context manager giving access to the slot
+        """
+        return _AttachedSlot(self)
+
+
+class _AttachedSlot:
+    """A slot attached in a worker process for the duration of one task."""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.memory = None
+        self.data = None
+
+    def __enter__(self):
+        self.memory = shared_memory.SharedMemory(self.handle.segment)
+        self.data = self.memory.buf[:self.handle.size]
+        return self
+
+    def write_result(self, result):
+        """
+        Move the encoded output of a result into the slot, if it fits.
+
+        Args:
+            result (BatchResult): Result of processing the slot's image
+        """
+        output = result.output_data
+        if output is None or len(output) > self.memory.size:
+            return
+        # The input was fully decoded, so its bytes can be overwritten
+        self.data.release()
+        self.memory.buf[:len(output)] = output
+        result.output_data = None
+        result.shared_output = len(output)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.data.release()
+        self.memory.close()
+        return False
+
+
+class SharedMemoryRing:
+    """
+    A fixed number of reusable shared memory slots, owned by the parent.
+
+    Slots are handed out in ring order and recycled once their task
+    completes. Each slot is a shared memory segment that grows to fit the
+    largest image it has carried, so shared memory use is bounded by the
+    number of slots times the largest encoded image in flight.
+    """
+
+    def __init__(self, slots):
+        """
+        Initialize the ring; segments are created on first use.
+
+        Args:
+            slots (int): Number of slots, i.e. images in flight at once
+        """
+        self._segments = [None] * slots
+        self._free = deque(range(slots))
+
+    def put(self, name, data):
+        """
+        Copy an encoded image into a free slot.
+
+        Args:
+            name (str): File name of the image
+            data (bytes): Encoded image; any buffer
+
+        Returns:
+            SharedImage: Handle of the slot, or None if no slot is free
+        """
+        if not self._free:
+            return None
+
+        index = self._free.popleft()
+        data = memoryview(data).cast("B")
+        segment = self._segments[index]
+        if segment is None or segment.size < len(data):
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+            capacity = max(MIN_SLOT_BYTES, 1 << (len(data) - 1).bit_length())
+            segment = self._segments[index] = shared_memory.SharedMemory(create=True, size=capacity)
+
+        segment.buf[:len(data)] = data
+        return SharedImage(name, segment.name, index, len(data))
+
+    def read(self, handle, size):
+        """
+        Copy data written to a slot by a worker.
+
+        Args:
+            handle (SharedImage): Handle of the slot
+            size (int): Number of bytes to read
+
+        Returns:
+            bytes: The data
+        """
+        return bytes(self._segments[handle.index].buf[:size])
+
+    def release(self, handle):
+        """
+        Return a slot to the ring.
+
+        Args:
+            handle (SharedImage): Handle of the slot
+        """
+        self._free.append(handle.index)
+
+    @property
+    def available(self):
+        """int: Number of free slots."""
+        return len(self._free)
+
+    def close(self):
+        """Unlink all segments; the ring must not be used afterwards."""
+        for index, segment in enumerate(self._segments):
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+                self._segments[index] = None
+        self._free.clear()
@@ -0,0 +1,305 @@
+"""
+Watch-folder support for PixelCraft batch runs.
+
+An ingest pipeline drops images into a folder continuously. Rather than
+rescanning everything on a timer, ``FolderWatcher`` reports the images
+that are new or changed once their writer is done with them. On Linux it
+waits on inotify, so it uses no CPU while the folder is idle; elsewhere,
+or if inotify is unavailable, it compares directory listings at a short
+interval.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import sys
+import time
+
+from .engine import IMAGE_EXTENSIONS
+
+# inotify event bits, see inotify(7)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+
+_EVENT = struct.Struct("iIII")
+
+
+def file_signature(path):
+    """
+    Get what identifies a version of a file.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        tuple: ``(size, mtime_ns)``, or None if it is not a regular file
+    """
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(info.st_mode):
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+def is_stale(input_path, output_path):
+    """
+    Check whether an image has to be (re)processed.
+
+    Args:
+        input_path (str): Path of the input image
+        output_path (str): Path its processed image is saved to
+
+    Returns:
+        bool: True if the output is missing or older than the input
+    """
+    try:
+        return os.stat(output_path).st_mtime_ns < os.stat(input_path).st_mtime_ns
+    except OSError:
+        return True
+
+
+class _InotifyBackend:
+    """Directory change notifications from the Linux kernel."""
+
+    # Deletions and moves out are reported too, so handled files can be forgotten
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, directories):
+        """
+        Start watching directories.
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                os.close(self._fd)
+                raise OSError(error, f"Cannot watch {directory}")
+            self._directories[wd] = directory
+
+    def changes(self, timeout):
+        """
+        Wait for changes.
+
+        Args:
+            timeout (float): Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            set: Paths of changed files; None if events were lost and the
+            directories have to be rescanned
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        paths = set()
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return paths
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = _EVENT.unpack_from(buffer, offset)
+                offset += _EVENT.size
+                name = buffer[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if name and wd in self._directories:
+                    paths.add(os.path.join(self._directories[wd], os.fsdecode(name)))
+
+    def close(self):
+        """Stop watching."""
+        os.close(self._fd)
+
+
+class _PollingBackend:
+    """Directory changes found by comparing listings."""
+
+    def __init__(self, directories, interval):
+        self._directories = directories
+        self._interval = interval
+        self._signatures = self._scan()
+
+    def _scan(self):
+        """Get the signature of every file in the directories."""
+        signatures = {}
+        for directory in self._directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        info = entry.stat()
+                        signatures[entry.path] = (info.st_size, info.st_mtime_ns)
+                except OSError:
+                    continue
+        return signatures
+
+    def changes(self, timeout):
+        """Wait for changes; see ``_InotifyBackend.changes``."""
+        time.sleep(self._interval if timeout is None else min(timeout, self._interval))
+        signatures = self._scan()
+        changed = {path for path, signature in signatures.items()
+                   if self._signatures.get(path) != signature}
+        changed.update(self._signatures.keys() - signatures.keys())
+        self._signatures = signatures
+        return changed
+
+    def close(self):
+        """Stop watching."""
+
+
+class FolderWatcher:
+    """
+    Reports images that appear or change in directories.
+
+    A file is reported once it has been left alone for ``settle`` seconds
+    with the same size and modification time, so partially written files
+    are not picked up. A file is reported again only after it changes, and
+    is forgotten once it is deleted or moved away.
+    """
+
+    def __init__(self, directories, extensions=IMAGE_EXTENSIONS, settle=0.25,
+                 poll_interval=0.5, inotify=None):
+        """
+        Start watching.
+
+        Args:
+            directories (list): Directories to watch; subdirectories are not watched
+            extensions (tuple, optional): Lower-case file extensions to report.
+                Defaults to IMAGE_EXTENSIONS.
+            settle (float, optional): Seconds a file must stay unchanged.
+                Defaults to 0.25.
+            poll_interval (float, optional): Seconds between listings when
+                polling. Defaults to 0.5.
+            inotify (bool, optional): Use inotify; None uses it where available
+                and falls back to polling. Defaults to None.
+
+        Raises:
+            OSError: If inotify is requested but not available
+        """
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.extensions = extensions
+        self.settle = settle
+        self._pending = {}
+        self._reported = {}
+
+        self.backend = None
+        if inotify is not False and sys.platform.startswith("linux"):
+            try:
+                self.backend = _InotifyBackend(self.directories)
+            except (OSError, AttributeError):
+                if inotify:
+                    raise
+        if self.backend is None:
+            self.backend = _PollingBackend(self.directories, poll_interval)
+
+    @property
+    def uses_inotify(self):
+        """bool: True if the kernel reports changes, False if polling."""
+        return isinstance(self.backend, _InotifyBackend)
+
+    def mark_reported(self, path):
+        """
+        Record a file as handled in its current version.
+
+        Images listed after the watcher started can be marked, so that they
+        are reported again only if they change after being listed.
+
+        Args:
+            path (str): File path
+        """
+        self._reported[os.path.abspath(path)] = file_signature(path)
+
+    def _track(self, paths, now):
+        """Restart the settle time of changed files."""
+        for path in paths:
+            if os.path.splitext(path)[1].lower() in self.extensions:
+                self._pending[path] = (now + self.settle, file_signature(path))
+
+    def _rescan(self, now):
+        """Track every file after lost events."""
+        for directory in self.directories:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            self._track([os.path.join(directory, name) for name in names], now)
+        # Handled files that are gone are forgotten once they settle
+        self._track(list(self._reported), now)
+
+    def wait(self, timeout=None):
+        """
+        Wait for new or changed images.
+
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to None (until
+                there is something to report).
+
+        Returns:
+            list: Sorted paths of settled images; empty if the wait timed out
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            ready = []
+            for path, (settled_at, signature) in list(self._pending.items()):
+                if settled_at > now:
+                    continue
+                current = file_signature(path)
+                if current != signature:
+                    # Still being written, or replaced; wait for it to settle again
+                    self._pending[path] = (now + self.settle, current)
+                    continue
+                del self._pending[path]
+                if current is None:
+                    self._reported.pop(path, None)
+                elif self._reported.get(path) != current:
+                    self._reported[path] = current
+                    ready.append(path)
+            if ready:
+                return sorted(ready)
+
+            # Sleep until the next file settles, new events or the deadline
+            wake = min((settled_at for settled_at, _ in self._pending.values()), default=None)
+            if deadline is not None:
+                if now >= deadline:
+                    return []
+                wake = deadline if wake is None else min(wake, deadline)
+            changes = self.backend.changes(None if wake is None else max(0.0, wake - now))
+            if changes is None:
+                self._rescan(time.monotonic())
+            else:
+                self._track(changes, time.monotonic())
+
+    def close(self):
+        """Stop watching."""
+        self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,5 +1,9 @@
-# Import essential modules
-from .filters import ImageFilters
-from .similarity import calculate_similarity
+# Export essential modules; they are imported on first use
+from ..utils.lazy import lazy_exports
 
-__all__ = ['ImageFilters', 'calculate_similarity']
\ No newline at end of file
+__all__ = ['ImageFilters', 'calculate_similarity']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ImageFilters': '.filters',
+    'calculate_similarity': '.similarity',
+})
\ No newline at end of file
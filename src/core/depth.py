@@ -0,0 +1,40 @@
+"""
+Bit depth helpers for PixelCraft.
+
+Images may be 8-bit, 16-bit or floating point. Integer images span the
+full range of their type; floating point images are taken to span 0.0-1.0.
+"""
+
+import numpy as np
+import cv2
+
+
+def value_range(dtype):
+    """
+    Get the largest intensity of an image type.
+
+    Args:
+        dtype (numpy.dtype): Image data type
+
+    Returns:
+        int or float: 255 for uint8, 65535 for uint16, 1.0 for floating point
+    """
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        return int(np.iinfo(dtype).max)
+    return 1.0
+
+
+def to_uint8(image):
+    """
+    Scale an image to 8 bits, e.g. for display.
+
+    Args:
+        image (numpy.ndarray): Image of any supported depth
+
+    Returns:
+        numpy.ndarray: The image itself if it is 8-bit, otherwise an 8-bit copy
+    """
+    if image.dtype == np.uint8:
+        return image
+    return cv2.convertScaleAbs(image, alpha=255.0 / value_range(image.dtype))
@@ -0,0 +1,135 @@
+"""
+Difference images for PixelCraft.
+
+This module computes the absolute difference between an original and a
+processed image, normalizes it for display and caches both so that the
+difference view and the similarity score share a single computation.
+"""
+
+import numpy as np
+import cv2
+
+from .depth import value_range
+from .similarity import similarity_from_difference
+from ..utils.instrumentation import instrumentation, timed
+
+
+@timed("similarity.difference")
+def absolute_difference(original_image, processed_image):
+    """
+    Calculate the per-pixel absolute difference of two images.
+
+    Args:
+        original_image (numpy.ndarray): Original image
+        processed_image (numpy.ndarray): Processed image
+
+    Returns:
+        numpy.ndarray: Absolute difference image
+    """
+    return cv2.absdiff(original_image, processed_image)
+
+
+@timed("similarity.normalize")
+def normalize_difference(difference):
+    """
+    Stretch a difference image so its largest value maps to the top of its range.
+
+    8-bit images are stretched through a 256-entry lookup table, so only one
+    pass over the image is needed after finding the maximum.
+
+    Args:
+        difference (numpy.ndarray): Absolute difference image
+
+    Returns:
+        numpy.ndarray: Normalized difference image of the same type
+    """
+    max_value = difference.max() if difference.size else 0
+    if max_value == 0:
+        return difference
+
+    if difference.dtype != np.uint8:
+        return cv2.normalize(difference, None, alpha=value_range(difference.dtype),
+                             norm_type=cv2.NORM_INF)
+
+    max_value = int(max_value)
+    lut = (np.arange(256, dtype=np.uint32) * 255 // max_value).clip(0, 255).astype(np.uint8)
+    return cv2.LUT(difference, lut)
+
+
+class DifferenceCache:
+    """
+    Cache of the difference between one original and one processed image.
+
+    The cache is keyed on the identity of the two arrays, so images must not
+    be modified in place after being passed in. The cached buffers are marked
+    read-only to make accidental modification fail loudly.
+    """
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self.original_image = None
+        self.processed_image = None
+        self._difference = None
+        self._normalized = None
+
+    def clear(self):
+        """Drop the cached images and results."""
+        self.original_image = None
+        self.processed_image = None
+        self._difference = None
+        self._normalized = None
+
+    def difference(self, original_image, processed_image):
+        """
+        Get the absolute difference of two images, computing it at most once.
+
+        Args:
+            original_image (numpy.ndarray): Original image
+            processed_image (numpy.ndarray): Processed image
+
+        Returns:
+            numpy.ndarray: Read-only absolute difference image
+        """
+        if original_image is not self.original_image or processed_image is not self.processed_image:
+            instrumentation.count("difference_cache.misses")
+            self.clear()
+            self._difference = absolute_difference(original_image, processed_image)
+            self._difference.flags.writeable = False
+            self.original_image = original_image
+            self.processed_image = processed_image
+        else:
+            instrumentation.count("difference_cache.hits")
+
+        return self._difference
+
+    def normalized(self, original_image, processed_image):
+        """
+        Get the display-normalized difference of two images.
+
+        Args:
+            original_image (numpy.ndarray): Original image
+            processed_image (numpy.ndarray): Processed image
+
+        Returns:
+            numpy.ndarray: Read-only normalized difference image
+        """
+        difference = self.difference(original_image, processed_image)
+        if self._normalized is None:
+            self._normalized = normalize_difference(difference)
+            self._normalized.flags.writeable = False
+
+        return self._normalized
+
+    def similarity(self, original_image, processed_image, sensitivity):
+        """
+        Calculate the similarity percentage from the cached difference.
+
+        Args:
+            original_image (numpy.ndarray): Original image
+            processed_image (numpy.ndarray): Processed image
+            sensitivity (int): Sensitivity value (1, 2, 4, 16, 32, 64, 128, 255)
+
+        Returns:
+            int: Similarity percentage (0-100)
+        """
+        return similarity_from_difference(self.difference(original_image, processed_image), sensitivity)
@@ -1,37 +1,117 @@
 import numpy as np
 import cv2
 
+from .depth import value_range
+from ..utils.instrumentation import instrumentation
+
 class ImageFilters:
     """
     A collection of image processing filters.
+    
+    Filters keep the data type of their input, so 16-bit and floating point
+    images are processed at full precision. Floating point images are taken
+    to span 0.0-1.0.
     """
     
+    # Filter names mapped to the methods implementing them
+    FILTERS = {
+        "average": "average_filter",
+        "negative": "negative_filter",
+        "sharpen": "sharpen_filter",
+        "laplacian": "laplacian_filter",
+        "logarithm": "logarithm_filter",
+    }
+    
+    @classmethod
+    def apply_filter(cls, image, filter_name, luminance=False, **params):
+        """
+        Apply a filter by name.
+        
+        Color (BGR) images are filtered on all channels at once, without
+        splitting them. With ``luminance``, only the brightness of a color
+        image is filtered and its colors are kept.
+        
+        Args:
+            image (numpy.ndarray): Input image, grayscale or BGR
+            filter_name (str): Name of the filter, case insensitive (e.g. "Average")
+            luminance (bool, optional): Filter only the luminance of color images.
+                Defaults to False.
+            **params: Filter parameters, e.g. ``kernel_size`` or ``strength``
+            
+        Returns:
+            numpy.ndarray: Filtered image
+            
+        Raises:
+            ValueError: If the filter name is unknown
+        """
+        name = filter_name.lower()
+        method = cls.FILTERS.get(name)
+        if method is None:
+            raise ValueError(f"Unknown filter: {filter_name}")
+        
+        with instrumentation.timer(f"filter.{name}"):
+            if luminance and image.ndim == 3 and image.shape[2] == 3:
+                return cls.filter_luminance(image, getattr(cls, method), **params)
+            return getattr(cls, method)(image, **params)
+    
+    @staticmethod
+    def filter_luminance(image, function, **params):
+        """
+        Apply a filter to the luminance of a BGR image only.
+        
+        Args:
+            image (numpy.ndarray): BGR input image
+            function (callable): Filter function
+            **params: Filter parameters
+            
+        Returns:
+            numpy.ndarray: Filtered BGR image
+        """
+        ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
+        luma = function(cv2.extractChannel(ycrcb, 0), **params)
+        cv2.insertChannel(luma, ycrcb, 0)
+        return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+    
     @staticmethod
-    def average_filter(image):
+    def average_filter(image, kernel_size=5):
         """
         Apply average (blur) filter to an image.
         
         Args:
             image (numpy.ndarray): Input image
+            kernel_size (int, optional): Width of the square averaging kernel,
+                a positive odd number. Defaults to 5.
             
         Returns:
             numpy.ndarray: Filtered image
+            
+        Raises:
+            ValueError: If the kernel size is not a positive odd integer
         """
-        kernel = np.ones((5, 5), np.float32) / 25
+        # An even kernel has no center pixel and shifts the image
+        if (not isinstance(kernel_size, (int, np.integer)) or isinstance(kernel_size, bool)
+                or kernel_size < 1 or kernel_size % 2 == 0):
+            raise ValueError(f"kernel_size must be a positive odd integer, got {kernel_size!r}")
+        kernel = np.ones((kernel_size, kernel_size), np.float32) / (kernel_size * kernel_size)
         return cv2.filter2D(src=image, ddepth=-1, kernel=kernel)
     
     @staticmethod
-    def sharpen_filter(image):
+    def sharpen_filter(image, strength=5):
         """
         Apply sharpening filter to an image.
         
         Args:
             image (numpy.ndarray): Input image
+            strength (int, optional): Sharpening strength (1-10). The default of 5
+                gives the classic 3x3 sharpening kernel. Defaults to 5.
             
         Returns:
             numpy.ndarray: Filtered image
         """
-        kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
+        amount = strength / 5.0
+        kernel = np.array([[0, -amount, 0],
+                           [-amount, 1 + 4 * amount, -amount],
+                           [0, -amount, 0]], np.float32)
         return cv2.filter2D(src=image, ddepth=-1, kernel=kernel)
     
     @staticmethod
@@ -45,7 +125,10 @@ class ImageFilters:
         Returns:
             numpy.ndarray: Filtered image
         """
-        return 255 - image
+        if np.issubdtype(image.dtype, np.unsignedinteger):
+            # Same result as max - image, without numpy's temporary buffers
+            return cv2.bitwise_not(image)
+        return image.dtype.type(value_range(image.dtype)) - image
     
     @staticmethod
     def laplacian_filter(image):
@@ -66,12 +149,25 @@ class ImageFilters:
         """
         Apply logarithm filter to an image.
         
+        Pixels whose logarithm, on the 8-bit intensity scale, exceeds the
+        threshold become white and all others black.
+        
         Args:
             image (numpy.ndarray): Input image
             
         Returns:
             numpy.ndarray: Filtered image
         """
-        log_image = np.uint8(np.log1p(image))
         threshold = 1
-        return cv2.threshold(log_image, threshold, 255, cv2.THRESH_BINARY)[1]
\ No newline at end of file
+        if image.dtype == np.uint8:
+            log_image = np.uint8(np.log1p(image))
+            return cv2.threshold(log_image, threshold, 255, cv2.THRESH_BINARY)[1]
+        
+        # floor(log1p(v)) > threshold holds exactly for v >= e^(threshold + 1) - 1;
+        # compare against that limit scaled to the image range instead of
+        # taking logarithms of every pixel
+        top = value_range(image.dtype)
+        limit = np.expm1(threshold + 1) * top / 255
+        result = np.zeros_like(image)
+        result[image >= limit] = top
+        return result
\ No newline at end of file
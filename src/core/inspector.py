@@ -0,0 +1,189 @@
+"""
+Pixel inspection for PixelCraft.
+
+This module provides constant-time lookups of pixel values and local
+neighborhood statistics, backed by integral images that are computed once
+per image.
+"""
+
+import math
+
+import numpy as np
+import cv2
+
+# Integral images of 8-bit images are kept as uint32 and evaluated with
+# wrap-around arithmetic. This is exact as long as a single window sum fits
+# in 32 bits, which holds for windows up to 255x255 pixels. Deeper images
+# use float64 integrals instead.
+_MASK = 0xFFFFFFFF
+
+
+def pixel_value(image, x, y):
+    """
+    Get the value of a pixel.
+
+    Args:
+        image (numpy.ndarray): Grayscale or color image
+        x (int): Column
+        y (int): Row
+
+    Returns:
+        int, float or tuple: The value, or a tuple of channel values for color images
+    """
+    value = image[y, x]
+    return value.item() if image.ndim == 2 else tuple(value.tolist())
+
+
+def integral_images(image):
+    """
+    Compute the integral and squared integral images of an image.
+
+    Both results have one extra leading row and column of zeros, so the sum
+    over rows ``y0:y1`` and columns ``x0:x1`` is
+    ``I[y1, x1] - I[y0, x1] - I[y1, x0] + I[y0, x0]``.
+
+    Args:
+        image (numpy.ndarray): Input image
+
+    Returns:
+        tuple: ``(integral, squared_integral)`` as uint32 arrays for 8-bit
+        images, float64 arrays otherwise
+    """
+    if image.dtype != np.uint8:
+        return cv2.integral2(image, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+
+    height, width = image.shape[:2]
+    shape = (height + 1, width + 1) + image.shape[2:]
+
+    # OpenCV accumulates 32-bit sums with the same wrap-around
+    integral = cv2.integral(image, sdepth=cv2.CV_32S).view(np.uint32)
+
+    # OpenCV has no 32-bit integer squared integral, so build it with NumPy
+    squared = np.zeros(shape, dtype=np.uint32)
+    np.square(image, dtype=np.uint32, out=squared[1:, 1:])
+    np.cumsum(squared[1:, 1:], axis=0, dtype=np.uint32, out=squared[1:, 1:])
+    np.cumsum(squared[1:, 1:], axis=1, dtype=np.uint32, out=squared[1:, 1:])
+
+    return integral, squared
+
+
+class NeighborhoodStatistics:
+    """
+    Local mean and standard deviation of an image in constant time.
+
+    For color images the values of all channels in the window are combined.
+    """
+
+    def __init__(self, image):
+        """
+        Precompute the integral images.
+
+        Args:
+            image (numpy.ndarray): Image to compute statistics for
+        """
+        self.image = image
+        self.height, self.width = image.shape[:2]
+        self.channels = image.shape[2] if image.ndim == 3 else 1
+        self.integral, self.squared = integral_images(image)
+
+    def window(self, x, y, radius):
+        """
+        Get the mean and standard deviation in a square window.
+
+        The window is clipped to the image bounds.
+
+        Args:
+            x (int): Window center column
+            y (int): Window center row
+            radius (int): Window radius; the window is ``2 * radius + 1`` pixels wide
+
+        Returns:
+            tuple: ``(mean, std)``
+        """
+        x0, x1 = max(0, x - radius), min(self.width, x + radius + 1)
+        y0, y1 = max(0, y - radius), min(self.height, y + radius + 1)
+        count = (x1 - x0) * (y1 - y0) * self.channels
+
+        total = self._box_sum(self.integral, x0, y0, x1, y1)
+        squared = self._box_sum(self.squared, x0, y0, x1, y1)
+
+        mean = total / count
+        return mean, math.sqrt(max(squared / count - mean * mean, 0.0))
+
+    @staticmethod
+    def _box_sum(integral, x0, y0, x1, y1):
+        """Sum over a box of an integral image, using wrap-around arithmetic."""
+        if integral.dtype == np.float64:
+            return float((integral[y1, x1] - integral[y0, x1] -
+                          integral[y1, x0] + integral[y0, x0]).sum())
+
+        if integral.ndim == 2:
+            return (int(integral[y1, x1]) - int(integral[y0, x1]) -
+                    int(integral[y1, x0]) + int(integral[y0, x0])) & _MASK
+
+        # Color images have one integral per channel, each wrapping separately
+        corners = (integral[y1, x1], integral[y0, x1], integral[y1, x0], integral[y0, x0])
+        return sum((int(a) - int(b) - int(c) + int(d)) & _MASK for a, b, c, d in zip(*corners))
+
+
+class PixelInspector:
+    """
+    Hover inspection for an original/processed image pair.
+
+    All integral images are computed when the inspector is created, so every
+    call to ``inspect`` only reads a handful of array elements.
+    """
+
+    def __init__(self, original_image, processed_image, difference, window_size=7):
+        """
+        Initialize the inspector.
+
+        Args:
+            original_image (numpy.ndarray): Original image
+            processed_image (numpy.ndarray): Processed image
+            difference (numpy.ndarray): Absolute difference of the two images
+            window_size (int, optional): Neighborhood width in pixels. Defaults to 7.
+        """
+        self.radius = window_size // 2
+        self.window_size = 2 * self.radius + 1
+        self.images = {
+            "original": NeighborhoodStatistics(original_image),
+            "processed": NeighborhoodStatistics(processed_image),
+            "difference": NeighborhoodStatistics(difference),
+        }
+        self.height, self.width = original_image.shape[:2]
+
+    def contains(self, x, y):
+        """
+        Check whether a position lies inside the images.
+
+        Args:
+            x (int): Column
+            y (int): Row
+
+        Returns:
+            bool: True if the position is inside the images
+        """
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def inspect(self, x, y):
+        """
+        Get pixel values and neighborhood statistics at a position.
+
+        Args:
+            x (int): Column
+            y (int): Row
+
+        Returns:
+            dict: For each of ``original``, ``processed`` and ``difference``, a
+            dict with ``value`` (see ``pixel_value``), ``mean`` and ``std``; None if
+            outside the images
+        """
+        if not self.contains(x, y):
+            return None
+
+        info = {}
+        for name, stats in self.images.items():
+            mean, std = stats.window(x, y, self.radius)
+            info[name] = {"value": pixel_value(stats.image, x, y), "mean": mean, "std": std}
+        return info
@@ -0,0 +1,135 @@
+"""
+Image pyramid for PixelCraft.
+
+This module provides a multi-resolution (mipmap) representation of an image
+so that views can render any zoom level from a level close to the screen
+resolution instead of from the full-size image.
+"""
+
+import math
+
+import cv2
+
+
+class ImagePyramid:
+    """
+    A precomputed stack of progressively halved copies of an image.
+
+    Level 0 is the image itself. Every following level is half the width and
+    height of the previous one, down to ``min_size`` pixels on the longest
+    side. Coordinates passed to and returned from the pyramid are always in
+    the logical image space, so callers never need to know which level is
+    used for rendering.
+    """
+
+    def __init__(self, image, min_size=256, scale=1.0):
+        """
+        Build the pyramid.
+
+        Args:
+            image (numpy.ndarray): Level 0 image
+            min_size (int, optional): Longest side at which halving stops. Defaults to 256.
+            scale (float, optional): Size of ``image`` relative to the logical image.
+                Values below 1.0 describe a proxy of a larger image. Defaults to 1.0.
+
+        Raises:
+            ValueError: If the image is empty
+        """
+        if image is None or image.size == 0:
+            raise ValueError("Cannot build a pyramid from an empty image")
+
+        self.scale = float(scale)
+        self.levels = [image]
+
+        current = image
+        while max(current.shape[:2]) > min_size:
+            height, width = current.shape[:2]
+            current = cv2.resize(current, (max(1, width // 2), max(1, height // 2)),
+                                 interpolation=cv2.INTER_AREA)
+            self.levels.append(current)
+
+    @property
+    def base(self):
+        """numpy.ndarray: The level 0 image."""
+        return self.levels[0]
+
+    @property
+    def width(self):
+        """float: Width of the logical image."""
+        return self.levels[0].shape[1] / self.scale
+
+    @property
+    def height(self):
+        """float: Height of the logical image."""
+        return self.levels[0].shape[0] / self.scale
+
+    def level_for_zoom(self, zoom):
+        """
+        Choose the pyramid level to render a given zoom factor from.
+
+        The coarsest level that still provides at least one pixel per screen
+        pixel is selected, so the view is never rendered from fewer pixels
+        than it displays.
+
+        Args:
+            zoom (float): Screen pixels per logical image pixel
+
+        Returns:
+            int: Index into ``levels``
+        """
+        # Screen pixels covered by one level 0 pixel
+        density = zoom / self.scale
+        level = 0
+        while level + 1 < len(self.levels) and density * (2 ** (level + 1)) <= 1.0:
+            level += 1
+        return level
+
+    def proxy(self, max_size):
+        """
+        Get the largest level that fits within a size limit.
+
+        Args:
+            max_size (int): Maximum length of the longest side in pixels
+
+        Returns:
+            tuple: ``(image, scale)`` where ``scale`` is the size of ``image``
+            relative to the logical image
+        """
+        for level in self.levels:
+            if max(level.shape[:2]) <= max_size:
+                break
+        return level, level.shape[1] / self.width
+
+    def region(self, level, left, top, right, bottom):
+        """
+        Get the pixels of a level covering a logical rectangle.
+
+        The returned array is a view into the level, not a copy. Because level
+        pixels are coarser than logical pixels, the covered rectangle is
+        snapped outwards to whole level pixels and returned alongside the data.
+
+        Args:
+            level (int): Pyramid level
+            left (float): Left edge in logical coordinates
+            top (float): Top edge in logical coordinates
+            right (float): Right edge in logical coordinates
+            bottom (float): Bottom edge in logical coordinates
+
+        Returns:
+            tuple: ``(pixels, (left, top, right, bottom))`` where the rectangle is
+            the logical area actually covered by ``pixels``, or ``(None, None)``
+            if the rectangle does not intersect the image
+        """
+        data = self.levels[level]
+        height, width = data.shape[:2]
+        fx = width / self.width
+        fy = height / self.height
+
+        x0 = max(0, int(left * fx))
+        y0 = max(0, int(top * fy))
+        x1 = min(width, math.ceil(right * fx))
+        y1 = min(height, math.ceil(bottom * fy))
+        if x0 >= x1 or y0 >= y1:
+            return None, None
+
+        return data[y0:y1, x0:x1], (x0 / fx, y0 / fy, x1 / fx, y1 / fy)
@@ -1,30 +1,73 @@
 import numpy as np
+import cv2
 
-def calculate_similarity(new_image, original_image, sensitivity):
+from .depth import value_range
+from ..utils.instrumentation import instrumentation, timed
+
+def similarity_band(sensitivity, dtype=np.uint8):
+    """
+    Get the largest pixel difference still counted as similar.
+
+    The band is the same fraction of the intensity range at every bit depth.
+
+    Args:
+        sensitivity (int): Sensitivity value (1, 2, 4, 16, 32, 64, 128, 255)
+        dtype (numpy.dtype, optional): Image data type. Defaults to uint8.
+
+    Returns:
+        int or float: Maximum absolute difference for a pixel to count as similar
+    """
+    top = value_range(dtype)
+    if isinstance(top, float):
+        return top / int(sensitivity)
+    return round(top/(int(sensitivity)))
+
+@timed("similarity.score")
+def similarity_from_difference(difference, sensitivity):
+    """
+    Calculate similarity percentage from a precomputed absolute difference image.
+
+    In color images a pixel counts as similar only if all its channels are.
+
+    Args:
+        difference (numpy.ndarray): Absolute difference between the two images
+        sensitivity (int): Sensitivity value (1, 2, 4, 16, 32, 64, 128, 255)
+
+    Returns:
+        int: Similarity percentage (0-100)
+    """
+    band = similarity_band(sensitivity, difference.dtype)
+    if difference.ndim == 2:
+        counter = np.count_nonzero(difference <= band)
+    elif difference.shape[2] == 3 and difference.dtype in (np.uint8, np.uint16, np.float32):
+        # Mark channels outside the band with 255; converting the mask to gray
+        # is nonzero wherever any channel is marked, without splitting channels
+        outside = cv2.threshold(difference, band, 255, cv2.THRESH_BINARY)[1]
+        counter = outside.shape[0] * outside.shape[1] - np.count_nonzero(
+            cv2.cvtColor(outside, cv2.COLOR_BGR2GRAY)
+        )
+    else:
+        counter = np.count_nonzero((difference <= band).all(axis=2))
+
+    pixels = difference.shape[0] * difference.shape[1]
+    return round(counter * 100 / pixels) if pixels else 100
+
+def calculate_similarity(new_image, original_image, sensitivity, difference=None):
     """
     Calculate similarity percentage between two images based on pixel difference.
-    
+
     Args:
         new_image (numpy.ndarray): Processed image
         original_image (numpy.ndarray): Original image
         sensitivity (int): Sensitivity value (1, 2, 4, 16, 32, 64, 128, 255)
-        
+        difference (numpy.ndarray, optional): Precomputed absolute difference of
+            the two images, e.g. from a DifferenceCache. Defaults to None.
+
     Returns:
         int: Similarity percentage (0-100)
     """
-    list1 = new_image.tolist()
-    size1 = new_image.size
-    x = len(list1)
-    y = int(size1/x)
-    counter = 0
-    range1 = round(255/(int(sensitivity)))
-    list2 = original_image.tolist()
-    
-    for i in range(0, x):
-        for j in range(0, y):
-            originalp = list2[i][j]
-            newp = list1[i][j]
-            if(originalp + range1 >= newp and originalp - range1 <= newp):
-                counter += 1
-                
-    return round(counter * 100 / (x * y))
\ No newline at end of file
+    if difference is None:
+        with instrumentation.timer("similarity.difference"):
+            difference = cv2.absdiff(new_image, original_image)
+
+    return similarity_from_difference(difference, sensitivity)
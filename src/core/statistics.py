@@ -0,0 +1,146 @@
+"""
+Image statistics for PixelCraft.
+
+This module computes intensity histograms and summary statistics of images.
+All statistics are derived from a single histogram pass over the image and
+cached per image, so repeated requests for the same array are free.
+"""
+
+import weakref
+
+import numpy as np
+import cv2
+
+from .depth import value_range
+from ..utils.instrumentation import instrumentation
+
+# Histogram bins for images deeper than 8 bits
+HISTOGRAM_BINS = 256
+
+
+class ImageStatistics:
+    """
+    Intensity histogram and summary statistics of an image.
+
+    For 8-bit images the histogram has one bin per intensity value. Deeper
+    images are binned into 256 bins across their range, and their minimum,
+    maximum, mean and standard deviation are computed from the pixels
+    themselves, so they keep the full precision of the image.
+
+    Attributes:
+        histogram (numpy.ndarray): Pixel count per intensity bin
+        count (int): Number of pixel values
+        minimum (int or float): Smallest intensity value
+        maximum (int or float): Largest intensity value
+        mean (float): Mean intensity
+        std (float): Standard deviation of the intensity
+        entropy (float): Shannon entropy of the histogram in bits
+    """
+
+    def __init__(self, histogram):
+        """
+        Derive the statistics from a histogram.
+
+        Args:
+            histogram (numpy.ndarray): Pixel count per intensity value
+        """
+        self.histogram = histogram
+        self.count = int(histogram.sum())
+
+        values = np.arange(len(histogram), dtype=np.float64)
+        occupied = np.flatnonzero(histogram)
+
+        if self.count == 0:
+            self.minimum = self.maximum = 0
+            self.mean = self.std = self.entropy = 0.0
+            return
+
+        self.minimum = int(occupied[0])
+        self.maximum = int(occupied[-1])
+
+        weights = histogram.astype(np.float64)
+        self.mean = float(values @ weights) / self.count
+        variance = float((values * values) @ weights) / self.count - self.mean ** 2
+        self.std = float(np.sqrt(max(variance, 0.0)))
+
+        probabilities = weights[occupied] / self.count
+        self.entropy = float(-(probabilities * np.log2(probabilities)).sum())
+
+    @classmethod
+    def from_image(cls, image):
+        """
+        Compute the statistics of an image in a single pass.
+
+        The values of all channels of a color image are counted together.
+
+        Args:
+            image (numpy.ndarray): Input image
+
+        Returns:
+            ImageStatistics: Statistics of the image
+        """
+        if image.ndim == 3:
+            # View the channels as extra columns of a single-channel image
+            image = image.reshape(image.shape[0], -1)
+        with instrumentation.timer("statistics.histogram"):
+            if image.dtype == np.uint8:
+                histogram = cv2.calcHist([image], [0], None, [256], [0, 256]).ravel().astype(np.int64)
+                return cls(histogram)
+
+            top = value_range(image.dtype)
+            if image.dtype == np.uint16:
+                histogram = cv2.calcHist([image], [0], None, [HISTOGRAM_BINS], [0, top + 1])
+            else:
+                histogram = np.histogram(image, HISTOGRAM_BINS, (0, top))[0]
+            statistics = cls(histogram.ravel().astype(np.int64))
+            if image.size:
+                minimum, maximum = cv2.minMaxLoc(image)[:2]
+                if isinstance(top, int):
+                    minimum, maximum = int(minimum), int(maximum)
+                mean, std = cv2.meanStdDev(image)
+                statistics.minimum, statistics.maximum = minimum, maximum
+                statistics.mean, statistics.std = float(mean[0, 0]), float(std[0, 0])
+            return statistics
+
+    def as_dict(self):
+        """
+        Get the summary statistics as a dictionary.
+
+        Returns:
+            dict: Summary statistics without the histogram
+        """
+        return {
+            "count": self.count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": round(self.mean, 4),
+            "std": round(self.std, 4),
+            "entropy": round(self.entropy, 4),
+        }
+
+
+# Statistics cached per image array, dropped when the array is garbage collected
+_cache = {}
+
+
+def get_statistics(image):
+    """
+    Get the statistics of an image, computing them at most once per array.
+
+    Images are treated as immutable: modifying an array in place after its
+    statistics have been requested leaves the cached statistics stale.
+
+    Args:
+        image (numpy.ndarray): Input image
+
+    Returns:
+        ImageStatistics: Statistics of the image
+    """
+    key = id(image)
+    entry = _cache.get(key)
+    if entry is not None and entry[0]() is image:
+        return entry[1]
+
+    statistics = ImageStatistics.from_image(image)
+    _cache[key] = (weakref.ref(image, lambda ref, key=key: _cache.pop(key, None)), statistics)
+    return statistics
@@ -5,12 +5,17 @@ This module contains all the graphical user interface components for the PixelCr
 image processing application.
 """
 
-# Import GUI components
-# These will be defined in future implementations
-from .main_window import MainWindow
-from .filter_panel import FilterPanel
-from .comparison_view import ComparisonView
-from .batch_processor import BatchProcessorView
+from ..utils.lazy import lazy_exports
+
+# GUI components are imported on first use, so importing this package does
+# not load PyQt5
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'MainWindow': '.main_window',
+    'FilterPanel': '.filter_panel',
+    'ComparisonView': '.comparison_view',
+    'BatchProcessorView': '.batch_processor',
+    'ZoomableImageView': '.image_viewer',
+})
 
 # Define what should be available when importing this package
 __all__ = [
@@ -18,6 +23,7 @@ __all__ = [
     'FilterPanel',
     'ComparisonView',
     'BatchProcessorView',
+    'ZoomableImageView',
     'initialize_gui'
 ]
 
@@ -31,4 +37,5 @@ def initialize_gui():
     Returns:
         MainWindow: The main application window instance
     """
+    from .main_window import MainWindow
     return MainWindow()
\ No newline at end of file
@@ -14,8 +14,8 @@ from PyQt5.QtWidgets import (QWidget, QDialog, QVBoxLayout, QHBoxLayout,
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize
 from PyQt5.QtGui import QIcon
 
-from ..core.filters import ImageFilters
-from ..utils.image_io import ImageIO
+from ..batch.engine import BatchEngine, IMAGE_EXTENSIONS
+from ..utils.config import get_config
 
 class BatchProcessorWorker(QThread):
     """
@@ -47,62 +47,33 @@ class BatchProcessorWorker(QThread):
         self.sensitivity = sensitivity
         self.output_dir = output_dir
         self.is_canceled = False
+        config = get_config()
+        self.engine = BatchEngine(filter_name, output_dir, name_template="{stem}_{filter}{ext}",
+                                  memory_budget=config.memory_budget(),
+                                  timeout=config.get("processing.image_timeout"),
+                                  retries=config.get("processing.io_retries", 2))
         
     def cancel(self):
         """Cancel the processing."""
         self.is_canceled = True
+        self.engine.cancel()
         
     def run(self):
         """Run the batch processing."""
-        # Initialize filters
-        filters = ImageFilters()
-        
         # Process each image
         total_images = len(self.image_paths)
         
-        for i, image_path in enumerate(self.image_paths):
-            # Check if canceled
-            if self.is_canceled:
-                break
-                
-            try:
-                # Update progress
-                progress = int((i / total_images) * 100)
-                self.progressChanged.emit(progress)
-                
-                # Load the image
-                image = ImageIO.read_image(image_path)
-                
-                # Apply the selected filter
-                if self.filter_name.lower() == "average":
-                    processed = filters.average_filter(image.copy())
-                elif self.filter_name.lower() == "sharpen":
-                    processed = filters.sharpen_filter(image.copy())
-                elif self.filter_name.lower() == "negative":
-                    processed = filters.negative_filter(image.copy())
-                elif self.filter_name.lower() == "laplacian":
-                    processed = filters.laplacian_filter(image.copy())
-                elif self.filter_name.lower() == "logarithm":
-                    processed = filters.logarithm_filter(image.copy())
-                else:
-                    self.processingError.emit(f"Unknown filter: {self.filter_name}", image_path)
-                    continue
+        for i, result in enumerate(self.engine.run(self.image_paths)):
+            if result.success:
+                self.imageProcessed.emit(result.output_path)
+            else:
+                self.processingError.emit(result.error, result.input_path)
                 
-                # Generate output path
-                filename = os.path.basename(image_path)
-                base_name, ext = os.path.splitext(filename)
-                output_path = os.path.join(self.output_dir, f"{base_name}_{self.filter_name}{ext}")
-                
-                # Save the processed image
-                success = ImageIO.save_image(processed, output_path)
-                
-                if success:
-                    self.imageProcessed.emit(output_path)
-                else:
-                    self.processingError.emit("Failed to save processed image", image_path)
-                    
-            except Exception as e:
-                self.processingError.emit(str(e), image_path)
+            # Update progress, weighted by pixel count if the image sizes are known
+            progress = self.engine.progress
+            if progress is None:
+                progress = (i + 1) / total_images
+            self.progressChanged.emit(int(progress * 100))
                 
         # Emit final progress and completion signal
         self.progressChanged.emit(100)
@@ -264,9 +235,8 @@ class BatchProcessorView(QDialog):
         self.image_paths = []
         
         # Find all image files
-        image_extensions = ["*.jpg", "*.jpeg", "*.png", "*.bmp", "*.tif", "*.tiff"]
-        for ext in image_extensions:
-            paths = glob.glob(os.path.join(folder, ext))
+        for ext in IMAGE_EXTENSIONS:
+            paths = glob.glob(os.path.join(folder, f"*{ext}"))
             self.image_paths.extend(paths)
             
         # Add to the list widget
@@ -357,7 +327,11 @@ class BatchProcessorView(QDialog):
         
     def onProcessingFinished(self):
         """Handle processing completion."""
-        self.status_label.setText(f"Processing complete - {len(self.image_paths)} images processed")
+        status = f"Processing complete - {len(self.image_paths)} images processed"
+        peak = self.worker.engine.peak_rss if self.worker else None
+        if peak:
+            status += f", peak memory {peak / 2 ** 20:.0f} MiB"
+        self.status_label.setText(status)
         self.progress_bar.setValue(100)
         self.start_button.setEnabled(True)
         self.cancel_button.setEnabled(False)
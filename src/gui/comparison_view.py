@@ -5,28 +5,34 @@ This module provides a view for comparing original and processed images
 side by side with analysis tools.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                           QSplitter, QScrollArea, QSlider, QCheckBox,
+                           QSplitter, QSlider, QCheckBox,
                            QPushButton, QToolBar, QFrame)
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QPixmap, QImage, QPainter, QPen, QColor
 
-import numpy as np
-import cv2
+from .image_viewer import ZoomableImageView
+from ..core.difference import DifferenceCache, absolute_difference, normalize_difference
+from ..core.inspector import PixelInspector, pixel_value
+from ..core.pyramid import ImagePyramid
 
 class ComparisonView(QWidget):
     """
     A widget for comparing original and processed images side by side.
     
     Features:
-    - Synchronized scrolling
+    - Synchronized zooming and panning
     - Split view slider
     - Pixel value inspection
     - Difference highlighting
     """
     
     # Signal emitted when a pixel is hovered
-    pixelHovered = pyqtSignal(int, int, tuple)  # x, y, pixel values
+    pixelHovered = pyqtSignal(int, int, tuple)  # x, y, (original, processed, difference)
+    
+    # Width of the neighborhood used for hover statistics
+    INSPECTOR_WINDOW = 7
     
     def __init__(self, parent=None):
         """
@@ -36,13 +42,23 @@ class ComparisonView(QWidget):
             parent (QWidget, optional): Parent widget. Defaults to None.
         """
         super().__init__(parent)
-        self.initUI()
         
         # Initialize instance variables
         self.original_image = None
         self.processed_image = None
+        self.original_pyramid = None
+        self.processed_pyramid = None
+        self.difference_pyramid = None
+        self.preview = None  # (original proxy, preview, scale) while previewing
+        self.processed_title = "Processed Image"
         self.show_difference = False
         self.split_position = 0.5  # Position of the split (0-1)
+        self.difference_cache = DifferenceCache()
+        self.inspector = None  # Future of the PixelInspector for the current pair
+        self._inspector_executor = ThreadPoolExecutor(max_workers=1)
+        self._syncing = False
+        
+        self.initUI()
         
     def initUI(self):
         """Set up the user interface."""
@@ -54,51 +70,40 @@ class ComparisonView(QWidget):
         view_layout = QHBoxLayout()
         
         # Original image view
-        self.original_scroll = QScrollArea()
-        self.original_scroll.setWidgetResizable(True)
         self.original_container = QWidget()
         self.original_layout = QVBoxLayout(self.original_container)
         self.original_label = QLabel("Original Image")
         self.original_label.setAlignment(Qt.AlignCenter)
-        self.original_view = QLabel()
-        self.original_view.setAlignment(Qt.AlignCenter)
-        self.original_view.setStyleSheet("border: 1px solid #CCCCCC;")
+        self.original_view = ZoomableImageView()
         self.original_layout.addWidget(self.original_label)
         self.original_layout.addWidget(self.original_view)
-        self.original_scroll.setWidget(self.original_container)
         
         # Processed image view
-        self.processed_scroll = QScrollArea()
-        self.processed_scroll.setWidgetResizable(True)
         self.processed_container = QWidget()
         self.processed_layout = QVBoxLayout(self.processed_container)
         self.processed_label = QLabel("Processed Image")
         self.processed_label.setAlignment(Qt.AlignCenter)
-        self.processed_view = QLabel()
-        self.processed_view.setAlignment(Qt.AlignCenter)
-        self.processed_view.setStyleSheet("border: 1px solid #CCCCCC;")
+        self.processed_view = ZoomableImageView()
         self.processed_layout.addWidget(self.processed_label)
         self.processed_layout.addWidget(self.processed_view)
-        self.processed_scroll.setWidget(self.processed_container)
         
-        # Connect scroll bars for synchronized scrolling
-        self.original_scroll.horizontalScrollBar().valueChanged.connect(
-            self.processed_scroll.horizontalScrollBar().setValue
-        )
-        self.original_scroll.verticalScrollBar().valueChanged.connect(
-            self.processed_scroll.verticalScrollBar().setValue
-        )
-        self.processed_scroll.horizontalScrollBar().valueChanged.connect(
-            self.original_scroll.horizontalScrollBar().setValue
+        # Connect views for synchronized zooming and panning
+        self.original_view.viewChanged.connect(
+            lambda *view: self.syncView(self.original_view, self.processed_view)
         )
-        self.processed_scroll.verticalScrollBar().valueChanged.connect(
-            self.original_scroll.verticalScrollBar().setValue
+        self.processed_view.viewChanged.connect(
+            lambda *view: self.syncView(self.processed_view, self.original_view)
         )
         
+        # Pixel inspection on hover
+        for view in (self.original_view, self.processed_view):
+            view.pixelHovered.connect(self.inspectPixel)
+            view.hoverLeft.connect(self.clearPixelInfo)
+        
         # Add the views to the layout
         self.view_splitter = QSplitter(Qt.Horizontal)
-        self.view_splitter.addWidget(self.original_scroll)
-        self.view_splitter.addWidget(self.processed_scroll)
+        self.view_splitter.addWidget(self.original_container)
+        self.view_splitter.addWidget(self.processed_container)
         self.view_splitter.setSizes([1, 1])  # Equal sizes
         view_layout.addWidget(self.view_splitter)
         
@@ -120,10 +125,23 @@ class ComparisonView(QWidget):
         self.diff_checkbox.setToolTip("Highlight differences between original and processed images")
         self.diff_checkbox.stateChanged.connect(self.toggleDifferenceMode)
         
+        # Zoom controls
+        zoom_in_button = QPushButton("Zoom In")
+        zoom_in_button.clicked.connect(self.zoomIn)
+        zoom_out_button = QPushButton("Zoom Out")
+        zoom_out_button.clicked.connect(self.zoomOut)
+        fit_button = QPushButton("Fit")
+        fit_button.setToolTip("Zoom to fit the whole image")
+        fit_button.clicked.connect(self.zoomToFit)
+        
         # Add widgets to toolbar
         toolbar.addWidget(QLabel("Split:"))
         toolbar.addWidget(self.split_slider)
         toolbar.addWidget(self.diff_checkbox)
+        toolbar.addSeparator()
+        toolbar.addWidget(zoom_in_button)
+        toolbar.addWidget(zoom_out_button)
+        toolbar.addWidget(fit_button)
         
         # Add the toolbar to the main layout
         main_layout.addWidget(toolbar)
@@ -133,7 +151,10 @@ class ComparisonView(QWidget):
         status_bar.setFrameShape(QFrame.StyledPanel)
         status_layout = QHBoxLayout(status_bar)
         self.pixel_info_label = QLabel("Hover over image to see pixel values")
+        self.zoom_label = QLabel("Zoom: 100%")
         status_layout.addWidget(self.pixel_info_label)
+        status_layout.addStretch()
+        status_layout.addWidget(self.zoom_label)
         main_layout.addWidget(status_bar)
         
     def setOriginalImage(self, image_data):
@@ -144,71 +165,184 @@ class ComparisonView(QWidget):
             image_data (numpy.ndarray): Original image data
         """
         self.original_image = image_data
+        self.original_pyramid = ImagePyramid(image_data) if image_data is not None else None
+        self.difference_pyramid = None
+        self.difference_cache.clear()
+        self.original_view.setPyramid(self.original_pyramid)
         self.updateViews()
+        self.startInspector()
         
     def setProcessedImage(self, image_data):
         """
         Set the processed image.
         
         Args:
-            image_data (numpy.ndarray): Processed image data
+            image_data (numpy.ndarray): Processed image data, or None to clear it
         """
         self.processed_image = image_data
+        self.processed_pyramid = ImagePyramid(image_data) if image_data is not None else None
+        self.difference_pyramid = None
+        self.preview = None
+        self.difference_cache.clear()
+        self.updateViews()
+        self.startInspector()
+        
+    def setPreviewImage(self, original_proxy, preview, scale):
+        """
+        Show a reduced-resolution preview in place of the processed image.
+        
+        The preview is displayed at the size of the original image, so zoom
+        and position stay synchronized with the original view.
+        
+        Args:
+            original_proxy (numpy.ndarray): Original image at preview resolution
+            preview (numpy.ndarray): Processed preview image
+            scale (float): Size of the preview relative to the original image
+        """
+        self.processed_image = None
+        self.processed_pyramid = ImagePyramid(preview, scale=scale)
+        self.difference_pyramid = None
+        self.preview = (original_proxy, preview, scale)
+        self.inspector = None
         self.updateViews()
         
+    def setProcessedTitle(self, title):
+        """
+        Set the title shown above the processed image.
+        
+        Args:
+            title (str): Title text
+        """
+        self.processed_title = title
+        if not self.show_difference:
+            self.processed_label.setText(title)
+        
     def updateViews(self):
         """Update the image views based on current settings."""
-        if self.original_image is None or self.processed_image is None:
+        if self.processed_pyramid is None or self.original_image is None:
+            self.processed_view.clear()
+            self.processed_label.setText(self.processed_title)
             return
             
-        # Convert OpenCV images to QPixmap
-        original_pixmap = self.convertToPixmap(self.original_image)
-        processed_pixmap = self.convertToPixmap(self.processed_image)
-        
-        # Display the images
-        self.original_view.setPixmap(original_pixmap)
-        self.processed_view.setPixmap(processed_pixmap)
-        
-        # If difference mode is enabled, show difference image
+        # Pyramids are built once per image, switching views only swaps them
         if self.show_difference:
-            diff_image = self.generateDifferenceImage()
-            diff_pixmap = self.convertToPixmap(diff_image)
-            self.processed_view.setPixmap(diff_pixmap)
+            if self.difference_pyramid is None and self.preview is not None:
+                original_proxy, preview, scale = self.preview
+                difference = normalize_difference(absolute_difference(original_proxy, preview))
+                self.difference_pyramid = ImagePyramid(difference, scale=scale)
+            elif self.difference_pyramid is None:
+                self.difference_pyramid = ImagePyramid(self.generateDifferenceImage())
+            self.processed_view.setPyramid(self.difference_pyramid)
             self.processed_label.setText("Difference Image")
         else:
-            self.processed_label.setText("Processed Image")
+            self.processed_view.setPyramid(self.processed_pyramid)
+            self.processed_label.setText(self.processed_title)
+        
+        self.syncView(self.original_view, self.processed_view)
         
-    def convertToPixmap(self, image_data):
+    def syncView(self, source, target):
         """
-        Convert OpenCV image to QPixmap.
+        Copy the zoom and position of one view to the other.
         
         Args:
-            image_data (numpy.ndarray): Image data
+            source (ZoomableImageView): View that changed
+            target (ZoomableImageView): View to update
+        """
+        self.zoom_label.setText(f"Zoom: {source.zoom * 100:.0f}%")
+        if self._syncing:
+            return
             
-        Returns:
-            QPixmap: Image as QPixmap
+        self._syncing = True
+        try:
+            target.fit_to_window = source.fit_to_window
+            target.setView(source.zoom, source.center_x, source.center_y)
+        finally:
+            self._syncing = False
+        
+    def startInspector(self):
+        """Start precomputing hover statistics for the current image pair."""
+        self.inspector = None
+        if self.original_image is None or self.processed_image is None:
+            return
+            
+        # The difference is shared with the view and the similarity score
+        difference = self.difference_cache.difference(self.original_image, self.processed_image)
+        self.inspector = self._inspector_executor.submit(
+            PixelInspector, self.original_image, self.processed_image,
+            difference, self.INSPECTOR_WINDOW
+        )
+        
+    def inspectPixel(self, x, y):
+        """
+        Show pixel values and neighborhood statistics at an image position.
+        
+        Args:
+            x (int): Image column
+            y (int): Image row
         """
-        height, width = image_data.shape
-        bytes_per_line = width
-        q_image = QImage(image_data.data, width, height, bytes_per_line, QImage.Format_Grayscale8)
-        return QPixmap.fromImage(q_image)
+        if self.original_image is None:
+            return
+            
+        height, width = self.original_image.shape[:2]
+        if not (0 <= x < width and 0 <= y < height):
+            self.clearPixelInfo()
+            return
+            
+        if self.processed_image is None:
+            self.pixel_info_label.setText(f"({x}, {y})  Original: {pixel_value(self.original_image, x, y)}")
+            return
+            
+        # Neighborhood statistics become available once the background build finishes
+        if self.inspector is not None and self.inspector.done():
+            inspector = self.inspector.result()
+            info = inspector.inspect(x, y)
+            size = inspector.window_size
+            parts = [f"({x}, {y})"]
+            for name in ("original", "processed", "difference"):
+                values = info[name]
+                parts.append(f"{name.capitalize()}: {values['value']} "
+                             f"[{size}x{size} mean {values['mean']:.1f}, std {values['std']:.1f}]")
+            values = tuple(info[name]["value"] for name in ("original", "processed", "difference"))
+            self.pixel_info_label.setText("  ".join(parts))
+        else:
+            difference = self.difference_cache.difference(self.original_image, self.processed_image)
+            values = (pixel_value(self.original_image, x, y),
+                      pixel_value(self.processed_image, x, y), pixel_value(difference, x, y))
+            self.pixel_info_label.setText(
+                f"({x}, {y})  Original: {values[0]}  Processed: {values[1]}  "
+                f"Difference: {values[2]}  (computing statistics...)"
+            )
+            
+        self.pixelHovered.emit(x, y, values)
+        
+    def clearPixelInfo(self):
+        """Reset the pixel information display."""
+        self.pixel_info_label.setText("Hover over image to see pixel values")
+        
+    def zoomIn(self):
+        """Zoom in on both images."""
+        self.original_view.zoomIn()
+        
+    def zoomOut(self):
+        """Zoom out on both images."""
+        self.original_view.zoomOut()
+        
+    def zoomToFit(self):
+        """Fit both images to their views."""
+        self.original_view.zoomToFit()
+        self.processed_view.zoomToFit()
         
     def generateDifferenceImage(self):
         """
         Generate an image showing the difference between original and processed.
         
+        The difference is computed once per image pair and shared with the
+        similarity calculation through ``difference_cache``.
+        
         Returns:
             numpy.ndarray: Difference image
         """
-        # Calculate absolute difference
-        diff = cv2.absdiff(self.original_image, self.processed_image)
-        
-        # Normalize to enhance visibility
-        diff_norm = diff.copy()
-        if np.max(diff) > 0:
-            diff_norm = (diff * 255.0 / np.max(diff)).astype(np.uint8)
-            
-        return diff_norm
+        return self.difference_cache.normalized(self.original_image, self.processed_image)
         
     def adjustSplitView(self, value):
         """
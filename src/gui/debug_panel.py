@@ -0,0 +1,125 @@
+"""
+Debug Panel for PixelCraft.
+
+This module provides a panel showing the timers, counters and histograms
+recorded by the instrumentation layer.
+"""
+
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox,
+                            QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox)
+from PyQt5.QtCore import QTimer
+
+from ..utils.instrumentation import instrumentation
+
+
+class DebugPanel(QWidget):
+    """
+    A panel listing recorded instrumentation.
+
+    The list is refreshed periodically while the panel is visible, so a
+    hidden panel costs nothing.
+    """
+
+    REFRESH_INTERVAL_MS = 1000
+
+    COLUMNS = ["Name", "Count", "Total", "Mean", "p95", "Max"]
+
+    def __init__(self, parent=None):
+        """
+        Initialize the debug panel.
+
+        Args:
+            parent (QWidget, optional): Parent widget. Defaults to None.
+        """
+        super().__init__(parent)
+        self.initUI()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def initUI(self):
+        """Set up the user interface."""
+        main_layout = QVBoxLayout()
+        self.setLayout(main_layout)
+
+        controls_layout = QHBoxLayout()
+        self.record_checkbox = QCheckBox("Record")
+        self.record_checkbox.setChecked(instrumentation.enabled)
+        self.record_checkbox.toggled.connect(instrumentation.enable)
+        controls_layout.addWidget(self.record_checkbox)
+        controls_layout.addStretch()
+
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.resetMetrics)
+        controls_layout.addWidget(reset_button)
+
+        export_button = QPushButton("Export...")
+        export_button.clicked.connect(self.exportMetrics)
+        controls_layout.addWidget(export_button)
+        main_layout.addLayout(controls_layout)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(self.COLUMNS)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setStyleSheet("font-family: monospace;")
+        main_layout.addWidget(self.tree)
+
+    @staticmethod
+    def formatDuration(seconds):
+        """Format a duration in seconds for display."""
+        if seconds >= 1:
+            return f"{seconds:.2f} s"
+        return f"{seconds * 1000:.2f} ms"
+
+    def refresh(self):
+        """Show the current instrumentation snapshot."""
+        snapshot = instrumentation.snapshot()
+        self.tree.clear()
+
+        for name, timer in snapshot["timers"].items():
+            self.tree.addTopLevelItem(QTreeWidgetItem([
+                name, str(timer["count"]), self.formatDuration(timer["total"]),
+                self.formatDuration(timer["mean"]), self.formatDuration(timer["p95"]),
+                self.formatDuration(timer["max"]),
+            ]))
+
+        for name, histogram in snapshot["histograms"].items():
+            self.tree.addTopLevelItem(QTreeWidgetItem([
+                name, str(histogram["count"]), f"{histogram['total']:.2f}",
+                f"{histogram['mean']:.2f}", f"{histogram['p95']:.2f}", f"{histogram['max']:.2f}",
+            ]))
+
+        for name, value in snapshot["counters"].items():
+            self.tree.addTopLevelItem(QTreeWidgetItem([name, str(value), "", "", "", ""]))
+
+        for column in range(len(self.COLUMNS)):
+            self.tree.resizeColumnToContents(column)
+
+    def resetMetrics(self):
+        """Drop all recorded values."""
+        instrumentation.reset()
+        self.refresh()
+
+    def exportMetrics(self):
+        """Save the current snapshot as JSON."""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Statistics", "pixelcraft_stats.json", "JSON (*.json)"
+        )
+        if file_path:
+            try:
+                instrumentation.save(file_path)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Could not export statistics: {str(e)}")
+
+    def showEvent(self, event):
+        """Start refreshing when the panel becomes visible."""
+        super().showEvent(event)
+        self.record_checkbox.setChecked(instrumentation.enabled)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        """Stop refreshing while the panel is hidden."""
+        super().hideEvent(event)
+        self.refresh_timer.stop()
@@ -7,7 +7,7 @@ for the PixelCraft application.
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox, 
                             QLabel, QSlider, QPushButton, QSpinBox, QGroupBox,
-                            QRadioButton, QButtonGroup, QFrame)
+                            QRadioButton, QButtonGroup, QFrame, QCheckBox)
 from PyQt5.QtCore import Qt, pyqtSignal
 
 class FilterPanel(QWidget):
@@ -20,6 +20,7 @@ class FilterPanel(QWidget):
     
     # Define signals for communicating with parent widgets
     filterApplied = pyqtSignal(str, int)  # Signal emitted when a filter is applied
+    parametersChanged = pyqtSignal(str, dict)  # Filter name and parameters, emitted for live preview
     
     def __init__(self, parent=None):
         """
@@ -29,6 +30,10 @@ class FilterPanel(QWidget):
             parent (QWidget, optional): Parent widget. Defaults to None.
         """
         super().__init__(parent)
+        
+        # Parameter widgets of the selected filter, keyed by parameter name
+        self.param_widgets = {}
+        
         self.initUI()
         
     def initUI(self):
@@ -63,6 +68,19 @@ class FilterPanel(QWidget):
         self.filter_params_layout = QVBoxLayout()
         filter_layout.addLayout(self.filter_params_layout)
         
+        # Color images can be filtered on their brightness only
+        self.luminance_checkbox = QCheckBox("Filter Luminance Only")
+        self.luminance_checkbox.setToolTip("For color images, filter the brightness and keep the colors")
+        self.luminance_checkbox.toggled.connect(self.emitParametersChanged)
+        filter_layout.addWidget(self.luminance_checkbox)
+        
+        # Live preview toggle
+        self.live_preview_checkbox = QCheckBox("Live Preview")
+        self.live_preview_checkbox.setChecked(True)
+        self.live_preview_checkbox.setToolTip("Preview parameter changes at reduced resolution while adjusting")
+        self.live_preview_checkbox.toggled.connect(self.emitParametersChanged)
+        filter_layout.addWidget(self.live_preview_checkbox)
+        
         # Add filter section to main layout
         main_layout.addWidget(filter_group)
         
@@ -99,6 +117,22 @@ class FilterPanel(QWidget):
         # Add some space
         main_layout.addStretch()
         
+        # Show the parameters of the initially selected filter
+        self.onFilterChanged(self.filter_combo.currentText())
+        
+    def clearLayout(self, layout):
+        """
+        Remove and delete all widgets and nested layouts from a layout.
+        
+        Args:
+            layout (QLayout): Layout to clear
+        """
+        while layout.count():
+            item = layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+            elif item.layout():
+                self.clearLayout(item.layout())
         
     def onFilterChanged(self, filter_name):
         """
@@ -108,10 +142,8 @@ class FilterPanel(QWidget):
             filter_name (str): Name of the selected filter
         """
         # Clear existing parameters
-        while self.filter_params_layout.count():
-            item = self.filter_params_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        self.clearLayout(self.filter_params_layout)
+        self.param_widgets = {}
         
         # Add parameters specific to the selected filter
         if filter_name == "Average":
@@ -125,9 +157,11 @@ class FilterPanel(QWidget):
             kernel_size.setSingleStep(2)  # Only odd numbers
             kernel_size.setValue(5)
             kernel_size.valueChanged.connect(lambda x: kernel_size.setValue(x if x % 2 == 1 else x + 1))
+            kernel_size.valueChanged.connect(self.emitParametersChanged)
             
             param_layout.addWidget(kernel_size)
             self.filter_params_layout.addLayout(param_layout)
+            self.param_widgets["kernel_size"] = kernel_size
             
         elif filter_name == "Sharpen":
             # Strength parameter
@@ -142,8 +176,35 @@ class FilterPanel(QWidget):
             param_layout.addWidget(strength_slider)
             param_layout.addWidget(QLabel("5"))  # Default value
             strength_slider.valueChanged.connect(lambda v: param_layout.itemAt(2).widget().setText(str(v)))
+            strength_slider.valueChanged.connect(self.emitParametersChanged)
             
             self.filter_params_layout.addLayout(param_layout)
+            self.param_widgets["strength"] = strength_slider
+            
+        self.emitParametersChanged()
+            
+    def emitParametersChanged(self):
+        """Notify listeners of new filter parameters when live preview is enabled."""
+        if self.live_preview_checkbox.isChecked():
+            self.parametersChanged.emit(self.getCurrentFilter(), self.getFilterParameters())
+            
+    def getFilterParameters(self):
+        """
+        Get the parameters of the selected filter.
+        
+        Returns:
+            dict: Parameter names mapped to their current values
+        """
+        params = {}
+        for name, widget in self.param_widgets.items():
+            value = widget.value()
+            # Even kernel sizes are only transient while the spin box corrects itself
+            if name == "kernel_size" and value % 2 == 0:
+                value += 1
+            params[name] = value
+        if self.luminance_checkbox.isChecked():
+            params["luminance"] = True
+        return params
             
     def applyFilter(self):
         """Apply the selected filter with current settings."""
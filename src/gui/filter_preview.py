@@ -0,0 +1,117 @@
+"""
+Filter Preview Worker for PixelCraft.
+
+This module provides a background thread that renders filter previews on a
+reduced-resolution proxy image while the user adjusts filter parameters.
+"""
+
+from PyQt5.QtCore import QThread, QMutex, QMutexLocker, QWaitCondition, pyqtSignal
+
+from ..core.filters import ImageFilters
+from ..utils.instrumentation import instrumentation
+
+
+def scale_filter_parameters(params, scale):
+    """
+    Adapt filter parameters measured in pixels to a resized image.
+
+    Args:
+        params (dict): Filter parameters for the full-resolution image
+        scale (float): Size of the resized image relative to the full image
+
+    Returns:
+        dict: Parameters for the resized image
+    """
+    scaled = dict(params)
+    if "kernel_size" in scaled:
+        # Keep the kernel odd and at least 1 pixel wide
+        size = int(round(scaled["kernel_size"] * scale))
+        scaled["kernel_size"] = max(1, size if size % 2 == 1 else size + 1)
+    return scaled
+
+
+class FilterPreviewWorker(QThread):
+    """
+    Worker thread for rendering filter previews.
+
+    Requests are coalesced: only the most recent request is kept while a
+    preview is being rendered, so a fast stream of parameter changes never
+    queues up stale work.
+    """
+
+    # Signal emitted when a preview is ready
+    previewReady = pyqtSignal(object, object, str, dict)  # source, preview, filter name, parameters
+    previewError = pyqtSignal(str)  # Error message
+
+    def __init__(self, parent=None):
+        """
+        Initialize the worker.
+
+        Args:
+            parent (QObject, optional): Parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self._mutex = QMutex()
+        self._condition = QWaitCondition()
+        self._source = None
+        self._scale = 1.0
+        self._pending = None
+        self._stopped = False
+
+    def setSource(self, image, scale):
+        """
+        Set the proxy image that previews are rendered from.
+
+        Args:
+            image (numpy.ndarray): Proxy image, or None to disable previews
+            scale (float): Size of the proxy relative to the full image
+        """
+        with QMutexLocker(self._mutex):
+            self._source = image
+            self._scale = scale
+            self._pending = None
+
+    def requestPreview(self, filter_name, params):
+        """
+        Request a preview, replacing any request that has not started yet.
+
+        Args:
+            filter_name (str): Name of the filter to apply
+            params (dict): Filter parameters for the full-resolution image
+        """
+        with QMutexLocker(self._mutex):
+            self._pending = (filter_name, dict(params))
+            self._condition.wakeOne()
+
+    def stop(self):
+        """Stop the worker and wait for it to finish."""
+        with QMutexLocker(self._mutex):
+            self._stopped = True
+            self._condition.wakeOne()
+        self.wait()
+
+    def run(self):
+        """Render previews until stopped."""
+        while True:
+            with QMutexLocker(self._mutex):
+                while self._pending is None and not self._stopped:
+                    self._condition.wait(self._mutex)
+                if self._stopped:
+                    return
+                filter_name, params = self._pending
+                self._pending = None
+                source, scale = self._source, self._scale
+
+            if source is None:
+                continue
+
+            try:
+                with instrumentation.timer("gui.preview"):
+                    preview = ImageFilters.apply_filter(
+                        source, filter_name, **scale_filter_parameters(params, scale)
+                    )
+            except Exception as e:
+                self.previewError.emit(str(e))
+                continue
+
+            self.previewReady.emit(source, preview, filter_name, params)
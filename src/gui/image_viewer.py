@@ -0,0 +1,271 @@
+"""
+Zoomable Image Viewer for PixelCraft.
+
+This module provides a pannable, zoomable image widget that renders only the
+visible part of an image from an image pyramid, so large images stay
+responsive at every zoom level.
+"""
+
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QRectF, QPointF, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QColor
+
+import numpy as np
+
+from ..core.depth import to_uint8
+from ..core.pyramid import ImagePyramid
+from ..utils.instrumentation import instrumentation, timed
+
+
+class ZoomableImageView(QWidget):
+    """
+    A widget for viewing an image at arbitrary zoom levels.
+
+    Features:
+    - Mouse wheel zoom around the cursor
+    - Click and drag panning
+    - Viewport-only rendering from a precomputed image pyramid
+    - View state signal for synchronizing several views
+    """
+
+    # Signal emitted when the zoom or position changes
+    viewChanged = pyqtSignal(float, float, float)  # zoom, center x, center y
+    
+    # Signals emitted when the mouse moves over or leaves the image
+    pixelHovered = pyqtSignal(int, int)  # x, y in image coordinates
+    hoverLeft = pyqtSignal()
+
+    ZOOM_STEP = 1.25
+    MAX_ZOOM = 32.0
+
+    def __init__(self, parent=None):
+        """
+        Initialize the image view.
+
+        Args:
+            parent (QWidget, optional): Parent widget. Defaults to None.
+        """
+        super().__init__(parent)
+        self.setMinimumSize(300, 300)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMouseTracking(True)
+
+        # Initialize instance variables
+        self.pyramid = None
+        self.zoom = 1.0
+        self.center_x = 0.0
+        self.center_y = 0.0
+        self.fit_to_window = True
+        self._drag_origin = None
+
+    def setImage(self, image_data):
+        """
+        Set the image data and display it.
+
+        Args:
+            image_data (numpy.ndarray): Grayscale or BGR image data, or None to
+                clear the view
+        """
+        self.setPyramid(ImagePyramid(image_data) if image_data is not None else None)
+
+    def setPyramid(self, pyramid):
+        """
+        Display a precomputed image pyramid.
+
+        The current zoom and position are kept when the new image has the same
+        logical size as the previous one, so switching between related images
+        does not move the view.
+
+        Args:
+            pyramid (ImagePyramid): Pyramid to display, or None to clear the view
+        """
+        previous = self.pyramid
+        self.pyramid = pyramid
+
+        if pyramid is None:
+            self.update()
+            return
+
+        same_size = (previous is not None and
+                     (previous.width, previous.height) == (pyramid.width, pyramid.height))
+        if self.fit_to_window or not same_size:
+            self.zoomToFit()
+        else:
+            self.update()
+
+    def clear(self):
+        """Remove the displayed image."""
+        self.setPyramid(None)
+
+    def getImageData(self):
+        """
+        Get the current image data.
+
+        Returns:
+            numpy.ndarray: Full-resolution image data, or None if empty
+        """
+        return self.pyramid.base if self.pyramid is not None else None
+
+    def fitZoom(self):
+        """
+        Get the zoom factor at which the whole image fits the widget.
+
+        Returns:
+            float: Fit zoom factor
+        """
+        if self.pyramid is None:
+            return 1.0
+        return min(self.width() / self.pyramid.width, self.height() / self.pyramid.height)
+
+    def setView(self, zoom, center_x, center_y):
+        """
+        Set the zoom factor and the image point shown at the widget center.
+
+        Args:
+            zoom (float): Screen pixels per image pixel
+            center_x (float): Image x coordinate at the widget center
+            center_y (float): Image y coordinate at the widget center
+        """
+        if self.pyramid is not None:
+            zoom = max(min(self.fitZoom(), 1.0) / 2, min(zoom, self.MAX_ZOOM))
+            center_x = max(0.0, min(center_x, self.pyramid.width))
+            center_y = max(0.0, min(center_y, self.pyramid.height))
+
+        if (zoom, center_x, center_y) == (self.zoom, self.center_x, self.center_y):
+            return
+
+        self.zoom = zoom
+        self.center_x = center_x
+        self.center_y = center_y
+        self.update()
+        self.viewChanged.emit(zoom, center_x, center_y)
+
+    def zoomIn(self):
+        """Zoom in around the widget center."""
+        self.fit_to_window = False
+        self.setView(self.zoom * self.ZOOM_STEP, self.center_x, self.center_y)
+
+    def zoomOut(self):
+        """Zoom out around the widget center."""
+        self.fit_to_window = False
+        self.setView(self.zoom / self.ZOOM_STEP, self.center_x, self.center_y)
+
+    def zoomToFit(self):
+        """Zoom so the whole image is visible."""
+        self.fit_to_window = True
+        if self.pyramid is not None:
+            self.setView(self.fitZoom(), self.pyramid.width / 2, self.pyramid.height / 2)
+        self.update()
+
+    def mapToImage(self, pos):
+        """
+        Map a widget position to image coordinates.
+
+        Args:
+            pos (QPoint): Position in widget coordinates
+
+        Returns:
+            QPointF: Position in image coordinates
+        """
+        return QPointF(self.center_x + (pos.x() - self.width() / 2) / self.zoom,
+                       self.center_y + (pos.y() - self.height() / 2) / self.zoom)
+
+    @timed("gui.paint")
+    def paintEvent(self, event):
+        """Render the visible part of the image."""
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#2B2B2B"))
+
+        if self.pyramid is None:
+            return
+
+        # Visible rectangle in image coordinates
+        half_width = self.width() / (2 * self.zoom)
+        half_height = self.height() / (2 * self.zoom)
+        level = self.pyramid.level_for_zoom(self.zoom)
+        pixels, covered = self.pyramid.region(
+            level,
+            self.center_x - half_width, self.center_y - half_height,
+            self.center_x + half_width, self.center_y + half_height
+        )
+        if pixels is None:
+            return
+
+        # Only the visible region is converted, never the whole image
+        with instrumentation.timer("gui.qt_conversion"):
+            pixels = np.ascontiguousarray(to_uint8(pixels))
+            # Qt reads BGR rows directly, so color needs no channel reordering
+            image_format = QImage.Format_BGR888 if pixels.ndim == 3 else QImage.Format_Grayscale8
+            q_image = QImage(pixels.data, pixels.shape[1], pixels.shape[0],
+                             pixels.strides[0], image_format)
+
+        left, top, right, bottom = covered
+        target = QRectF(self.width() / 2 + (left - self.center_x) * self.zoom,
+                        self.height() / 2 + (top - self.center_y) * self.zoom,
+                        (right - left) * self.zoom,
+                        (bottom - top) * self.zoom)
+
+        # Smooth when minifying, show crisp pixels when magnifying
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, target.width() < pixels.shape[1])
+        painter.drawImage(target, q_image, QRectF(q_image.rect()))
+
+    def resizeEvent(self, event):
+        """Keep the image fitted to the widget while in fit mode."""
+        super().resizeEvent(event)
+        if self.fit_to_window:
+            self.zoomToFit()
+
+    def wheelEvent(self, event):
+        """Zoom around the cursor position."""
+        if self.pyramid is None:
+            return
+
+        steps = event.angleDelta().y() / 120.0
+        if steps == 0:
+            return
+
+        # Keep the image point under the cursor fixed while zooming
+        anchor = self.mapToImage(event.pos())
+        zoom = self.zoom * (self.ZOOM_STEP ** steps)
+        zoom = max(min(self.fitZoom(), 1.0) / 2, min(zoom, self.MAX_ZOOM))
+        self.fit_to_window = False
+        self.setView(zoom,
+                     anchor.x() - (event.pos().x() - self.width() / 2) / zoom,
+                     anchor.y() - (event.pos().y() - self.height() / 2) / zoom)
+
+    def mousePressEvent(self, event):
+        """Start panning."""
+        if event.button() == Qt.LeftButton:
+            self._drag_origin = (event.pos(), self.center_x, self.center_y)
+            self.setCursor(Qt.ClosedHandCursor)
+
+    def mouseMoveEvent(self, event):
+        """Pan while dragging and report the hovered pixel."""
+        if self._drag_origin is not None:
+            origin, center_x, center_y = self._drag_origin
+            self.fit_to_window = False
+            self.setView(self.zoom,
+                         center_x - (event.pos().x() - origin.x()) / self.zoom,
+                         center_y - (event.pos().y() - origin.y()) / self.zoom)
+            
+        if self.pyramid is not None:
+            point = self.mapToImage(event.pos())
+            if 0 <= point.x() < self.pyramid.width and 0 <= point.y() < self.pyramid.height:
+                self.pixelHovered.emit(int(point.x()), int(point.y()))
+            else:
+                self.hoverLeft.emit()
+                
+    def leaveEvent(self, event):
+        """Report that the mouse left the image."""
+        super().leaveEvent(event)
+        self.hoverLeft.emit()
+
+    def mouseReleaseEvent(self, event):
+        """Stop panning."""
+        if event.button() == Qt.LeftButton:
+            self._drag_origin = None
+            self.unsetCursor()
+
+    def mouseDoubleClickEvent(self, event):
+        """Reset the view to fit the image."""
+        self.zoomToFit()
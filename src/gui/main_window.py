@@ -7,58 +7,29 @@ image processing application.
 
 import os
 from PyQt5.QtWidgets import (QMainWindow, QAction, QToolBar, QStatusBar, QFileDialog,
-                            QSplitter, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                            QWidget, QHBoxLayout, QLabel,
                             QDockWidget, QMessageBox, QApplication)
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon, QPixmap, QImage
-import cv2
-import numpy as np
+from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtGui import QIcon
 
 from .filter_panel import FilterPanel
+from .comparison_view import ComparisonView
+from .filter_preview import FilterPreviewWorker
+from .statistics_panel import StatisticsPanel
+from .debug_panel import DebugPanel
 from ..core.filters import ImageFilters
-from ..core.similarity import calculate_similarity
+from ..core.statistics import get_statistics
 from ..utils.image_io import ImageIO
-
-class ImageView(QLabel):
-    """Custom widget for displaying images with proper scaling."""
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setAlignment(Qt.AlignCenter)
-        self.setMinimumSize(450, 450)
-        self.setStyleSheet("border: 1px solid #CCCCCC;")
-        self.setScaledContents(True)
-        self.image_data = None
-        
-    def setImage(self, image_data):
-        """
-        Set the image data and display it.
-        
-        Args:
-            image_data (numpy.ndarray): Image data
-        """
-        self.image_data = image_data
-        
-        if image_data is None:
-            self.clear()
-            return
-            
-        # Convert cv2 image to QImage
-        height, width = image_data.shape
-        bytes_per_line = width
-        q_image = QImage(image_data.data, width, height, bytes_per_line, QImage.Format_Grayscale8)
-        
-        # Set the pixmap
-        self.setPixmap(QPixmap.fromImage(q_image))
-        
-    def getImageData(self):
-        """Get the current image data."""
-        return self.image_data
-
+from ..utils.config import get_config
+from ..utils.instrumentation import instrumentation, timed
 
 class MainWindow(QMainWindow):
     """Main window for the PixelCraft application."""
     
+    # Live preview settings
+    PREVIEW_DELAY_MS = 40    # Debounce interval for parameter changes
+    PREVIEW_MAX_SIZE = 1024  # Longest side of the preview proxy image
+    
     def __init__(self):
         super().__init__()
         
@@ -67,10 +38,27 @@ class MainWindow(QMainWindow):
         self.original_image = None
         self.processed_image = None
         self.filters = ImageFilters()
+        self.preview_source = None
+        self.preview_scale = 1.0
+        self.preview_active = False
+        self.color_mode = False
+        self.any_depth = False
+        self.resize_options = get_config().resize_options()
         
         # Set up the user interface
         self.initUI()
         
+        # Live preview runs off the UI thread on a proxy of the original
+        self.preview_worker = FilterPreviewWorker(self)
+        self.preview_worker.previewReady.connect(self.showPreview)
+        self.preview_worker.start()
+        
+        # Parameter changes are debounced before a preview is requested
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(self.PREVIEW_DELAY_MS)
+        self.preview_timer.timeout.connect(self.requestPreview)
+        
     def initUI(self):
         """Set up the user interface."""
         # Set window properties
@@ -100,37 +88,9 @@ class MainWindow(QMainWindow):
         main_layout = QHBoxLayout()
         central_widget.setLayout(main_layout)
         
-        # Image display area
-        image_display = QSplitter(Qt.Horizontal)
-        
-        # Original image view
-        self.original_view = ImageView()
-        self.original_label = QLabel("Original Image")
-        self.original_label.setAlignment(Qt.AlignCenter)
-        
-        original_container = QWidget()
-        original_layout = QVBoxLayout()
-        original_layout.addWidget(self.original_label)
-        original_layout.addWidget(self.original_view)
-        original_container.setLayout(original_layout)
-        
-        # Processed image view
-        self.processed_view = ImageView()
-        self.processed_label = QLabel("Processed Image")
-        self.processed_label.setAlignment(Qt.AlignCenter)
-        
-        processed_container = QWidget()
-        processed_layout = QVBoxLayout()
-        processed_layout.addWidget(self.processed_label)
-        processed_layout.addWidget(self.processed_view)
-        processed_container.setLayout(processed_layout)
-        
-        # Add views to splitter
-        image_display.addWidget(original_container)
-        image_display.addWidget(processed_container)
-        
-        # Add splitter to main layout
-        main_layout.addWidget(image_display)
+        # Side by side comparison of original and processed images
+        self.comparison_view = ComparisonView()
+        main_layout.addWidget(self.comparison_view)
         
         # Create filter panel as a dock widget
         filter_dock = QDockWidget("Filters", self)
@@ -138,6 +98,7 @@ class MainWindow(QMainWindow):
         
         self.filter_panel = FilterPanel()
         self.filter_panel.filterApplied.connect(self.applyFilter)
+        self.filter_panel.parametersChanged.connect(self.schedulePreview)
         
         # Benzerlik göstergesini ekleyin
         self.filter_panel.addSimilarityDisplay()
@@ -148,6 +109,26 @@ class MainWindow(QMainWindow):
         filter_dock.setWidget(self.filter_panel)
         self.addDockWidget(Qt.RightDockWidgetArea, filter_dock)
         
+        # Create statistics panel as a dock widget below the filters
+        statistics_dock = QDockWidget("Statistics", self)
+        statistics_dock.setFeatures(QDockWidget.DockWidgetMovable | QDockWidget.DockWidgetFloatable)
+        
+        self.statistics_panel = StatisticsPanel()
+        statistics_dock.setWidget(self.statistics_panel)
+        self.addDockWidget(Qt.RightDockWidgetArea, statistics_dock)
+        
+        # Instrumentation debug panel, hidden until opened from the Tools menu
+        debug_dock = QDockWidget("Debug", self)
+        self.debug_panel = DebugPanel()
+        debug_dock.setWidget(self.debug_panel)
+        self.addDockWidget(Qt.BottomDockWidgetArea, debug_dock)
+        debug_dock.hide()
+        
+        debug_action = debug_dock.toggleViewAction()
+        debug_action.setText("&Debug Panel")
+        debug_action.setShortcut("Ctrl+Shift+D")
+        self.tools_menu.addAction(debug_action)
+        
     def createMenuBar(self):
         """Create the application menu bar."""
         menubar = self.menuBar()
@@ -180,8 +161,23 @@ class MainWindow(QMainWindow):
         reset_action.triggered.connect(self.resetImage)
         edit_menu.addAction(reset_action)
         
+        edit_menu.addSeparator()
+        
+        self.color_action = QAction("&Color Mode", self)
+        self.color_action.setCheckable(True)
+        self.color_action.setStatusTip("Open and process images in color instead of grayscale")
+        self.color_action.toggled.connect(self.setColorMode)
+        edit_menu.addAction(self.color_action)
+        
+        self.depth_action = QAction("Keep &Bit Depth", self)
+        self.depth_action.setCheckable(True)
+        self.depth_action.setStatusTip("Open 16-bit and floating point images at full precision")
+        self.depth_action.toggled.connect(self.setAnyDepth)
+        edit_menu.addAction(self.depth_action)
+        
         # Tools menu
         tools_menu = menubar.addMenu("&Tools")
+        self.tools_menu = tools_menu
         
         batch_action = QAction("&Batch Processing...", self)
         batch_action.setShortcut("Ctrl+B")
@@ -229,6 +225,10 @@ class MainWindow(QMainWindow):
         zoom_out_action.triggered.connect(self.zoomOut)
         toolbar.addAction(zoom_out_action)
         
+        zoom_fit_action = QAction("Fit", self)
+        zoom_fit_action.triggered.connect(self.zoomToFit)
+        toolbar.addAction(zoom_fit_action)
+        
     def openImage(self):
         """Open an image file for processing."""
         options = QFileDialog.Options()
@@ -242,12 +242,15 @@ class MainWindow(QMainWindow):
             try:
                 # Load the image
                 self.current_image_path = file_path
-                self.original_image = ImageIO.read_image(file_path)
-                
-                # Update the views
-                self.original_view.setImage(self.original_image)
-                self.processed_view.clear()
-                self.processed_image = None
+                with instrumentation.timer("gui.open_image"):
+                    self.original_image = self.readImage(file_path)
+                    
+                    # Update the views
+                    self.processed_image = None
+                    self.comparison_view.setProcessedImage(None)
+                    self.comparison_view.setProcessedTitle("Processed Image")
+                    self.comparison_view.setOriginalImage(self.original_image)
+                    self.updateStatistics()
                 
                 # Update status
                 file_name = os.path.basename(file_path)
@@ -258,6 +261,8 @@ class MainWindow(QMainWindow):
                 # Update window title
                 self.setWindowTitle(f"PixelCraft - {file_name}")
                 
+                self.updatePreviewSource()
+                
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Could not open image: {str(e)}")
                 
@@ -288,15 +293,68 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Could not save image: {str(e)}")
                 
+    def setColorMode(self, enabled):
+        """
+        Switch between color and grayscale processing.
+        
+        The current image, if any, is reopened in the new mode.
+        
+        Args:
+            enabled (bool): Whether to process images in color
+        """
+        if enabled == self.color_mode:
+            return
+        
+        self.color_mode = enabled
+        self.color_action.setChecked(enabled)
+        if self.current_image_path is not None:
+            self.openImageFromPath(self.current_image_path)
+            
+    def setAnyDepth(self, enabled):
+        """
+        Switch between full precision and 8-bit processing of deep images.
+        
+        The current image, if any, is reopened in the new mode.
+        
+        Args:
+            enabled (bool): Whether to keep 16-bit and floating point images
+                at their depth
+        """
+        if enabled == self.any_depth:
+            return
+        
+        self.any_depth = enabled
+        self.depth_action.setChecked(enabled)
+        if self.current_image_path is not None:
+            self.openImageFromPath(self.current_image_path)
+            
+    def readImage(self, file_path):
+        """
+        Read an image in the current color and depth mode, resized as configured.
+        
+        Args:
+            file_path (str): Path to the image file
+            
+        Returns:
+            numpy.ndarray: The image
+        """
+        return ImageIO.read_image(file_path, grayscale=not self.color_mode,
+                                  any_depth=self.any_depth, **self.resize_options)
+            
     def resetImage(self):
         """Reset the processed image to the original state."""
         if self.original_image is not None:
-            self.processed_view.clear()
+            self.preview_timer.stop()
+            self.preview_active = False
             self.processed_image = None
+            self.comparison_view.setProcessedTitle("Processed Image")
+            self.comparison_view.setProcessedImage(None)
+            self.updateStatistics()
             self.similarity_label.setText("N/A %")
             self.status_similarity_label.setText("Similarity: N/A")
             self.statusBar.showMessage("Image reset")
             
+    @timed("gui.apply_filter")
     def applyFilter(self, filter_name, sensitivity):
         """
         Apply the selected filter to the original image.
@@ -309,29 +367,29 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please open an image first.")
             return
             
+        # A full-resolution result replaces any pending preview
+        self.preview_timer.stop()
+        self.preview_active = False
+        
         try:
-            # Apply the selected filter
-            if filter_name == "Average":
-                processed = self.filters.average_filter(self.original_image.copy())
-            elif filter_name == "Sharpen":
-                processed = self.filters.sharpen_filter(self.original_image.copy())
-            elif filter_name == "Negative":
-                processed = self.filters.negative_filter(self.original_image.copy())
-            elif filter_name == "Laplacian":
-                processed = self.filters.laplacian_filter(self.original_image.copy())
-            elif filter_name == "Logarithm":
-                processed = self.filters.logarithm_filter(self.original_image.copy())
-            else:
+            # Apply the selected filter with the current parameters
+            params = self.filter_panel.getFilterParameters()
+            try:
+                processed = self.filters.apply_filter(self.original_image, filter_name, **params)
+            except ValueError:
                 QMessageBox.warning(self, "Warning", f"Unknown filter: {filter_name}")
                 return
                 
             # Update the processed image view
             self.processed_image = processed
-            self.processed_view.setImage(processed)
-            self.processed_label.setText(f"{filter_name} Filter")
+            self.comparison_view.setProcessedTitle(f"{filter_name} Filter")
+            self.comparison_view.setProcessedImage(processed)
             
-            # Calculate similarity
-            similarity = calculate_similarity(processed, self.original_image, sensitivity)
+            # Calculate similarity from the same difference used by the view
+            similarity = self.comparison_view.difference_cache.similarity(
+                self.original_image, processed, sensitivity
+            )
+            self.updateStatistics()
             
             # Değere göre renkli geri bildirim
             color = "#4CAF50"  # Green for high similarity
@@ -361,15 +419,93 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error applying filter: {str(e)}")
             
+    def updateStatistics(self):
+        """Show statistics of the current images, computed once per image."""
+        if self.original_image is None:
+            self.statistics_panel.clear()
+            return
+            
+        self.statistics_panel.setStatistics("original", get_statistics(self.original_image))
+        
+        if self.processed_image is None:
+            self.statistics_panel.setStatistics("processed", None)
+            self.statistics_panel.setStatistics("difference", None)
+            return
+            
+        difference = self.comparison_view.difference_cache.difference(
+            self.original_image, self.processed_image
+        )
+        self.statistics_panel.setStatistics("processed", get_statistics(self.processed_image))
+        self.statistics_panel.setStatistics("difference", get_statistics(difference))
+        
+    def updatePreviewSource(self):
+        """Use a proxy of the current original image for live previews."""
+        self.preview_timer.stop()
+        self.preview_active = False
+        self.preview_source, self.preview_scale = self.comparison_view.original_pyramid.proxy(
+            self.PREVIEW_MAX_SIZE
+        )
+        self.preview_worker.setSource(self.preview_source, self.preview_scale)
+        
+    def schedulePreview(self, filter_name, params):
+        """
+        Schedule a live preview after parameters stop changing briefly.
+        
+        Args:
+            filter_name (str): Name of the filter
+            params (dict): Filter parameters
+        """
+        if self.preview_source is None:
+            return
+        self.preview_timer.start()
+        
+    def requestPreview(self):
+        """Request a preview with the current filter panel settings."""
+        self.preview_active = True
+        self.preview_worker.requestPreview(
+            self.filter_panel.getCurrentFilter(), self.filter_panel.getFilterParameters()
+        )
+        
+    def showPreview(self, source, preview, filter_name, params):
+        """
+        Display a finished live preview.
+        
+        Args:
+            source (numpy.ndarray): Proxy image the preview was rendered from
+            preview (numpy.ndarray): Preview image
+            filter_name (str): Name of the filter
+            params (dict): Filter parameters
+        """
+        # Ignore previews of a previously opened image or superseded by Apply
+        if source is not self.preview_source or not self.preview_active:
+            instrumentation.count("gui.previews_dropped")
+            return
+            
+        instrumentation.count("gui.previews_shown")
+        self.processed_image = None
+        self.comparison_view.setProcessedTitle(f"{filter_name} Filter (Preview)")
+        self.comparison_view.setPreviewImage(source, preview, self.preview_scale)
+        self.updateStatistics()
+        self.similarity_label.setText("N/A %")
+        self.status_similarity_label.setText("Similarity: N/A")
+        self.statusBar.showMessage("Previewing - click Apply Filter to process at full resolution")
+        
+    def closeEvent(self, event):
+        """Stop background work before closing."""
+        self.preview_worker.stop()
+        super().closeEvent(event)
+        
     def zoomIn(self):
         """Zoom in on the images."""
-        # Placeholder for future zoom implementation
-        self.statusBar.showMessage("Zoom in not implemented yet")
+        self.comparison_view.zoomIn()
         
     def zoomOut(self):
         """Zoom out from the images."""
-        # Placeholder for future zoom implementation
-        self.statusBar.showMessage("Zoom out not implemented yet")
+        self.comparison_view.zoomOut()
+        
+    def zoomToFit(self):
+        """Fit the images to the view."""
+        self.comparison_view.zoomToFit()
         
     def openBatchProcessor(self):
         """Open the batch processing dialog."""
@@ -396,12 +532,15 @@ class MainWindow(QMainWindow):
             try:
                 # Load the image
                 self.current_image_path = image_path
-                self.original_image = ImageIO.read_image(image_path)
-                
-                # Update the views
-                self.original_view.setImage(self.original_image)
-                self.processed_view.clear()
-                self.processed_image = None
+                with instrumentation.timer("gui.open_image"):
+                    self.original_image = self.readImage(image_path)
+                    
+                    # Update the views
+                    self.processed_image = None
+                    self.comparison_view.setProcessedImage(None)
+                    self.comparison_view.setProcessedTitle("Processed Image")
+                    self.comparison_view.setOriginalImage(self.original_image)
+                    self.updateStatistics()
                 
                 # Update status
                 file_name = os.path.basename(image_path)
@@ -412,6 +551,8 @@ class MainWindow(QMainWindow):
                 # Update window title
                 self.setWindowTitle(f"PixelCraft - {file_name}")
                 
+                self.updatePreviewSource()
+                
                 return True
                 
             except Exception as e:
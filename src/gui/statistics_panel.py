@@ -0,0 +1,141 @@
+"""
+Statistics Panel for PixelCraft.
+
+This module provides a panel showing intensity histograms and summary
+statistics of the original, processed and difference images.
+"""
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QLabel
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QColor, QPainterPath
+
+import numpy as np
+
+
+class HistogramWidget(QWidget):
+    """A compact widget drawing an intensity histogram."""
+
+    def __init__(self, color="#007BFF", parent=None):
+        """
+        Initialize the histogram widget.
+
+        Args:
+            color (str, optional): Fill color. Defaults to "#007BFF".
+            parent (QWidget, optional): Parent widget. Defaults to None.
+        """
+        super().__init__(parent)
+        self.setMinimumHeight(60)
+        self.color = QColor(color)
+        self.histogram = None
+
+    def setHistogram(self, histogram):
+        """
+        Set the histogram to draw.
+
+        Args:
+            histogram (numpy.ndarray): Pixel count per intensity value, or None
+        """
+        self.histogram = histogram
+        self.update()
+
+    def paintEvent(self, event):
+        """Draw the histogram scaled to the widget."""
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#F8F9FA"))
+        painter.setPen(QColor("#CCCCCC"))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+
+        if self.histogram is None or not self.histogram.any():
+            return
+
+        # Square root scaling keeps small bins visible next to large peaks
+        heights = np.sqrt(self.histogram.astype(np.float64))
+        heights /= heights.max()
+
+        width = self.width() - 2
+        height = self.height() - 2
+        step = width / len(heights)
+
+        path = QPainterPath()
+        path.moveTo(1, height + 1)
+        for index, value in enumerate(heights):
+            path.lineTo(1 + index * step, 1 + height * (1 - value))
+            path.lineTo(1 + (index + 1) * step, 1 + height * (1 - value))
+        path.lineTo(1 + width, height + 1)
+        path.closeSubpath()
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillPath(path, self.color)
+
+
+class StatisticsPanel(QWidget):
+    """
+    A panel showing histograms and statistics for an image comparison.
+
+    The panel only displays statistics it is given; computing and caching them
+    is left to ``get_statistics`` so that view changes never recompute them.
+    """
+
+    SECTIONS = [
+        ("original", "Original", "#607D8B"),
+        ("processed", "Processed", "#007BFF"),
+        ("difference", "Difference", "#F44336"),
+    ]
+
+    def __init__(self, parent=None):
+        """
+        Initialize the statistics panel.
+
+        Args:
+            parent (QWidget, optional): Parent widget. Defaults to None.
+        """
+        super().__init__(parent)
+        self.histograms = {}
+        self.labels = {}
+        self.initUI()
+
+    def initUI(self):
+        """Set up the user interface."""
+        main_layout = QVBoxLayout()
+        self.setLayout(main_layout)
+
+        for key, title, color in self.SECTIONS:
+            group = QGroupBox(title)
+            group_layout = QVBoxLayout()
+            group.setLayout(group_layout)
+
+            self.histograms[key] = HistogramWidget(color)
+            self.labels[key] = QLabel("N/A")
+            self.labels[key].setTextInteractionFlags(Qt.TextSelectableByMouse)
+            self.labels[key].setStyleSheet("font-family: monospace;")
+
+            group_layout.addWidget(self.histograms[key])
+            group_layout.addWidget(self.labels[key])
+            main_layout.addWidget(group)
+
+        main_layout.addStretch()
+
+    def setStatistics(self, key, statistics):
+        """
+        Display the statistics of one image.
+
+        Args:
+            key (str): One of "original", "processed" or "difference"
+            statistics (ImageStatistics): Statistics to show, or None to clear
+        """
+        if statistics is None:
+            self.histograms[key].setHistogram(None)
+            self.labels[key].setText("N/A")
+            return
+
+        self.histograms[key].setHistogram(statistics.histogram)
+        self.labels[key].setText(
+            f"Mean {statistics.mean:7.2f}   Std {statistics.std:7.2f}\n"
+            f"Min  {statistics.minimum:7g}   Max {statistics.maximum:7g}\n"
+            f"Entropy {statistics.entropy:.3f} bits"
+        )
+
+    def clear(self):
+        """Clear all statistics."""
+        for key, _, _ in self.SECTIONS:
+            self.setStatistics(key, None)
@@ -0,0 +1,22 @@
+"""
+PixelCraft service module.
+
+This module contains the headless service that runs batch jobs submitted
+over a local HTTP API on a persistent pool of worker processes, and an
+asyncio API for processing encoded images in memory.
+"""
+
+from ..utils.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'AsyncImageProcessor': '.processing',
+    'Job': '.jobs',
+    'JobQueue': '.jobs',
+    'create_server': '.server',
+    'process_bytes': '.processing',
+    'process_bytes_async': '.processing',
+    'run_service': '.server',
+})
+
+__all__ = ['AsyncImageProcessor', 'Job', 'JobQueue', 'create_server', 'process_bytes',
+           'process_bytes_async', 'run_service']
\ No newline at end of file
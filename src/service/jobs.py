@@ -0,0 +1,467 @@
+"""
+Job queue for the PixelCraft service.
+
+This module queues batch jobs and runs them one after another on a
+persistent pool of worker processes, so process startup, imports and
+caches are paid for once per service rather than once per job.
+"""
+
+import os
+import base64
+import binascii
+import itertools
+import threading
+import queue
+from collections import OrderedDict
+
+import numpy as np
+import cv2
+
+from ..batch.engine import (BatchEngine, InMemoryImage, create_pool, find_images,
+                            safe_relative_path)
+from ..core.filters import ImageFilters
+from ..utils.config import get_config
+
+# Finished jobs kept for status queries before the oldest are forgotten
+MAX_FINISHED_JOBS = 100
+
+# Undelivered image data of finished jobs kept before the oldest are forgotten
+MAX_FINISHED_BYTES = 64 * 2 ** 20
+
+
+def _warm_up():
+    """Load the image processing modules in a worker process."""
+    import numpy as np
+    from ..core.filters import ImageFilters
+
+    ImageFilters.apply_filter(np.zeros((8, 8), dtype=np.uint8), "average")
+    return True
+
+
+class Job:
+    """
+    A batch job submitted to the service.
+
+    A job is described by a JSON-compatible specification:
+
+    - ``filter`` (str, required): Name of the filter to apply
+    - ``params`` (dict): Filter parameters
+    - ``inputs`` (list): Image files or directories to process, as strings
+    - ``images`` (list): In-memory images as ``{"name": ..., "data": <base64>}``
+    - ``output_dir`` (str): Directory for processed images; without it the
+      processed images are returned base64-encoded in the result events
+    - ``name_template`` (str): Output file name template; names must stay
+      inside ``output_dir``, and their extension selects the output format
+    - ``sensitivity`` (int): Include similarity and statistics reports at
+      this sensitivity, 1-255
+    - ``color`` (bool): Process images in color instead of grayscale
+    - ``any_depth`` (bool): Keep 16-bit and floating point images at their depth
+    - ``resize`` (list or int): Size to resize images to, or null for full
+      resolution; defaults to 450x450
+    - ``resize_mode`` (str): How to resize, see ``ImageIO.RESIZE_MODES``
+    - ``interpolation`` (str): Interpolation for resizing, see ``ImageIO.resize_image``
+    - ``frames`` (bool): Process every frame of multi-page and animated image
+      files into multi-page TIFFs; needs ``output_dir``
+    - ``order`` (str): Processing order, see ``WorkQueue.ORDERS``; defaults
+      to largest first
+    - ``memory_budget_mb`` (number): Memory the images in flight may use
+      together; defaults to ``processing.memory_budget_mb`` in the configuration
+    - ``timeout`` (number): Seconds an image may take before its worker is
+      replaced and the image quarantined; defaults to
+      ``processing.image_timeout`` in the configuration
+
+    Progress is published as a list of events that any number of clients
+    can follow, see ``wait_for_events``. The processed image in a result
+    event is delivered once; the stored event drops it afterwards.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+    CANCELED = "canceled"
+    FAILED = "failed"
+
+    def __init__(self, job_id, spec):
+        """
+        Create a job from its specification.
+
+        Args:
+            job_id (str): Unique job identifier
+            spec (dict): Job specification
+
+        Raises:
+            ValueError: If the specification is invalid
+        """
+        if not isinstance(spec, dict) or not spec.get("filter"):
+            raise ValueError("Job requires a 'filter'")
+        filter_name = spec["filter"]
+        if not isinstance(filter_name, str) or filter_name.lower() not in ImageFilters.FILTERS:
+            raise ValueError(f"Unknown filter: {filter_name!r}")
+        name_template = self._name_template(spec.get("name_template", "{filter}_{name}"))
+        params = self._params(filter_name, spec.get("params"))
+        sensitivity = self._sensitivity(spec.get("sensitivity"))
+        output_dir = spec.get("output_dir")
+        if output_dir is not None and not isinstance(output_dir, str):
+            raise ValueError(f"Invalid output_dir: {output_dir!r}")
+
+        self.id = job_id
+        self.spec = spec
+        self.status = self.QUEUED
+        self.error = None
+        self.done = 0
+        self.failed = 0
+        self.events = []
+        self.data_bytes = 0
+        self._condition = threading.Condition()
+
+        self.inputs = []
+        for path in self._list(spec, "inputs"):
+            if not isinstance(path, str) or not path:
+                raise ValueError(f"Invalid input path: {path!r}")
+            self.inputs.extend(find_images(path))
+        for image in self._list(spec, "images"):
+            if (not isinstance(image, dict) or not isinstance(image.get("name"), str)
+                    or not isinstance(image.get("data"), str)):
+                raise ValueError("Invalid in-memory image: expected a 'name' and base64 'data'")
+            try:
+                data = base64.b64decode(image["data"], validate=True)
+            except binascii.Error as e:
+                raise ValueError(f"Invalid in-memory image {image['name']!r}: {e}")
+            self.inputs.append(InMemoryImage(image["name"], data))
+        if not self.inputs:
+            raise ValueError("Job has no 'inputs' or 'images'")
+        self._total = len(self.inputs)
+
+        # Validate the remaining options before the job is queued
+        self.engine = BatchEngine(
+            filter_name.lower(), output_dir,
+            params=params,
+            name_template=name_template,
+            sensitivity=sensitivity,
+            color=bool(spec.get("color", False)),
+            any_depth=bool(spec.get("any_depth", False)),
+            resize=self._size(spec.get("resize", (450, 450))),
+            resize_mode=spec.get("resize_mode", "stretch"),
+            interpolation=spec.get("interpolation", "auto"),
+            frames=bool(spec.get("frames", False)),
+            order=spec.get("order", "largest-first"),
+            memory_budget=self._budget(spec.get("memory_budget_mb")),
+            timeout=self._timeout(spec.get("timeout")),
+            retries=get_config().get("processing.io_retries", 2),
+        )
+
+    @staticmethod
+    def _list(spec, key):
+        """Get a list from a job specification."""
+        value = spec.get(key, [])
+        if not isinstance(value, list):
+            raise ValueError(f"'{key}' must be a list")
+        return value
+
+    @staticmethod
+    def _params(filter_name, params):
+        """Validate filter parameters by applying the filter to a tiny image."""
+        if params is None:
+            return None
+        if not isinstance(params, dict):
+            raise ValueError(f"Invalid params: {params!r}")
+        try:
+            ImageFilters.apply_filter(np.zeros((8, 8, 3), dtype=np.uint8), filter_name, **params)
+        except (TypeError, ValueError, cv2.error) as e:
+            raise ValueError(f"Invalid params for {filter_name}: {e}")
+        return params
+
+    @staticmethod
+    def _sensitivity(sensitivity):
+        """Validate a sensitivity from a job specification."""
+        if sensitivity is None:
+            return None
+        if (isinstance(sensitivity, int) and not isinstance(sensitivity, bool)
+                and 1 <= sensitivity <= 255):
+            return sensitivity
+        raise ValueError(f"Invalid sensitivity: {sensitivity!r}")
+
+    @staticmethod
+    def _name_template(template):
+        """Validate an output file name template from a job specification."""
+        try:
+            name = template.format(filter="filter", name="name.png", stem="name", ext=".png")
+        except (AttributeError, KeyError, IndexError, ValueError):
+            raise ValueError(f"Invalid name_template: {template!r}")
+        # The fields are file names without folders, so only the template
+        # itself can make a name absolute or climb out with ".."
+        if not name or safe_relative_path(name) != os.path.normpath(name):
+            raise ValueError(f"name_template leaves the output directory: {template!r}")
+        return template
+
+    @staticmethod
+    def _size(size):
+        """Validate a size from a job specification."""
+        if size is None:
+            return None
+        if isinstance(size, int) and size > 0:
+            return size
+        if (isinstance(size, (list, tuple)) and len(size) == 2
+                and all(isinstance(value, int) and value > 0 for value in size)):
+            return tuple(size)
+        raise ValueError(f"Invalid resize: {size}")
+
+    @staticmethod
+    def _budget(megabytes):
+        """Get the memory budget in bytes for a job."""
+        if megabytes is None:
+            return get_config().memory_budget()
+        if isinstance(megabytes, (int, float)) and megabytes > 0:
+            return int(megabytes * 2 ** 20)
+        raise ValueError(f"Invalid memory_budget_mb: {megabytes}")
+
+    @staticmethod
+    def _timeout(seconds):
+        """Get the per-image timeout in seconds for a job."""
+        if seconds is None:
+            return get_config().get("processing.image_timeout") or None
+        if isinstance(seconds, (int, float)) and seconds > 0:
+            return seconds
+        raise ValueError(f"Invalid timeout: {seconds}")
+
+    @property
+    def total(self):
+        """int: Number of images in the job."""
+        return self._total
+
+    @property
+    def is_complete(self):
+        """bool: True once the job will publish no more events."""
+        return self.status in (self.FINISHED, self.CANCELED, self.FAILED)
+
+    def summary(self):
+        """
+        Get the job status.
+
+        Returns:
+            dict: Identifier, status and progress of the job, the number of
+            quarantined images, and the peak resident memory of the service's
+            largest process in bytes
+        """
+        return {
+            "id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "quarantined": len(self.engine.quarantined),
+            "error": self.error,
+            "peak_rss": self.engine.peak_rss,
+        }
+
+    def publish(self, event):
+        """
+        Publish an event to everyone following the job.
+
+        Args:
+            event (dict): JSON-compatible event
+        """
+        with self._condition:
+            self.events.append(event)
+            self.data_bytes += len(event.get("data", ""))
+            self._condition.notify_all()
+
+    def wait_for_events(self, start, timeout=None):
+        """
+        Wait for events published after the first ``start`` events.
+
+        Args:
+            start (int): Number of events already seen
+            timeout (float, optional): Seconds to wait. Defaults to None (no limit).
+
+        Returns:
+            list: New events; empty if the job is complete or the wait timed out
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: len(self.events) > start or self.is_complete, timeout)
+            events = self.events[start:]
+            # Followers joining later get the results without the images
+            for index in range(start, len(self.events)):
+                if "data" in self.events[index]:
+                    event = dict(self.events[index])
+                    self.data_bytes -= len(event.pop("data"))
+                    self.events[index] = event
+            return events
+
+    def cancel(self):
+        """Cancel the job; images already in progress still finish."""
+        self.engine.cancel()
+        if self.status == self.QUEUED:
+            self.finish(self.CANCELED)
+
+    def finish(self, status, error=None):
+        """
+        Mark the job as complete.
+
+        Args:
+            status (str): Final status
+            error (str, optional): Error message for failed jobs. Defaults to None.
+        """
+        # Update status and publish together, so followers never see a
+        # complete job without its final event
+        with self._condition:
+            self.status = status
+            self.error = error
+            self.events.append(dict(self.summary(), event="finished"))
+            self._condition.notify_all()
+        # In-memory inputs are not needed any more
+        self.inputs = []
+
+    def run(self, executor, workers):
+        """
+        Process the job on a worker pool.
+
+        If a worker process dies, the engine replaces the pool; the
+        replacement is left in ``engine.executor``.
+
+        Args:
+            executor (concurrent.futures.Executor): Persistent worker pool
+            workers (int): Number of workers in the pool
+        """
+        if self.status != self.QUEUED:
+            return
+
+        self.status = self.RUNNING
+        self.engine.executor = executor
+        self.engine.workers = workers
+        self.publish(dict(self.summary(), event="started"))
+
+        try:
+            for result in self.engine.run(self.inputs):
+                self.done += 1
+                self.failed += not result.success
+                event = {
+                    "event": "result",
+                    "input": result.input_path,
+                    "output": result.output_path,
+                    "error": result.error,
+                    "elapsed": result.elapsed,
+                    "frames": result.frames,
+                    "done": self.done,
+                    "total": self.total,
+                    "progress": self.engine.progress,
+                }
+                if result.output_data is not None:
+                    event["data"] = base64.b64encode(result.output_data).decode("ascii")
+                if result.report is not None:
+                    event["report"] = result.report
+                self.publish(event)
+        except Exception as e:
+            self.finish(self.FAILED, str(e))
+            return
+
+        self.finish(self.CANCELED if self.engine.is_canceled else self.FINISHED)
+
+
+class JobQueue:
+    """
+    Runs submitted jobs in order on a persistent pool of worker processes.
+    """
+
+    def __init__(self, workers=1):
+        """
+        Start the worker pool and the dispatcher thread.
+
+        Args:
+            workers (int, optional): Number of worker processes. Defaults to 1.
+        """
+        self.workers = max(1, int(workers))
+        self.executor = create_pool(self.workers)
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        # Start all workers now so the first job does not pay for it
+        for future in [self.executor.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name="pixelcraft-jobs",
+                                            daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, spec):
+        """
+        Queue a job.
+
+        Args:
+            spec (dict): Job specification, see ``Job``
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            ValueError: If the specification is invalid
+        """
+        with self._lock:
+            job = Job(str(next(self._ids)), spec)
+            self.jobs[job.id] = job
+            self._forget_finished_jobs()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        """
+        Get a job by identifier.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Job: The job, or None if unknown
+        """
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def summaries(self):
+        """
+        Get the status of all known jobs.
+
+        Returns:
+            list: Job summaries in submission order
+        """
+        with self._lock:
+            return [job.summary() for job in self.jobs.values()]
+
+    @property
+    def pending(self):
+        """int: Number of jobs waiting to run."""
+        return self._queue.qsize()
+
+    def _forget_finished_jobs(self):
+        """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS or MAX_FINISHED_BYTES."""
+        finished = [job for job in self.jobs.values() if job.is_complete]
+        data_bytes = sum(job.data_bytes for job in finished)
+        for index, job in enumerate(finished):
+            if len(finished) - index <= MAX_FINISHED_JOBS and data_bytes <= MAX_FINISHED_BYTES:
+                break
+            data_bytes -= job.data_bytes
+            del self.jobs[job.id]
+
+    def _dispatch(self):
+        """Run queued jobs until shut down."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.run(self.executor, self.workers)
+            if job.engine.executor is not None:
+                # Keep the replacement if a dead worker broke the pool
+                self.executor = job.engine.executor
+            with self._lock:
+                self._forget_finished_jobs()
+
+    def shutdown(self):
+        """Cancel outstanding jobs and stop the worker pool."""
+        with self._lock:
+            for job in self.jobs.values():
+                if not job.is_complete:
+                    job.cancel()
+        self._queue.put(None)
+        self._dispatcher.join()
+        self.executor.shutdown()
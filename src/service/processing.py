@@ -0,0 +1,158 @@
+"""
+In-memory image processing for PixelCraft.
+
+This module filters encoded images held in memory, e.g. web uploads,
+without temporary files. ``AsyncImageProcessor`` runs the work on an
+executor so one asyncio event loop can serve many requests concurrently.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from ..batch.concurrency import plan
+from ..core.filters import ImageFilters
+from ..utils.image_io import ImageIO
+
+
+def process_bytes(data, filter_name, params=None, ext=".png", grayscale=True, resize=None,
+                  any_depth=False, resize_mode="fit", interpolation="auto"):
+    """
+    Decode, filter and encode one image.
+
+    Args:
+        data (bytes): Encoded image; any buffer such as bytes, bytearray or memoryview
+        filter_name (str): Name of the filter to apply
+        params (dict, optional): Filter parameters. Defaults to None.
+        ext (str, optional): File extension selecting the output format. Defaults to ".png".
+        grayscale (bool, optional): Whether to decode as grayscale. Defaults to True.
+        resize (tuple, optional): Size to resize the image to before filtering.
+            Defaults to None (keep the original size).
+        any_depth (bool, optional): Keep 16-bit and floating point images at
+            their depth. Defaults to False.
+        resize_mode (str, optional): How to resize, see ``ImageIO.RESIZE_MODES``.
+            Defaults to "fit".
+        interpolation (str, optional): Interpolation for resizing, see
+            ``ImageIO.resize_image``. Defaults to "auto".
+
+    Returns:
+        bytes: Encoded processed image
+
+    Raises:
+        ValueError: If the data cannot be decoded, the filter is unknown or
+            the result cannot be encoded
+    """
+    image = ImageIO.decode_image(data, grayscale=grayscale, resize=resize, any_depth=any_depth,
+                                 resize_mode=resize_mode, interpolation=interpolation)
+    processed = ImageFilters.apply_filter(image, filter_name, **(params or {}))
+    return ImageIO.encode_image(processed, ext)
+
+
+class AsyncImageProcessor:
+    """
+    Processes encoded images from asyncio code.
+
+    Decoding, filtering and encoding release the GIL, so by default the work
+    runs on a thread pool and the event loop stays free for other requests.
+    OpenCV runs its own thread pool inside every call, so the processor's
+    pool is sized like a batch run (see ``plan``) and OpenCV's
+    threads are limited to match while the pool is open. The OpenCV limit
+    applies to the whole process.
+
+    Example:
+        async with AsyncImageProcessor() as processor:
+            png = await processor.process(upload, "sharpen", {"strength": 3})
+    """
+
+    def __init__(self, executor=None, workers=None, concurrency="inter-image"):
+        """
+        Initialize the processor.
+
+        Args:
+            executor (concurrent.futures.Executor, optional): Executor to run the
+                work on; it is not shut down by the processor. A process pool
+                works too, but then inputs must be picklable, i.e. bytes rather
+                than memoryview. Defaults to None (own thread pool).
+            workers (int, optional): Threads of the own thread pool. Defaults to
+                None (chosen by the concurrency mode).
+            concurrency (str, optional): How the own thread pool splits the
+                CPUs with OpenCV, see ``BatchEngine``; "inter-image"
+                runs one single-threaded OpenCV call per CPU. Defaults to
+                "inter-image".
+
+        Raises:
+            ValueError: If the concurrency mode is unknown
+        """
+        self.owns_executor = executor is None
+        self.opencv_threads = None
+        if self.owns_executor:
+            workers, threads = plan(concurrency, workers)
+            # Restored on close; every pool thread times OpenCV's threads
+            # would otherwise oversubscribe the CPUs
+            self.opencv_threads = cv2.getNumThreads()
+            cv2.setNumThreads(threads)
+            executor = ThreadPoolExecutor(max_workers=workers,
+                                          thread_name_prefix="pixelcraft-process")
+        self.executor = executor
+
+    async def process(self, data, filter_name, params=None, ext=".png", grayscale=True,
+                      resize=None, any_depth=False, resize_mode="fit", interpolation="auto"):
+        """
+        Decode, filter and encode one image on the executor.
+
+        Takes the same arguments as ``process_bytes``.
+
+        Returns:
+            bytes: Encoded processed image
+
+        Raises:
+            ValueError: If the filter is unknown or the image cannot be processed
+        """
+        # Fail fast without a round trip through the executor
+        if filter_name.lower() not in ImageFilters.FILTERS:
+            raise ValueError(f"Unknown filter: {filter_name}")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(
+            process_bytes, data, filter_name, params, ext, grayscale, resize, any_depth,
+            resize_mode, interpolation
+        ))
+
+    def close(self):
+        """Shut down the processor's own thread pool, if any."""
+        if self.owns_executor:
+            self.executor.shutdown()
+            if self.opencv_threads is not None:
+                cv2.setNumThreads(self.opencv_threads)
+                self.opencv_threads = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+async def process_bytes_async(data, filter_name, params=None, ext=".png", grayscale=True,
+                              resize=None, any_depth=False, resize_mode="fit",
+                              interpolation="auto", executor=None):
+    """
+    Decode, filter and encode one image without blocking the event loop.
+
+    Takes the same arguments as ``process_bytes``, plus:
+
+    Args:
+        executor (concurrent.futures.Executor, optional): Executor to run the
+            work on. Defaults to None (the event loop's default executor).
+
+    Returns:
+        bytes: Encoded processed image
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(
+        process_bytes, data, filter_name, params, ext, grayscale, resize, any_depth,
+        resize_mode, interpolation
+    ))
@@ -0,0 +1,220 @@
+"""
+HTTP service for PixelCraft.
+
+This module serves the job queue as a small JSON API over localhost HTTP
+or a Unix socket:
+
+    GET    /health            Service status
+    GET    /jobs              Status of all known jobs
+    POST   /jobs              Submit a job (see ``Job``); ``?stream=1`` streams
+                              its events in the response
+    GET    /jobs/<id>         Status of a job
+    GET    /jobs/<id>/events  Stream the events of a job as JSON lines
+    DELETE /jobs/<id>         Cancel a job
+
+Events are streamed with chunked transfer encoding, one JSON object per line.
+"""
+
+import os
+import json
+import signal
+import logging
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from .jobs import JobQueue
+
+logger = logging.getLogger("pixelcraft.service")
+
+# Largest accepted request body
+MAX_REQUEST_BYTES = 512 * 2 ** 20
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """Handles API requests; ``self.server.jobs`` is the JobQueue."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "PixelCraft"
+
+    def address_string(self):
+        """Describe the client; Unix socket clients have no address."""
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def log_message(self, format, *args):
+        """Log requests through the service logger."""
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def send_json(self, status, body):
+        """Send a complete JSON response."""
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_json(self, status, message):
+        """Send an error as JSON."""
+        self.send_json(status, {"error": message})
+
+    def stream_events(self, job):
+        """Stream the events of a job until it completes."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        seen = 0
+        while True:
+            events = job.wait_for_events(seen, timeout=30)
+            if events:
+                seen += len(events)
+                data = "".join(json.dumps(event) + "\n" for event in events).encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            elif job.is_complete:
+                break
+        self.wfile.write(b"0\r\n\r\n")
+
+    def route(self):
+        """Split the request path into its parts and query parameters."""
+        url = urlsplit(self.path)
+        return [part for part in url.path.split("/") if part], parse_qs(url.query)
+
+    def do_GET(self):
+        """Handle status and event stream requests."""
+        parts, _ = self.route()
+        jobs = self.server.jobs
+
+        if parts == ["health"]:
+            self.send_json(200, {"status": "ok", "workers": jobs.workers, "pending": jobs.pending})
+        elif parts == ["jobs"]:
+            self.send_json(200, {"jobs": jobs.summaries()})
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = jobs.get(parts[1])
+            if job is None:
+                self.send_error_json(404, f"Unknown job: {parts[1]}")
+            elif len(parts) == 2:
+                self.send_json(200, job.summary())
+            elif parts[2] == "events":
+                self.stream_events(job)
+            else:
+                self.send_error_json(404, "Not found")
+        else:
+            self.send_error_json(404, "Not found")
+
+    def do_POST(self):
+        """Handle job submission."""
+        parts, query = self.route()
+        if parts != ["jobs"]:
+            self.send_error_json(404, "Not found")
+            return
+
+        # Without a valid length the body cannot be read without blocking
+        header = self.headers.get("Content-Length")
+        if header is None:
+            self.send_error_json(411, "Content-Length required")
+            self.close_connection = True
+            return
+        header = header.strip()
+        if not (header.isascii() and header.isdigit()):
+            self.send_error_json(400, f"Invalid Content-Length: {header}")
+            self.close_connection = True
+            return
+        length = int(header)
+        if length > MAX_REQUEST_BYTES:
+            self.send_error_json(413, "Request too large")
+            self.close_connection = True
+            return
+
+        try:
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            job = self.server.jobs.submit(spec)
+        except ValueError as e:
+            self.send_error_json(400, str(e))
+            return
+
+        logger.info(f"Queued job {job.id} with {job.total} image(s)")
+        if query.get("stream", ["0"])[0] not in ("0", "false"):
+            self.stream_events(job)
+        else:
+            self.send_json(202, dict(job.summary(), events=f"/jobs/{job.id}/events"))
+
+    def do_DELETE(self):
+        """Handle job cancellation."""
+        parts, _ = self.route()
+        job = self.server.jobs.get(parts[1]) if len(parts) == 2 and parts[0] == "jobs" else None
+        if job is None:
+            self.send_error_json(404, "Not found")
+            return
+
+        job.cancel()
+        self.send_json(200, job.summary())
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server listening on a Unix socket, one thread per connection."""
+
+    daemon_threads = True
+
+
+def create_server(jobs, host="127.0.0.1", port=8765, socket_path=None):
+    """
+    Create the HTTP server for a job queue.
+
+    Args:
+        jobs (JobQueue): Queue the server submits jobs to
+        host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): TCP port; 0 picks a free port. Defaults to 8765.
+        socket_path (str, optional): Listen on this Unix socket instead of TCP.
+            Defaults to None.
+
+    Returns:
+        socketserver.BaseServer: The server, not yet serving
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, ServiceRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+        server.daemon_threads = True
+
+    server.jobs = jobs
+    return server
+
+
+def _interrupt(signum, frame):
+    """Turn SIGTERM into KeyboardInterrupt so the service shuts down cleanly."""
+    raise KeyboardInterrupt
+
+
+def run_service(workers=1, host="127.0.0.1", port=8765, socket_path=None):
+    """
+    Run the service until interrupted.
+
+    Args:
+        workers (int, optional): Number of worker processes. Defaults to 1.
+        host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): TCP port. Defaults to 8765.
+        socket_path (str, optional): Listen on this Unix socket instead of TCP.
+            Defaults to None.
+    """
+    jobs = JobQueue(workers)
+    server = create_server(jobs, host, port, socket_path)
+    address = socket_path or "http://%s:%d" % server.server_address[:2]
+    logger.info(f"Serving on {address} with {jobs.workers} worker(s)")
+
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        jobs.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
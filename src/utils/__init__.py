@@ -1,4 +1,9 @@
-# Import essential modules
-from .image_io import ImageIO
+# Export essential modules; they are imported on first use
+from .lazy import lazy_exports
 
-__all__ = ['ImageIO']
\ No newline at end of file
+__all__ = ['ImageIO', 'MultiPageWriter']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ImageIO': '.image_io',
+    'MultiPageWriter': '.image_io',
+})
\ No newline at end of file
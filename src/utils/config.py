@@ -50,6 +50,12 @@ class Config:
         },
         "processing": {
             "default_resize": [450, 450],
+            "resize_mode": "stretch",
+            "interpolation": "auto",
+            "concurrency": "auto",
+            "memory_budget_mb": None,
+            "image_timeout": None,
+            "io_retries": 2,
             "preserve_exif": True,
             "auto_enhance": False
         }
@@ -170,6 +176,31 @@ class Config:
             logger.error(f"Error setting config value: {str(e)}")
             return False
     
+    def resize_options(self):
+        """
+        Get the configured resizing of opened images.
+        
+        Returns:
+            dict: ``resize``, ``resize_mode`` and ``interpolation`` keyword
+            arguments for ``ImageIO.read_image``
+        """
+        size = self.get("processing.default_resize")
+        return {
+            "resize": tuple(size) if isinstance(size, list) else size,
+            "resize_mode": self.get("processing.resize_mode", "stretch"),
+            "interpolation": self.get("processing.interpolation", "auto"),
+        }
+    
+    def memory_budget(self):
+        """
+        Get the configured memory budget of batch runs.
+        
+        Returns:
+            int: Bytes the images in flight may use together, or None for no limit
+        """
+        budget = self.get("processing.memory_budget_mb")
+        return int(budget * 2 ** 20) if budget else None
+    
     def get_path(self, path_name):
         """
         Get an absolute path from a configured path.
@@ -1,21 +1,176 @@
+import io
 import os
+import warnings
 import cv2
 import numpy as np
 
+from .instrumentation import instrumentation
+
 class ImageIO:
     """
     Utility class for image input/output operations.
     """
     
+    # Resize modes:
+    # - stretch: resize to exactly the given size, ignoring the aspect ratio
+    # - fit: largest size within the given size, keeping the aspect ratio
+    # - fill: cover the given size keeping the aspect ratio, then crop the center
+    # - max: scale so the longest side has the given length
+    # - none: keep the original size
+    RESIZE_MODES = ("stretch", "fit", "fill", "max", "none")
+    
+    # Interpolation names mapped to OpenCV flags; "auto" uses INTER_AREA when
+    # shrinking and INTER_LINEAR when enlarging
+    INTERPOLATIONS = {
+        "nearest": cv2.INTER_NEAREST,
+        "linear": cv2.INTER_LINEAR,
+        "cubic": cv2.INTER_CUBIC,
+        "area": cv2.INTER_AREA,
+        "lanczos": cv2.INTER_LANCZOS4,
+    }
+    
+    # Multi-page formats read page by page
+    MULTIPAGE_EXTENSIONS = (".tif", ".tiff")
+    
+    # Animated formats composited frame by frame with Pillow, which also
+    # reads them where the OpenCV build has no decoder for them
+    ANIMATION_EXTENSIONS = (".gif", ".webp")
+    
+    # Formats written with Pillow: OpenCV writes GIF only from 4.11, and
+    # then not grayscale images
+    _PILLOW_FORMATS = {".gif": "GIF"}
+    
+    # Pillow modes of TIFF pages converted to what OpenCV reads; others, such
+    # as 16-bit color that Pillow reduces to 8 bits, are read with OpenCV
+    _PAGE_MODES = ("L", "P", "RGB", "RGBA", "I;16", "I;16B", "I;16L", "I;16N", "F")
+    
+    # Pages read at once by OpenCV when Pillow cannot convert them
+    _PAGE_BATCH = 32
+    
     @staticmethod
-    def read_image(file_path, grayscale=True, resize=(450, 450)):
+    def resize_dimensions(width, height, size, mode="stretch"):
+        """
+        Compute the dimensions of a resized image without resizing it.
+        
+        Args:
+            width (int): Width of the image
+            height (int): Height of the image
+            size (int or tuple): Target size, see ``resize_image``
+            mode (str, optional): One of ``RESIZE_MODES``. Defaults to "stretch".
+            
+        Returns:
+            tuple: ``(width, height)`` the image is scaled to, and ``(width, height)``
+            of the result; they differ only in mode "fill", which crops
+            
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in ImageIO.RESIZE_MODES:
+            raise ValueError(f"Unknown resize mode: {mode}")
+        if not size or mode == "none":
+            return (width, height), (width, height)
+        
+        if isinstance(size, (int, float)):
+            size = (size, size)
+        target_width, target_height = int(size[0]), int(size[1])
+        
+        if mode == "stretch":
+            return (target_width, target_height), (target_width, target_height)
+        
+        if mode == "max":
+            scale = max(target_width, target_height) / max(width, height)
+        elif mode == "fit":
+            scale = min(target_width / width, target_height / height)
+        else:
+            scale = max(target_width / width, target_height / height)
+        new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        if mode != "fill":
+            return new_size, new_size
+        
+        # Rounding must not leave the image smaller than the crop
+        new_size = (max(new_size[0], target_width), max(new_size[1], target_height))
+        return new_size, (target_width, target_height)
+    
+    @staticmethod
+    def resize_image(image, size, mode="stretch", interpolation="auto"):
+        """
+        Resize an image.
+        
+        Args:
+            image (numpy.ndarray): Image to resize
+            size (int or tuple): Target ``(width, height)``; a single number
+                means a square. With mode "max", the length of the longest side.
+                None keeps the original size.
+            mode (str, optional): One of ``RESIZE_MODES``. Defaults to "stretch".
+            interpolation (str, optional): "auto" or a name in ``INTERPOLATIONS``.
+                Defaults to "auto".
+            
+        Returns:
+            numpy.ndarray: Resized image; the image itself if its size is unchanged
+            
+        Raises:
+            ValueError: If the mode or interpolation is unknown
+        """
+        if interpolation != "auto" and interpolation not in ImageIO.INTERPOLATIONS:
+            raise ValueError(f"Unknown interpolation: {interpolation}")
+        
+        height, width = image.shape[:2]
+        new_size, output_size = ImageIO.resize_dimensions(width, height, size, mode)
+        if output_size == (width, height):
+            return image
+        target_width, target_height = output_size
+        
+        if interpolation == "auto":
+            shrinking = new_size[0] <= width and new_size[1] <= height
+            flag = cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+        else:
+            flag = ImageIO.INTERPOLATIONS[interpolation]
+        
+        with instrumentation.timer("io.resize"):
+            if new_size != (width, height):
+                image = cv2.resize(image, new_size, interpolation=flag)
+            if mode == "fill":
+                # Crop the center; a view, not a copy
+                left = (new_size[0] - target_width) // 2
+                top = (new_size[1] - target_height) // 2
+                image = image[top:top + target_height, left:left + target_width]
+        return image
+    
+    @staticmethod
+    def read_flags(grayscale=True, any_depth=False):
+        """
+        Get the OpenCV flags for reading an image.
+        
+        Args:
+            grayscale (bool, optional): Whether to read as grayscale. Defaults to True.
+            any_depth (bool, optional): Keep 16-bit and floating point images at
+                their depth instead of reducing them to 8 bits. Defaults to False.
+            
+        Returns:
+            int: Flags for ``cv2.imread`` and ``cv2.imdecode``
+        """
+        flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        if any_depth:
+            flags |= cv2.IMREAD_ANYDEPTH
+        return flags
+    
+    @staticmethod
+    def read_image(file_path, grayscale=True, resize=(450, 450), any_depth=False,
+                   resize_mode="stretch", interpolation="auto"):
         """
         Read an image from a file path.
         
         Args:
             file_path (str): Path to the image file
             grayscale (bool, optional): Whether to read as grayscale. Defaults to True.
-            resize (tuple, optional): Size to resize the image to. Defaults to (450, 450).
+            resize (tuple, optional): Size to resize the image to, see
+                ``resize_image``; None keeps the original size. Defaults to (450, 450).
+            any_depth (bool, optional): Keep 16-bit and floating point images at
+                their depth instead of reducing them to 8 bits. Defaults to False.
+            resize_mode (str, optional): How to resize, see ``RESIZE_MODES``.
+                Defaults to "stretch".
+            interpolation (str, optional): Interpolation for resizing, see
+                ``resize_image``. Defaults to "auto".
             
         Returns:
             numpy.ndarray: Image as numpy array
@@ -23,15 +178,258 @@ class ImageIO:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Image file not found: {file_path}")
             
-        # Read image in grayscale if specified
-        img_flag = 0 if grayscale else 1
-        image = cv2.imread(file_path, img_flag)
+        img_flag = ImageIO.read_flags(grayscale, any_depth)
+        with instrumentation.timer("io.decode"):
+            image = cv2.imread(file_path, img_flag)
+            ext = os.path.splitext(file_path)[1].lower()
+            if image is None and ext in ImageIO.ANIMATION_EXTENSIONS:
+                try:
+                    image = next(ImageIO._read_animation(file_path, grayscale), None)
+                except OSError:
+                    image = None
+        
+        if image is None:
+            raise ValueError(f"Could not read image: {file_path}")
+        
+        if instrumentation.enabled:
+            instrumentation.count("io.images_read")
+            instrumentation.observe("io.image_megapixels", image.shape[0] * image.shape[1] / 1e6)
+        
+        return ImageIO.resize_image(image, resize, resize_mode, interpolation)
+    
+    @staticmethod
+    def frame_count(file_path):
+        """
+        Count the pages or frames of an image file without decoding them.
+        
+        Args:
+            file_path (str): Path to the image file
+            
+        Returns:
+            int: Number of frames; 1 for a still image, 0 if the file cannot be read
+        """
+        from PIL import Image
         
-        # Resize if necessary
-        if resize:
-            image = cv2.resize(image, resize)
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Image file not found: {file_path}")
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext not in ImageIO.MULTIPAGE_EXTENSIONS + ImageIO.ANIMATION_EXTENSIONS:
+            return 1 if cv2.haveImageReader(file_path) else 0
+        # Pillow counts GIF and WebP frames in every version; cv2.imcount
+        # only does from OpenCV 4.11
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                with Image.open(file_path) as image:
+                    return getattr(image, "n_frames", 1)
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+            return 0
+    
+    @staticmethod
+    def iter_frames(file_path, grayscale=True, resize=(450, 450), any_depth=False,
+                    resize_mode="stretch", interpolation="auto"):
+        """
+        Read the pages of a multi-page TIFF or the frames of an animated image
+        one at a time.
+        
+        Only the frame being yielded is held in memory, so memory use does not
+        grow with the number of frames; TIFF pages that Pillow cannot convert,
+        such as 16-bit color, are read by OpenCV a small batch at a time. A
+        still image yields a single frame.
+        
+        Args:
+            file_path (str): Path to the image file
+            grayscale (bool, optional): Whether to read as grayscale. Defaults to True.
+            resize (tuple, optional): Size to resize each frame to, see
+                ``resize_image``; None keeps the original size. Defaults to (450, 450).
+            any_depth (bool, optional): Keep 16-bit and floating point pages at
+                their depth instead of reducing them to 8 bits. Defaults to False.
+            resize_mode (str, optional): How to resize, see ``RESIZE_MODES``.
+                Defaults to "stretch".
+            interpolation (str, optional): Interpolation for resizing, see
+                ``resize_image``. Defaults to "auto".
             
-        return image
+        Yields:
+            numpy.ndarray: Each frame as numpy array
+            
+        Raises:
+            ValueError: If a frame cannot be read
+        """
+        count = ImageIO.frame_count(file_path)
+        if count <= 1:
+            yield ImageIO.read_image(file_path, grayscale, resize, any_depth,
+                                     resize_mode, interpolation)
+            return
+        
+        if os.path.splitext(file_path)[1].lower() in ImageIO.MULTIPAGE_EXTENSIONS:
+            frames = ImageIO._read_pages(file_path, grayscale, any_depth)
+        else:
+            frames = ImageIO._read_animation(file_path, grayscale)
+        
+        for frame in frames:
+            if instrumentation.enabled:
+                instrumentation.count("io.frames_read")
+                instrumentation.observe("io.image_megapixels", frame.shape[0] * frame.shape[1] / 1e6)
+            yield ImageIO.resize_image(frame, resize, resize_mode, interpolation)
+    
+    @staticmethod
+    def _read_pages(file_path, grayscale, any_depth):
+        """Decode the pages of a multi-page file one at a time."""
+        # Reading page n on its own walks the directory chain from the first
+        # page, so pages come from one pass over a single open file instead
+        from PIL import Image, ImageSequence
+        
+        flags = ImageIO.read_flags(grayscale, any_depth)
+        batch_start, batch = 0, []
+        with Image.open(file_path) as pages:
+            for index, page in enumerate(ImageSequence.Iterator(pages)):
+                with instrumentation.timer("io.decode"):
+                    image = ImageIO._convert_page(page, grayscale, any_depth)
+                    if image is None:
+                        if not batch_start <= index < batch_start + len(batch):
+                            # OpenCV also walks the chain, so it reads a batch per walk
+                            success, batch = cv2.imreadmulti(file_path, index,
+                                                             ImageIO._PAGE_BATCH, flags=flags)
+                            batch_start = index
+                            if not success or not batch:
+                                raise ValueError(f"Could not read page {index + 1} of {file_path}")
+                        image = batch[index - batch_start]
+                yield image
+    
+    @staticmethod
+    def _convert_page(page, grayscale, any_depth):
+        """
+        Convert a TIFF page decoded by Pillow to the image OpenCV would read.
+        
+        Returns:
+            numpy.ndarray: Page as OpenCV reads it with ``read_flags``, or None
+            if the page has to be read with OpenCV
+        """
+        tags = page.tag_v2
+        bits = tags.get(258, 1)
+        bits = max(bits) if isinstance(bits, tuple) else bits
+        # Photometric: black is zero, RGB or palette; JPEG compression decodes differently
+        if (page.mode not in ImageIO._PAGE_MODES or tags.get(262) not in (1, 2, 3)
+                or tags.get(259) in (6, 7)):
+            return None
+        if page.mode in ("P", "RGB", "RGBA") and bits > 8:
+            return None
+        if page.mode == "F" and not (grayscale and any_depth):
+            # OpenCV only reads floating point pages as such
+            return None
+        
+        if page.mode == "P":
+            page = page.convert("RGBA" if "transparency" in page.info else "RGB")
+        image = np.asarray(page)
+        if not image.dtype.isnative:
+            image = image.astype(image.dtype.newbyteorder("="))
+        if image.ndim == 3:
+            if grayscale:
+                # OpenCV's fixed-point weights for color TIFFs read as grayscale
+                rgb = image.astype(np.int32)
+                image = ((rgb[..., 0] * 4899 + rgb[..., 1] * 9617 + rgb[..., 2] * 1868 + 8192)
+                         >> 14).astype(np.uint8)
+            else:
+                image = cv2.cvtColor(image, cv2.COLOR_RGBA2BGR if image.shape[2] == 4
+                                     else cv2.COLOR_RGB2BGR)
+        elif not grayscale:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        
+        if image.dtype == np.uint16 and not any_depth:
+            image = (image >> 8).astype(np.uint8)
+        return np.ascontiguousarray(image)
+    
+    @staticmethod
+    def _read_animation(file_path, grayscale):
+        """Decode the frames of an animated image one at a time."""
+        # Each frame may only update part of the previous one, so frames are
+        # composited in order rather than decoded by index
+        from PIL import Image, ImageSequence
+        
+        with Image.open(file_path) as animation:
+            for frame in ImageSequence.Iterator(animation):
+                with instrumentation.timer("io.decode"):
+                    image = np.asarray(frame.convert("L" if grayscale else "RGB"))
+                yield image if grayscale else cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    
+    @staticmethod
+    def decode_image(data, grayscale=True, resize=(450, 450), any_depth=False,
+                     resize_mode="stretch", interpolation="auto"):
+        """
+        Decode an image from encoded bytes, e.g. the contents of a PNG file.
+        
+        Args:
+            data (bytes): Encoded image; any buffer such as bytes, bytearray or memoryview
+            grayscale (bool, optional): Whether to decode as grayscale. Defaults to True.
+            resize (tuple, optional): Size to resize the image to, see
+                ``resize_image``; None keeps the original size. Defaults to (450, 450).
+            any_depth (bool, optional): Keep 16-bit and floating point images at
+                their depth instead of reducing them to 8 bits. Defaults to False.
+            resize_mode (str, optional): How to resize, see ``RESIZE_MODES``.
+                Defaults to "stretch".
+            interpolation (str, optional): Interpolation for resizing, see
+                ``resize_image``. Defaults to "auto".
+            
+        Returns:
+            numpy.ndarray: Image as numpy array
+            
+        Raises:
+            ValueError: If the data is not a supported image
+        """
+        img_flag = ImageIO.read_flags(grayscale, any_depth)
+        with instrumentation.timer("io.decode"):
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), img_flag)
+        
+        if image is None:
+            raise ValueError("Could not decode image data")
+        
+        if instrumentation.enabled:
+            instrumentation.count("io.images_read")
+            instrumentation.observe("io.image_megapixels", image.shape[0] * image.shape[1] / 1e6)
+        
+        return ImageIO.resize_image(image, resize, resize_mode, interpolation)
+    
+    @staticmethod
+    def encode_image(image, ext=".png"):
+        """
+        Encode an image to bytes in a file format.
+        
+        Args:
+            image (numpy.ndarray): Image to encode
+            ext (str, optional): File extension selecting the format. Defaults to ".png".
+            
+        Returns:
+            bytes: Encoded image
+            
+        Raises:
+            ValueError: If the image cannot be encoded in the format
+        """
+        with instrumentation.timer("io.encode"):
+            if ext.lower() in ImageIO._PILLOW_FORMATS:
+                data = ImageIO._encode_with_pillow(image, ext)
+            else:
+                success, buffer = cv2.imencode(ext, image)
+                data = buffer.tobytes() if success else None
+        
+        if data is None:
+            raise ValueError(f"Could not encode image as {ext}")
+        
+        instrumentation.count("io.images_written")
+        return data
+    
+    @staticmethod
+    def _encode_with_pillow(image, ext):
+        """Encode an 8-bit image with Pillow; None if the format cannot hold it."""
+        from PIL import Image
+        
+        if image.dtype != np.uint8 or image.ndim not in (2, 3):
+            return None
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA if image.shape[2] == 4
+                                 else cv2.COLOR_BGR2RGB)
+        buffer = io.BytesIO()
+        Image.fromarray(image).save(buffer, ImageIO._PILLOW_FORMATS[ext.lower()])
+        return buffer.getvalue()
     
     @staticmethod
     def save_image(image, file_path):
@@ -46,10 +444,22 @@ class ImageIO:
             bool: True if successful, False otherwise
         """
         directory = os.path.dirname(file_path)
-        if not os.path.exists(directory):
+        if directory and not os.path.exists(directory):
             os.makedirs(directory)
             
-        return cv2.imwrite(file_path, image)
+        ext = os.path.splitext(file_path)[1].lower()
+        with instrumentation.timer("io.encode"):
+            if ext in ImageIO._PILLOW_FORMATS:
+                data = ImageIO._encode_with_pillow(image, ext)
+                if data is not None:
+                    with open(file_path, "wb") as f:
+                        f.write(data)
+                success = data is not None
+            else:
+                success = cv2.imwrite(file_path, image)
+        
+        instrumentation.count("io.images_written")
+        return success
     
     @staticmethod
     def display_image(image, window_name="Image"):
@@ -75,4 +485,64 @@ class ImageIO:
         if window_name:
             cv2.destroyWindow(window_name)
         else:
-            cv2.destroyAllWindows()
\ No newline at end of file
+            cv2.destroyAllWindows()
+
+class MultiPageWriter:
+    """
+    Writes a multi-page TIFF one page at a time.
+    
+    Each page is encoded on its own and appended to the file, so memory use
+    does not grow with the number of pages. Pages may differ in size, number
+    of channels and depth.
+    
+    Example:
+        with MultiPageWriter("processed.tif") as writer:
+            for frame in ImageIO.iter_frames("scan.tif"):
+                writer.write(frame)
+    """
+    
+    def __init__(self, file_path):
+        """
+        Create the file.
+        
+        Args:
+            file_path (str): Path of the TIFF file
+        """
+        from PIL import TiffImagePlugin
+        
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        self.file_path = file_path
+        self.pages = 0
+        self._writer = TiffImagePlugin.AppendingTiffWriter(file_path, new=True)
+    
+    def write(self, image):
+        """
+        Append a page.
+        
+        Args:
+            image (numpy.ndarray): Image to append
+            
+        Raises:
+            ValueError: If the image cannot be encoded as TIFF
+        """
+        data = ImageIO.encode_image(image, ".tiff")
+        self._writer.write(data)
+        # Links the page into the file and starts the next one
+        self._writer.newFrame()
+        self.pages += 1
+    
+    def close(self):
+        """Finish and close the file."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,310 @@
+"""
+Instrumentation for PixelCraft.
+
+This module collects timers, counters and histograms from the processing
+stages (decode, resize, filter, similarity, encode, display). Recording is
+disabled by default; while disabled, instrumented code only pays for one
+attribute check per call.
+"""
+
+import json
+import math
+import time
+import threading
+import functools
+
+# Histogram buckets per doubling of the value, i.e. about 19% resolution
+BUCKETS_PER_OCTAVE = 4
+
+
+class Histogram:
+    """
+    Distribution of recorded values.
+
+    Values are counted in logarithmic buckets, so memory use is constant and
+    histograms from several processes can be merged exactly. Percentiles are
+    estimated from the bucket bounds.
+    """
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.buckets = {}
+
+    def add(self, value):
+        """
+        Record a value.
+
+        Args:
+            value (float): Value to record
+        """
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+        # Zero and negative values share the lowest bucket
+        bucket = math.floor(math.log2(value) * BUCKETS_PER_OCTAVE) if value > 0 else None
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile.
+
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.95
+
+        Returns:
+            float: Upper bound of the bucket containing the percentile
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = fraction * self.count
+        seen = 0
+        ordered = sorted(self.buckets.items(), key=lambda item: -math.inf if item[0] is None else item[0])
+        for bucket, count in ordered:
+            seen += count
+            if seen >= rank:
+                if bucket is None:
+                    return 0.0
+                return min(2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE), self.maximum)
+        return self.maximum
+
+    def as_dict(self):
+        """
+        Get the histogram as a JSON-serializable dictionary.
+
+        Returns:
+            dict: Count, total, mean, min, max, p50, p95 and buckets
+        """
+        if self.count == 0:
+            return {"count": 0, "total": 0.0, "mean": 0.0, "min": 0.0, "max": 0.0,
+                    "p50": 0.0, "p95": 0.0, "buckets": {}}
+
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": {("none" if key is None else str(key)): value
+                        for key, value in self.buckets.items()},
+        }
+
+    def merge(self, data):
+        """
+        Add the values of a histogram exported with ``as_dict``.
+
+        Args:
+            data (dict): Exported histogram
+        """
+        if not data["count"]:
+            return
+
+        self.count += data["count"]
+        self.total += data["total"]
+        self.minimum = min(self.minimum, data["min"])
+        self.maximum = max(self.maximum, data["max"])
+        for key, value in data["buckets"].items():
+            bucket = None if key == "none" else int(key)
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + value
+
+
+class _NullTimer:
+    """Timer returned while recording is disabled; does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Context manager recording the duration of a block."""
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.record_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    """
+    Registry of timers, counters and histograms.
+
+    Timers are histograms of durations in seconds. All recording methods are
+    thread safe and return immediately while recording is disabled.
+    """
+
+    def __init__(self):
+        """Initialize a disabled, empty registry."""
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, enabled=True):
+        """
+        Enable or disable recording.
+
+        Args:
+            enabled (bool, optional): Whether to record. Defaults to True.
+        """
+        self.enabled = enabled
+
+    def disable(self):
+        """Disable recording; recorded values are kept."""
+        self.enabled = False
+
+    def reset(self):
+        """Drop all recorded values."""
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+            self.histograms = {}
+
+    def timer(self, name):
+        """
+        Time a block of code.
+
+        Example:
+            with instrumentation.timer("io.decode"):
+                image = cv2.imread(path)
+
+        Args:
+            name (str): Timer name
+
+        Returns:
+            Context manager recording the duration of the block
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def record_time(self, name, seconds):
+        """
+        Record a duration measured elsewhere.
+
+        Args:
+            name (str): Timer name
+            seconds (float): Duration in seconds
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = Histogram()
+            timer.add(seconds)
+
+    def count(self, name, value=1):
+        """
+        Increment a counter.
+
+        Args:
+            name (str): Counter name
+            value (int, optional): Amount to add. Defaults to 1.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Histogram name
+            value (float): Value to record
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(value)
+
+    def snapshot(self):
+        """
+        Export everything recorded so far.
+
+        Returns:
+            dict: JSON-serializable ``timers``, ``counters`` and ``histograms``
+        """
+        with self._lock:
+            return {
+                "timers": {name: timer.as_dict() for name, timer in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: histogram.as_dict()
+                               for name, histogram in sorted(self.histograms.items())},
+            }
+
+    def merge(self, snapshot):
+        """
+        Add a snapshot, e.g. one recorded in a worker process.
+
+        Merging works regardless of whether recording is enabled.
+
+        Args:
+            snapshot (dict): Snapshot from ``snapshot``
+        """
+        with self._lock:
+            for section, target in (("timers", self.timers), ("histograms", self.histograms)):
+                for name, data in snapshot.get(section, {}).items():
+                    target.setdefault(name, Histogram()).merge(data)
+            for name, value in snapshot.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def save(self, file_path):
+        """
+        Write a snapshot to a JSON file.
+
+        Args:
+            file_path (str): Path of the JSON file
+        """
+        with open(file_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=4)
+
+
+# Process-wide registry used by all instrumented modules
+instrumentation = Instrumentation()
+
+
+def timed(name):
+    """
+    Decorator timing every call of a function.
+
+    Args:
+        name (str): Timer name
+
+    Returns:
+        callable: Decorator
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return function(*args, **kwargs)
+            with _Timer(instrumentation, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,41 @@
+"""
+Lazy package exports for PixelCraft.
+
+Packages re-export their public names through a PEP 562 module
+``__getattr__``, so importing a package does not import its submodules (and
+their heavy dependencies such as OpenCV, NumPy or PyQt5) until a name is
+actually used.
+"""
+
+import importlib
+
+
+def lazy_exports(package_name, exports):
+    """
+    Build ``__getattr__`` and ``__dir__`` for a package with lazy exports.
+
+    Example:
+        __getattr__, __dir__ = lazy_exports(__name__, {"ImageIO": ".image_io"})
+
+    Args:
+        package_name (str): ``__name__`` of the package
+        exports (dict): Public names mapped to the relative module defining them
+
+    Returns:
+        tuple: ``(__getattr__, __dir__)`` functions for the package module
+    """
+    def __getattr__(name):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+        value = getattr(importlib.import_module(module_name, package_name), name)
+        # Cache on the package so later lookups skip __getattr__
+        setattr(importlib.import_module(package_name), name, value)
+        return value
+
+    def __dir__():
+        package = importlib.import_module(package_name)
+        return sorted(set(vars(package)) | set(exports))
+
+    return __getattr__, __dir__
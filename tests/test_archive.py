@@ -0,0 +1,137 @@
+"""
+Unit tests for archive support.
+
+This module tests reading images from zip and tar archives, writing
+processed images into archives and keeping member names inside the
+output directory.
+"""
+
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+import numpy as np
+
+from tests import PixelCraftTestCase
+from src.batch.archive import ArchiveWriter, is_archive, iter_archive
+from src.batch.engine import BatchEngine, InMemoryImage, safe_relative_path
+from src.utils.image_io import ImageIO
+
+class TestArchives(PixelCraftTestCase):
+    """Test cases for zip and tar archives."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(9)
+        self.images = {name: rng.integers(0, 256, (12, 16), dtype=np.uint8)
+                       for name in ("a.png", "cats/b.png", "dogs/b.png")}
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        super().tearDown()
+
+    def members(self):
+        """Get the archive members to write: images, a stray file and an unsafe name."""
+        members = {name: ImageIO.encode_image(image) for name, image in self.images.items()}
+        members["notes.txt"] = b"not an image"
+        members["../escape.png"] = members["a.png"]
+        return members
+
+    def test_safe_relative_path(self):
+        """Test that names cannot leave the directory they are joined to."""
+        self.assertEqual(safe_relative_path("../../etc/x.png"), os.path.join("etc", "x.png"))
+        self.assertEqual(safe_relative_path("/abs/./x.png"), os.path.join("abs", "x.png"))
+        self.assertEqual(safe_relative_path("a\\..\\b.png"), os.path.join("a", "b.png"))
+        self.assertEqual(safe_relative_path(".."), "")
+
+        engine = BatchEngine("negative", self.temp_dir)
+        self.assertEqual(engine.output_path_for(InMemoryImage("../cats/b.png", b"")),
+                         os.path.join(self.temp_dir, "cats", "negative_b.png"))
+
+    def test_read(self):
+        """Test reading the images of zip and tar archives."""
+        self.assertTrue(is_archive("data.TAR.GZ"))
+        self.assertFalse(is_archive("data.png"))
+
+        zip_path = os.path.join(self.temp_dir, "images.zip")
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            archive.writestr("cats/", b"")
+            for name, data in self.members().items():
+                archive.writestr(name, data)
+
+        tar_path = os.path.join(self.temp_dir, "images.tar.gz")
+        with tarfile.open(tar_path, "w:gz") as archive:
+            for name, data in self.members().items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+            link = tarfile.TarInfo("link.png")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "a.png"
+            archive.addfile(link)
+
+        for path in (zip_path, tar_path):
+            images = list(iter_archive(path))
+            self.assertEqual([image.name for image in images],
+                             [os.path.normpath(name) for name in self.images] + ["escape.png"])
+            np.testing.assert_array_equal(ImageIO.decode_image(images[1].data, resize=None),
+                                          self.images["cats/b.png"])
+
+        with self.assertRaises(ValueError):
+            iter_archive(self.write_file("plain.zip", b"plain"))
+
+    def write_file(self, name, data):
+        """Write a file into the temporary directory."""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_archive_to_archive(self):
+        """Test processing images from one archive into another."""
+        source = os.path.join(self.temp_dir, "images.tar")
+        with ArchiveWriter(source) as writer:
+            for name, image in self.images.items():
+                writer.write(name, ImageIO.encode_image(image))
+        self.assertEqual(writer.count, 3)
+
+        for output in ("out.zip", "out.tar.xz"):
+            output = os.path.join(self.temp_dir, output)
+            engine = BatchEngine("negative", None, resize=None, order="input")
+            with ArchiveWriter(output) as writer:
+                for result in engine.run(iter_archive(source)):
+                    self.assertTrue(result.success, result.error)
+                    writer.write(engine.output_name_for(result.input_path, keep_folders=True),
+                                 result.output_data)
+
+            processed = {image.name: ImageIO.decode_image(image.data, resize=None)
+                         for image in iter_archive(output)}
+            self.assertEqual(set(processed), {"negative_a.png", os.path.join("cats", "negative_b.png"),
+                                              os.path.join("dogs", "negative_b.png")})
+            np.testing.assert_array_equal(processed[os.path.join("dogs", "negative_b.png")],
+                                          255 - self.images["dogs/b.png"])
+
+        # Members are named and encoded after the name template, as files are
+        output = os.path.join(self.temp_dir, "out.zip")
+        engine = BatchEngine("negative", None, name_template="{stem}.bmp", resize=None,
+                             order="input")
+        with ArchiveWriter(output) as writer:
+            for result in engine.run(iter_archive(source)):
+                writer.write(engine.output_name_for(result.input_path, keep_folders=True),
+                             result.output_data)
+        members = {image.name: image.data for image in iter_archive(output)}
+        self.assertEqual(set(members), {"a.bmp", os.path.join("cats", "b.bmp"),
+                                        os.path.join("dogs", "b.bmp")})
+        self.assertTrue(all(data.startswith(b"BM") for data in members.values()))
+
+        with self.assertRaises(ValueError):
+            ArchiveWriter(os.path.join(self.temp_dir, "out.rar"))
+
+if __name__ == "__main__":
+    unittest.main()
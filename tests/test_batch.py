@@ -0,0 +1,106 @@
+"""
+Unit tests for the batch engine.
+
+This module tests image discovery, output naming and serial and parallel
+processing in the BatchEngine class.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase, create_test_image
+from src.batch.engine import BatchEngine, find_images, process_image
+from src.utils.instrumentation import instrumentation
+
+class TestBatchEngine(PixelCraftTestCase):
+    """Test cases for the BatchEngine class."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.work_dir = tempfile.mkdtemp(prefix="pixelcraft-test-")
+        self.input_dir = os.path.join(self.work_dir, "input")
+        self.output_dir = os.path.join(self.work_dir, "output")
+        os.makedirs(self.input_dir)
+
+        rng = np.random.default_rng(2)
+        self.paths = []
+        for index in range(4):
+            path = os.path.join(self.input_dir, f"{index}.png")
+            cv2.imwrite(path, rng.integers(0, 256, (60, 80), dtype=np.uint8))
+            self.paths.append(path)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        super().tearDown()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_find_images(self):
+        """Test that only image files are found, in sorted order."""
+        open(os.path.join(self.input_dir, "notes.txt"), "w").close()
+
+        self.assertEqual(find_images(self.input_dir), self.paths)
+        self.assertEqual(find_images(self.paths[0]), [self.paths[0]])
+
+    def test_serial_run(self):
+        """Test processing images in the calling thread."""
+        engine = BatchEngine("negative", self.output_dir, sensitivity=16)
+        results = list(engine.run(self.paths))
+
+        self.assertEqual([result.input_path for result in results], self.paths)
+        for result in results:
+            self.assertTrue(result.success)
+            self.assertTrue(os.path.exists(result.output_path))
+            self.assertIn("similarity", result.report)
+            self.assertIn("difference", result.report["statistics"])
+
+    def test_parallel_run(self):
+        """Test that a worker pool gives the same output as a serial run."""
+        serial = BatchEngine("average", os.path.join(self.output_dir, "serial"))
+        parallel = BatchEngine("average", os.path.join(self.output_dir, "parallel"), workers=2)
+
+        list(serial.run(self.paths))
+        results = list(parallel.run(self.paths))
+
+        self.assertEqual(sorted(result.input_path for result in results), self.paths)
+        for result in results:
+            self.assertTrue(result.success)
+            expected = cv2.imread(serial.output_path_for(result.input_path), 0)
+            np.testing.assert_array_equal(cv2.imread(result.output_path, 0), expected)
+
+    def test_worker_instrumentation(self):
+        """Test that instrumentation recorded in workers reaches the parent."""
+        instrumentation.enable()
+        try:
+            list(BatchEngine("negative", self.output_dir, workers=2).run(self.paths))
+            snapshot = instrumentation.snapshot()
+        finally:
+            instrumentation.disable()
+            instrumentation.reset()
+
+        self.assertEqual(snapshot["counters"]["batch.images_processed"], len(self.paths))
+        self.assertEqual(snapshot["timers"]["filter.negative"]["count"], len(self.paths))
+
+    def test_name_template(self):
+        """Test output naming."""
+        engine = BatchEngine("sharpen", self.output_dir, name_template="{stem}_{filter}{ext}")
+        self.assertEqual(engine.output_path_for("/images/photo.jpg"),
+                         os.path.join(self.output_dir, "photo_sharpen.jpg"))
+
+    def test_errors_are_reported(self):
+        """Test that failures become results instead of exceptions."""
+        missing = os.path.join(self.input_dir, "missing.png")
+        result = process_image(missing, os.path.join(self.output_dir, "x.png"), "negative")
+
+        self.assertFalse(result.success)
+        self.assertIsNone(result.output_path)
+
+        with self.assertRaises(ValueError):
+            BatchEngine("unknown", self.output_dir)
+
+if __name__ == "__main__":
+    unittest.main()
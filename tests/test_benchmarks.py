@@ -0,0 +1,57 @@
+"""
+Unit tests for the benchmark suite.
+
+This module tests synthetic image generation and regression detection.
+"""
+
+import unittest
+import numpy as np
+
+from tests import PixelCraftTestCase
+from benchmarks.suite import synthetic_image, run_suite, compare_results, color_overhead
+
+class TestBenchmarks(PixelCraftTestCase):
+    """Test cases for the benchmark suite."""
+
+    def test_synthetic_image(self):
+        """Test that synthetic images are deterministic and sized correctly."""
+        image = synthetic_image(0.12)
+
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertAlmostEqual(image.size / 1e6, 0.12, places=2)
+        self.assertAlmostEqual(image.shape[1] / image.shape[0], 4 / 3, places=2)
+        np.testing.assert_array_equal(image, synthetic_image(0.12))
+
+    def test_color_image(self):
+        """Test that color images match the grayscale image size."""
+        image = synthetic_image(0.12, color=True)
+
+        self.assertEqual(image.shape, synthetic_image(0.12).shape + (3,))
+
+    def test_color_overhead(self):
+        """Test relating color benchmarks to grayscale ones."""
+        results = {"results": {"a": {"median": 1.0}, "color.a": {"median": 2.5},
+                               "color.b": {"median": 1.0}}}
+
+        self.assertEqual(color_overhead(results), {"a": 2.5})
+
+    def test_run_suite(self):
+        """Test a small run of the suite."""
+        results = run_suite([0.01], repeat=1, pattern="filters.", log=lambda message: None)
+
+        self.assertIn("environment", results)
+        self.assertIn("filters.average@0.01MP", results["results"])
+        self.assertNotIn("similarity@0.01MP", results["results"])
+
+    def test_compare_results(self):
+        """Test that only slowdowns beyond the threshold are regressions."""
+        baseline = {"results": {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 1.0}}}
+        current = {"results": {"a": {"median": 1.05}, "b": {"median": 1.5}, "d": {"median": 1.0}}}
+
+        comparison = compare_results(baseline, current, threshold=0.1)
+
+        self.assertEqual([row[0] for row in comparison], ["a", "b"])
+        self.assertEqual([row[4] for row in comparison], [False, True])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for color processing.
+
+This module tests filters, similarity, statistics, pixel inspection and
+batch processing on BGR images.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.core.filters import ImageFilters
+from src.core.similarity import similarity_from_difference
+from src.core.statistics import ImageStatistics
+from src.core.inspector import PixelInspector
+from src.batch.engine import BatchEngine
+from src.utils.image_io import ImageIO
+
+class TestColor(PixelCraftTestCase):
+    """Test cases for the color processing path."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.image = np.random.default_rng(5).integers(0, 256, (40, 60, 3), dtype=np.uint8)
+
+    def test_filters_process_all_channels(self):
+        """Test that filters give the same result as filtering each channel."""
+        for name in ImageFilters.FILTERS:
+            filtered = ImageFilters.apply_filter(self.image, name)
+            self.assertEqual(filtered.shape, self.image.shape, name)
+            for channel in range(3):
+                expected = ImageFilters.apply_filter(np.ascontiguousarray(self.image[:, :, channel]), name)
+                np.testing.assert_array_equal(filtered[:, :, channel], expected, name)
+
+    def test_luminance_filter(self):
+        """Test that luminance filtering keeps grays gray and ignores grayscale input."""
+        gray = np.repeat(self.image[:, :, :1], 3, axis=2)
+        filtered = ImageFilters.apply_filter(gray, "sharpen", luminance=True)
+
+        self.assertEqual(filtered.shape, gray.shape)
+        self.assertLessEqual(int(np.abs(filtered.astype(int) - filtered[:, :, :1]).max()), 2)
+
+        single = np.ascontiguousarray(self.image[:, :, 0])
+        np.testing.assert_array_equal(ImageFilters.apply_filter(single, "sharpen", luminance=True),
+                                      ImageFilters.apply_filter(single, "sharpen"))
+
+    def test_similarity_counts_pixels(self):
+        """Test that a pixel is similar only if all its channels are."""
+        difference = np.zeros((10, 10, 3), dtype=np.uint8)
+        difference[:5, :, 2] = 200
+
+        self.assertEqual(similarity_from_difference(difference, 16), 50)
+        self.assertEqual(similarity_from_difference(difference, 1), 100)
+
+    def test_statistics_pool_channels(self):
+        """Test that statistics count the values of all channels."""
+        statistics = ImageStatistics.from_image(self.image)
+
+        self.assertEqual(statistics.count, self.image.size)
+        self.assertAlmostEqual(statistics.mean, float(self.image.mean()))
+
+    def test_inspector_values(self):
+        """Test inspecting color pixels."""
+        info = PixelInspector(self.image, self.image, self.image, window_size=3).inspect(5, 7)
+
+        self.assertEqual(info["original"]["value"], tuple(int(v) for v in self.image[7, 5]))
+        self.assertAlmostEqual(info["original"]["mean"], float(self.image[6:9, 4:7].mean()))
+
+    def test_batch_color(self):
+        """Test reading, filtering and saving color images in a batch."""
+        work_dir = tempfile.mkdtemp(prefix="pixelcraft-test-")
+        try:
+            path = os.path.join(work_dir, "input.png")
+            cv2.imwrite(path, self.image)
+
+            result = next(BatchEngine("negative", work_dir, color=True).run([path]))
+
+            self.assertTrue(result.success)
+            output = ImageIO.read_image(result.output_path, grayscale=False, resize=None)
+            np.testing.assert_array_equal(
+                output, 255 - ImageIO.read_image(path, grayscale=False)
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Unit tests for folder comparison.
+
+This module tests matching images by relative path, comparing pairs in
+the calling process and on a pool, and summarizing the results.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.batch.compare import ComparisonSummary, compare_folders, compare_pair, match_pairs
+
+class TestCompareFolders(PixelCraftTestCase):
+    """Test cases for comparing folders."""
+
+    def setUp(self):
+        """Set up a golden and a new folder before each test."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.golden = os.path.join(self.temp_dir, "golden")
+        self.new = os.path.join(self.temp_dir, "new")
+        image = np.random.default_rng(3).integers(0, 200, (20, 30), dtype=np.uint8)
+        shifted = image.copy()
+        shifted[:10] += 50
+
+        self.write(self.golden, "same.png", image)
+        self.write(self.new, "same.png", image)
+        self.write(self.golden, os.path.join("sub", "close.png"), image)
+        self.write(self.new, os.path.join("sub", "close.png"), image + 2)
+        self.write(self.golden, "changed.png", image)
+        self.write(self.new, "changed.png", shifted)
+        self.write(self.golden, "size.png", image)
+        self.write(self.new, "size.png", image[:10])
+        self.write(self.golden, "gone.png", image)
+        self.write(self.new, "extra.png", image)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        super().tearDown()
+
+    def write(self, directory, name, image):
+        """Write an image into a folder."""
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        cv2.imwrite(path, image)
+
+    def test_match_pairs(self):
+        """Test matching by relative path, subfolders included."""
+        pairs, only_golden, only_new = match_pairs(self.golden, self.new)
+        self.assertEqual(pairs, ["changed.png", "same.png", "size.png",
+                                 os.path.join("sub", "close.png")])
+        self.assertEqual(only_golden, ["gone.png"])
+        self.assertEqual(only_new, ["extra.png"])
+
+    def test_compare_pair(self):
+        """Test the metrics of one pair."""
+        result = compare_pair(os.path.join(self.golden, "changed.png"),
+                              os.path.join(self.new, "changed.png"))
+        self.assertEqual(result["similarity"], 50)
+        self.assertAlmostEqual(result["max_difference"], 50 / 255)
+        self.assertAlmostEqual(result["mean_difference"], 25 / 255)
+        self.assertIsNone(result["error"])
+
+        result = compare_pair(os.path.join(self.golden, "size.png"),
+                              os.path.join(self.new, "size.png"))
+        self.assertIsNone(result["similarity"])
+        self.assertIn("differ in size", result["error"])
+
+    def test_compare_folders(self):
+        """Test that serial and pool comparisons agree and fail the right pairs."""
+        runs = []
+        for workers in (1, 2):
+            summary = ComparisonSummary()
+            results = {}
+            for result in compare_folders(self.golden, self.new, threshold=90, workers=workers):
+                summary.add(result)
+                results[result["path"]] = result
+            runs.append(results)
+
+            self.assertEqual({path for path, result in results.items() if result["passed"]},
+                             {"same.png", os.path.join("sub", "close.png")})
+            self.assertEqual(results["gone.png"]["error"], f"Missing in {self.new}")
+            self.assertEqual(summary.as_dict(), {
+                "total": 6, "passed": 2, "failed": 4, "missing": 2,
+                "min_similarity": 50, "mean_similarity": 250 / 3,
+            })
+        self.assertEqual(runs[0], runs[1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for the concurrency policy.
+
+This module tests splitting CPUs between worker processes and OpenCV
+threads, and the thread limits applied in worker processes.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase, save_test_image
+from src.batch import concurrency
+from src.batch.concurrency import best_mode, measure, plan
+from src.batch.engine import BatchEngine, create_pool
+from src.batch.scheduling import probe_image
+
+class TestConcurrencyPolicy(PixelCraftTestCase):
+    """Test cases for the concurrency policy."""
+
+    def test_plan(self):
+        """Test that workers times threads stays within the CPUs."""
+        self.assertEqual(plan("intra-image", cpus=8), (1, 8))
+        self.assertEqual(plan("intra-image", workers=3, cpus=8), (3, 2))
+        self.assertEqual(plan("inter-image", cpus=8), (8, 1))
+        self.assertEqual(plan("inter-image", workers=2, cpus=8), (2, 1))
+        self.assertEqual(plan("intra-image", workers=16, cpus=8), (16, 1))
+
+        # Without a size, auto does not calibrate
+        self.assertEqual(plan("auto", cpus=8), (8, 1))
+
+        with self.assertRaises(ValueError):
+            plan("unknown")
+        with self.assertRaises(ValueError):
+            BatchEngine("negative", None, concurrency="unknown")
+
+    def test_best_mode(self):
+        """Test that calibration picks a mode and is measured once per size and machine."""
+        throughput = measure(0.05, cpus=2, repeat=1)
+        self.assertEqual(set(throughput), {"intra-image", "inter-image"})
+        self.assertTrue(all(value > 0 for value in throughput.values()))
+
+        temp_dir = tempfile.mkdtemp()
+        path = os.path.join(temp_dir, "calibration.json")
+        try:
+            with mock.patch.object(concurrency, "CALIBRATION_PATH", path):
+                concurrency._best_modes.clear()
+                mode = best_mode(0.05, cpus=2)
+                self.assertIn(mode, ("intra-image", "inter-image"))
+                self.assertEqual(len(concurrency._best_modes), 1)
+                self.assertEqual(best_mode(0.06, cpus=2), mode)
+                self.assertEqual(len(concurrency._best_modes), 1)
+
+                # A later run reads the stored result instead of measuring
+                concurrency._best_modes.clear()
+                with mock.patch.object(concurrency, "measure", side_effect=AssertionError):
+                    self.assertEqual(best_mode(0.05, cpus=2), mode)
+                with open(path) as f:
+                    self.assertEqual(len(json.load(f)), 1)
+        finally:
+            concurrency._best_modes.clear()
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(best_mode(100, cpus=1), "inter-image")
+
+    def test_worker_threads(self):
+        """Test that pool workers are limited to their share of threads."""
+        with create_pool(1, threads=1) as pool:
+            self.assertEqual(pool.submit(cv2.getNumThreads).result(), 1)
+            environment = pool.submit(os.getenv, "OMP_NUM_THREADS").result()
+            self.assertEqual(environment, "1")
+
+    def test_engine_chooses_workers(self):
+        """Test that the policy never starts more workers than there are images."""
+        path = save_test_image(np.full((20, 20), 7, dtype=np.uint8), "concurrency.png")
+        engine = BatchEngine("negative", None, workers=None, concurrency="inter-image")
+        self.assertAlmostEqual(engine.expected_megapixels(None), 450 * 450 / 1e6)
+
+        results = list(engine.run([path]))
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0].success, results[0].error)
+
+        engine.resize = None
+        self.assertAlmostEqual(engine.expected_megapixels(probe_image(path)), 400 / 1e6)
+        self.assertIsNone(engine.expected_megapixels(None))
+
+if __name__ == "__main__":
+    unittest.main()
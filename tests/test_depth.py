@@ -0,0 +1,121 @@
+"""
+Unit tests for 16-bit and floating point images.
+
+This module tests reading images at their bit depth and processing them
+without reducing them to 8 bits.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from tests import PixelCraftTestCase
+from src.core.depth import value_range, to_uint8
+from src.core.filters import ImageFilters
+from src.core.similarity import similarity_band, similarity_from_difference
+from src.core.difference import normalize_difference
+from src.core.statistics import ImageStatistics
+from src.core.inspector import PixelInspector
+from src.utils.image_io import ImageIO
+
+class TestBitDepth(PixelCraftTestCase):
+    """Test cases for high bit depth processing."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        rng = np.random.default_rng(6)
+        self.image16 = rng.integers(0, 65536, (40, 50), dtype=np.uint16)
+        self.image32 = (self.image16 / 65535).astype(np.float32)
+
+    def test_value_range(self):
+        """Test the intensity range per type."""
+        self.assertEqual(value_range(np.uint8), 255)
+        self.assertEqual(value_range(np.uint16), 65535)
+        self.assertEqual(value_range(np.float32), 1.0)
+        self.assertEqual(to_uint8(self.image16).dtype, np.uint8)
+        self.assertEqual(int(to_uint8(np.full((2, 2), 65535, np.uint16)).min()), 255)
+
+    def test_read_any_depth(self):
+        """Test that 16-bit files keep their depth only on request."""
+        work_dir = tempfile.mkdtemp(prefix="pixelcraft-test-")
+        try:
+            path = os.path.join(work_dir, "deep.png")
+            self.assertTrue(ImageIO.save_image(self.image16, path))
+
+            deep = ImageIO.read_image(path, resize=None, any_depth=True)
+            np.testing.assert_array_equal(deep, self.image16)
+            self.assertEqual(ImageIO.read_image(path, resize=None).dtype, np.uint8)
+
+            with open(path, "rb") as f:
+                decoded = ImageIO.decode_image(f.read(), resize=None, any_depth=True)
+            np.testing.assert_array_equal(decoded, self.image16)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def test_filters_keep_type(self):
+        """Test that every filter returns the type of its input."""
+        for image in (self.image16, self.image32):
+            for name in ImageFilters.FILTERS:
+                self.assertEqual(ImageFilters.apply_filter(image, name).dtype, image.dtype, name)
+
+        np.testing.assert_array_equal(ImageFilters.negative_filter(self.image16),
+                                      65535 - self.image16)
+        np.testing.assert_allclose(ImageFilters.negative_filter(self.image32), 1 - self.image32)
+
+    def test_logarithm_matches_8bit(self):
+        """Test that the logarithm threshold scales with the range."""
+        image8 = np.arange(256, dtype=np.uint8).reshape(16, 16)
+        expected = ImageFilters.logarithm_filter(image8) > 0
+
+        np.testing.assert_array_equal(
+            ImageFilters.logarithm_filter(image8.astype(np.uint16) * 257) > 0, expected
+        )
+        np.testing.assert_array_equal(
+            ImageFilters.logarithm_filter(image8.astype(np.float32) / 255) > 0, expected
+        )
+
+    def test_similarity_band_scales(self):
+        """Test that the similarity band is the same fraction of every range."""
+        self.assertEqual(similarity_band(16), 16)
+        self.assertEqual(similarity_band(16, np.uint16), 4096)
+        self.assertAlmostEqual(similarity_band(16, np.float32), 1 / 16)
+
+        difference = np.zeros((10, 10), dtype=np.uint16)
+        difference[:3] = 5000
+        self.assertEqual(similarity_from_difference(difference, 16), 70)
+        self.assertEqual(similarity_from_difference(difference.astype(np.float32) / 65535, 16), 70)
+
+    def test_normalize_keeps_type(self):
+        """Test that deep difference images are stretched to their full range."""
+        difference = np.array([[0, 100], [200, 400]], dtype=np.uint16)
+        normalized = normalize_difference(difference)
+
+        self.assertEqual(normalized.dtype, np.uint16)
+        self.assertEqual(int(normalized.max()), 65535)
+
+    def test_statistics_precision(self):
+        """Test that deep image statistics come from the pixels, not the bins."""
+        statistics = ImageStatistics.from_image(self.image16)
+
+        self.assertEqual(statistics.count, self.image16.size)
+        self.assertEqual(statistics.minimum, int(self.image16.min()))
+        self.assertEqual(statistics.maximum, int(self.image16.max()))
+        self.assertAlmostEqual(statistics.mean, float(self.image16.mean()), places=3)
+        self.assertEqual(len(statistics.histogram), 256)
+
+    def test_inspector(self):
+        """Test neighborhood statistics of deep images."""
+        inspector = PixelInspector(self.image16, self.image16, self.image16, window_size=3)
+        info = inspector.inspect(5, 7)
+
+        self.assertEqual(info["original"]["value"], int(self.image16[7, 5]))
+        self.assertAlmostEqual(info["original"]["mean"], float(self.image16[6:9, 4:7].mean()))
+
+        info = PixelInspector(self.image32, self.image32, self.image32).inspect(5, 7)
+        self.assertIsInstance(info["original"]["value"], float)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Unit tests for the difference module.
+
+This module tests difference normalization and the DifferenceCache class.
+"""
+
+import unittest
+import numpy as np
+
+from tests import PixelCraftTestCase, create_test_image
+from src.core.difference import DifferenceCache, absolute_difference, normalize_difference
+from src.core.similarity import calculate_similarity
+
+class TestDifference(PixelCraftTestCase):
+    """Test cases for difference images."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        rng = np.random.default_rng(1)
+        self.original = rng.integers(0, 256, (40, 60), dtype=np.uint8)
+        self.processed = self.filters.average_filter(self.original.copy())
+
+    def test_normalize_matches_float_scaling(self):
+        """Test that the lookup table matches float normalization."""
+        difference = absolute_difference(self.original, self.processed)
+        expected = (difference * 255.0 / np.max(difference)).astype(np.uint8)
+
+        np.testing.assert_array_equal(normalize_difference(difference), expected)
+
+    def test_normalize_zero_difference(self):
+        """Test that an all-zero difference stays zero."""
+        difference = np.zeros((10, 10), dtype=np.uint8)
+        np.testing.assert_array_equal(normalize_difference(difference), difference)
+
+    def test_cache_reuses_difference(self):
+        """Test that the difference is computed once per image pair."""
+        cache = DifferenceCache()
+
+        first = cache.difference(self.original, self.processed)
+        self.assertIs(cache.difference(self.original, self.processed), first)
+        self.assertIs(cache.normalized(self.original, self.processed),
+                      cache.normalized(self.original, self.processed))
+        self.assertFalse(first.flags.writeable)
+
+        # A new processed image invalidates the cached difference
+        other = self.filters.negative_filter(self.original)
+        self.assertIsNot(cache.difference(self.original, other), first)
+
+    def test_cache_similarity(self):
+        """Test that cached similarity matches calculate_similarity."""
+        cache = DifferenceCache()
+        for sensitivity in [1, 16, 255]:
+            self.assertEqual(
+                cache.similarity(self.original, self.processed, sensitivity),
+                calculate_similarity(self.processed, self.original, sensitivity)
+            )
+
+if __name__ == "__main__":
+    unittest.main()
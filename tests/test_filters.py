@@ -209,5 +209,35 @@ class TestImageFilters(PixelCraftTestCase):
             "Multiple sharpen filters should significantly increase edge contrast"
         )
 
+    def test_apply_filter_by_name(self):
+        """Test applying filters by name."""
+        for name in ["Average", "negative", "SHARPEN", "laplacian", "Logarithm"]:
+            method = getattr(self.filters, ImageFilters.FILTERS[name.lower()])
+            np.testing.assert_array_equal(
+                self.filters.apply_filter(self.noisy_image, name),
+                method(self.noisy_image)
+            )
+            
+        with self.assertRaises(ValueError):
+            self.filters.apply_filter(self.noisy_image, "unknown")
+            
+    def test_filter_parameters(self):
+        """Test that filter parameters change the result."""
+        small_blur = self.filters.apply_filter(self.noisy_image, "average", kernel_size=3)
+        large_blur = self.filters.apply_filter(self.noisy_image, "average", kernel_size=9)
+        self.assertLess(np.var(large_blur), np.var(small_blur))
+        for kernel_size in (0, -3, 4, 2.5, "5", True):
+            with self.assertRaises(ValueError):
+                self.filters.apply_filter(self.noisy_image, "average", kernel_size=kernel_size)
+        
+        # The default strength is the classic sharpening kernel
+        classic = cv2.filter2D(src=self.noisy_image, ddepth=-1,
+                               kernel=np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]]))
+        np.testing.assert_array_equal(self.filters.sharpen_filter(self.noisy_image), classic)
+        
+        weak = self.filters.sharpen_filter(self.noisy_image, strength=1)
+        strong = self.filters.sharpen_filter(self.noisy_image, strength=10)
+        self.assertGreater(np.var(strong), np.var(weak))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
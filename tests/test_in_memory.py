@@ -0,0 +1,74 @@
+"""
+Unit tests for in-memory processing.
+
+This module tests decoding, filtering and encoding images held in memory,
+synchronously and from asyncio code.
+"""
+
+import asyncio
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.service.processing import AsyncImageProcessor, process_bytes, process_bytes_async
+from src.utils.image_io import ImageIO
+
+class TestInMemoryProcessing(PixelCraftTestCase):
+    """Test cases for bytes in, bytes out processing."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.image = np.random.default_rng(4).integers(0, 256, (30, 40), dtype=np.uint8)
+        self.data = ImageIO.encode_image(self.image)
+
+    def test_encode_decode(self):
+        """Test that encoding and decoding round-trips losslessly."""
+        np.testing.assert_array_equal(ImageIO.decode_image(self.data, resize=None), self.image)
+        np.testing.assert_array_equal(
+            ImageIO.decode_image(memoryview(self.data), resize=None), self.image
+        )
+
+        with self.assertRaises(ValueError):
+            ImageIO.decode_image(b"not an image")
+
+    def test_process_bytes(self):
+        """Test filtering encoded images."""
+        output = process_bytes(memoryview(self.data), "negative")
+        np.testing.assert_array_equal(ImageIO.decode_image(output, resize=None), 255 - self.image)
+
+        jpeg = process_bytes(self.data, "average", {"kernel_size": 3}, ext=".jpg")
+        self.assertEqual(cv2.imdecode(np.frombuffer(jpeg, np.uint8), 0).shape, self.image.shape)
+
+    def test_async_processing(self):
+        """Test concurrent requests on one event loop."""
+        async def run():
+            async with AsyncImageProcessor(workers=2) as processor:
+                outputs = await asyncio.gather(*[
+                    processor.process(self.data, "negative") for _ in range(8)
+                ])
+                with self.assertRaises(ValueError):
+                    await processor.process(self.data, "unknown")
+            outputs.append(await process_bytes_async(self.data, "negative"))
+            return outputs
+
+        for output in asyncio.run(run()):
+            np.testing.assert_array_equal(ImageIO.decode_image(output, resize=None),
+                                          255 - self.image)
+
+    def test_async_processor_threads(self):
+        """Test that the own thread pool limits OpenCV's threads while open."""
+        threads = cv2.getNumThreads()
+        processor = AsyncImageProcessor(workers=2)
+        self.assertEqual(processor.executor._max_workers, 2)
+        self.assertEqual(cv2.getNumThreads(), 1)
+        processor.close()
+        self.assertEqual(cv2.getNumThreads(), threads)
+
+        with self.assertRaises(ValueError):
+            AsyncImageProcessor(concurrency="unknown")
+        self.assertEqual(cv2.getNumThreads(), threads)
+
+if __name__ == "__main__":
+    unittest.main()
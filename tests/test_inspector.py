@@ -0,0 +1,70 @@
+"""
+Unit tests for the pixel inspector module.
+
+This module tests integral image based neighborhood statistics against
+direct NumPy computation.
+"""
+
+import unittest
+import numpy as np
+
+from tests import PixelCraftTestCase
+from src.core.inspector import NeighborhoodStatistics, PixelInspector, integral_images
+
+class TestPixelInspector(PixelCraftTestCase):
+    """Test cases for the inspector module."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        rng = np.random.default_rng(2)
+        self.original = rng.integers(0, 256, (50, 70), dtype=np.uint8)
+        self.processed = self.filters.sharpen_filter(self.original.copy())
+        self.difference = np.abs(self.original.astype(np.int16) - self.processed).astype(np.uint8)
+
+    def test_integral_images(self):
+        """Test the integral images against cumulative sums."""
+        integral, squared = integral_images(self.original)
+
+        self.assertEqual(integral.shape, (51, 71))
+        self.assertEqual(int(integral[-1, -1]), int(self.original.sum(dtype=np.int64)))
+        self.assertEqual(int(squared[-1, -1]),
+                         int((self.original.astype(np.int64) ** 2).sum()))
+        self.assertEqual(int(integral[10, 20]), int(self.original[:10, :20].sum(dtype=np.int64)))
+
+    def test_window_statistics(self):
+        """Test window mean and std, including clipped windows at the border."""
+        stats = NeighborhoodStatistics(self.original)
+        for x, y in [(0, 0), (35, 25), (69, 49), (3, 47)]:
+            window = self.original[max(0, y - 3):y + 4, max(0, x - 3):x + 4].astype(np.float64)
+            mean, std = stats.window(x, y, 3)
+            self.assertAlmostEqual(mean, window.mean(), places=6)
+            self.assertAlmostEqual(std, window.std(), places=6)
+
+    def test_wraparound_is_exact(self):
+        """Test that large images whose totals overflow 32 bits stay exact."""
+        image = np.full((300, 300), 255, dtype=np.uint8)
+        stats = NeighborhoodStatistics(image)
+
+        # The squared integral exceeds 2**32 here
+        self.assertGreater(300 * 300 * 255 ** 2, 2 ** 32)
+        mean, std = stats.window(299, 299, 5)
+        self.assertEqual(mean, 255.0)
+        self.assertEqual(std, 0.0)
+
+    def test_inspect(self):
+        """Test pixel values reported by the inspector."""
+        inspector = PixelInspector(self.original, self.processed, self.difference, window_size=5)
+
+        info = inspector.inspect(12, 34)
+        self.assertEqual(info["original"]["value"], int(self.original[34, 12]))
+        self.assertEqual(info["processed"]["value"], int(self.processed[34, 12]))
+        self.assertEqual(info["difference"]["value"], int(self.difference[34, 12]))
+        self.assertAlmostEqual(info["original"]["mean"],
+                               self.original[32:37, 10:15].mean(), places=6)
+
+        self.assertIsNone(inspector.inspect(70, 0))
+        self.assertIsNone(inspector.inspect(-1, 10))
+
+if __name__ == "__main__":
+    unittest.main()
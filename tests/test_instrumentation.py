@@ -0,0 +1,97 @@
+"""
+Unit tests for the instrumentation module.
+
+This module tests timers, counters, histograms, snapshot merging and the
+instrumentation reported by the processing modules.
+"""
+
+import json
+import os
+import unittest
+import numpy as np
+
+from tests import PixelCraftTestCase, TEST_OUTPUT_DIR
+from src.core.filters import ImageFilters
+from src.core.similarity import calculate_similarity
+from src.utils.instrumentation import Histogram, Instrumentation, instrumentation
+
+class TestInstrumentation(PixelCraftTestCase):
+    """Test cases for the Instrumentation class."""
+
+    def tearDown(self):
+        """Clean up after each test."""
+        super().tearDown()
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_records_nothing(self):
+        """Test that nothing is recorded while disabled."""
+        metrics = Instrumentation()
+        with metrics.timer("stage"):
+            pass
+        metrics.count("images")
+        metrics.observe("size", 3.0)
+
+        self.assertEqual(metrics.snapshot(), {"timers": {}, "counters": {}, "histograms": {}})
+
+    def test_recording(self):
+        """Test timers, counters and histograms while enabled."""
+        metrics = Instrumentation()
+        metrics.enable()
+        for _ in range(3):
+            with metrics.timer("stage"):
+                pass
+        metrics.count("images", 2)
+        metrics.observe("size", 4.0)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["timers"]["stage"]["count"], 3)
+        self.assertEqual(snapshot["counters"]["images"], 2)
+        self.assertEqual(snapshot["histograms"]["size"]["max"], 4.0)
+
+    def test_histogram_percentiles(self):
+        """Test that percentiles are estimated within one bucket."""
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.add(float(value))
+
+        self.assertAlmostEqual(histogram.percentile(0.5), 50, delta=50 * 0.2)
+        self.assertAlmostEqual(histogram.percentile(0.95), 95, delta=95 * 0.2)
+        self.assertEqual(histogram.percentile(1.0), 100)
+
+    def test_merge(self):
+        """Test that merged snapshots add up, including through JSON."""
+        worker = Instrumentation()
+        worker.enable()
+        worker.record_time("stage", 0.5)
+        worker.count("images")
+
+        parent = Instrumentation()
+        parent.enable()
+        parent.record_time("stage", 0.25)
+        parent.merge(json.loads(json.dumps(worker.snapshot())))
+
+        snapshot = parent.snapshot()
+        self.assertEqual(snapshot["timers"]["stage"]["count"], 2)
+        self.assertEqual(snapshot["timers"]["stage"]["total"], 0.75)
+        self.assertEqual(snapshot["counters"]["images"], 1)
+
+    def test_processing_stages_report(self):
+        """Test that filters and similarity report into the global registry."""
+        instrumentation.enable()
+        image = np.zeros((20, 20), dtype=np.uint8)
+        processed = ImageFilters.apply_filter(image, "Average")
+        calculate_similarity(processed, image, 16)
+
+        path = os.path.join(TEST_OUTPUT_DIR, "stats.json")
+        instrumentation.save(path)
+        with open(path) as f:
+            timers = json.load(f)["timers"]
+        os.remove(path)
+
+        self.assertIn("filter.average", timers)
+        self.assertIn("similarity.difference", timers)
+        self.assertIn("similarity.score", timers)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Unit tests for the all-pairs similarity matrix.
+
+This module tests that the blocked computation matches
+``calculate_similarity`` for every pair, in grayscale and color, in the
+calling process and on a pool, and that loading rejects mismatched images.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.batch import matrix as matrix_module
+from src.batch.matrix import band_counts, count_pairs, load_stack, similarity_matrix
+from src.core.similarity import calculate_similarity, similarity_band
+from src.utils.image_io import ImageIO
+
+class TestSimilarityMatrix(PixelCraftTestCase):
+    """Test cases for the similarity matrix."""
+
+    def setUp(self):
+        """Write variations of a color image before each test."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(5)
+        base = rng.integers(0, 256, (15, 21, 3), dtype=np.uint8)
+        self.paths = []
+        for index in range(7):
+            noise = rng.integers(-12, 13, base.shape) * (index % 4)
+            image = np.clip(base.astype(int) + noise, 0, 255).astype(np.uint8)
+            path = os.path.join(self.temp_dir, f"{index}.png")
+            cv2.imwrite(path, image)
+            self.paths.append(path)
+        self.stack_path = os.path.join(self.temp_dir, "stack.npy")
+        self.matrix_path = os.path.join(self.temp_dir, "matrix.npy")
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        super().tearDown()
+
+    def expected(self, color, sensitivity):
+        """Compare every pair one at a time."""
+        images = [ImageIO.read_image(path, grayscale=not color, resize=None) for path in self.paths]
+        return np.array([[calculate_similarity(a, b, sensitivity) for b in images] for a in images])
+
+    def test_band_counts(self):
+        """Test counting against the band in tiles that do not divide the pixels."""
+        rng = np.random.default_rng(6)
+        rows = rng.integers(0, 256, (3, 50 * 3), dtype=np.uint8)
+        cols = rng.integers(0, 256, (4, 50 * 3), dtype=np.uint8)
+        with mock.patch.object(matrix_module, "TILE_BYTES", 4 * 3 * 7):
+            counts = band_counts(rows, cols, 100, channels=3)
+        within = np.abs(rows[:, None].astype(int) - cols[None].astype(int)) <= 100
+        np.testing.assert_array_equal(counts, within.reshape(3, 4, 50, 3).all(axis=3).sum(axis=2))
+
+        # Higher depths compare against their own band
+        deep = (rows.astype(np.uint16) * 257)[:, :50]
+        band = similarity_band(4, np.uint16)
+        expected = np.count_nonzero(np.abs(deep[:1].astype(int) - deep[1:].astype(int)) <= band, axis=1)
+        np.testing.assert_array_equal(band_counts(deep[:1], deep[1:], band)[0], expected)
+
+    def test_matrix(self):
+        """Test that every entry matches calculate_similarity."""
+        for color, workers in ((False, 1), (True, 1), (True, 2)):
+            stack = load_stack(self.paths, self.stack_path, color=color, resize=None, workers=workers)
+            self.assertEqual(stack.shape[:3], (7, 15, 21))
+            del stack
+            # Small blocks so the matrix has blocks off the diagonal
+            with mock.patch.object(matrix_module, "BLOCK", 3):
+                progress = list(similarity_matrix(self.stack_path, self.matrix_path, 16, workers=workers))
+            self.assertEqual(progress[-1], 1.0)
+            matrix = np.load(self.matrix_path)
+            self.assertEqual(matrix.dtype, np.uint8)
+            np.testing.assert_array_equal(matrix, self.expected(color, 16))
+
+        # Images 0 and 4 are the same
+        for threshold in (100, 90, 0):
+            above = np.triu(matrix >= threshold, 1)
+            self.assertEqual(count_pairs(self.matrix_path, threshold), np.count_nonzero(above))
+        self.assertGreaterEqual(count_pairs(self.matrix_path, 100), 1)
+        self.assertEqual(count_pairs(self.matrix_path, 0), 21)
+
+    def test_mismatched_images(self):
+        """Test that images of another size are rejected unless resized."""
+        cv2.imwrite(self.paths[3], np.zeros((8, 8), dtype=np.uint8))
+        with self.assertRaisesRegex(ValueError, "3.png"):
+            load_stack(self.paths, self.stack_path, resize=None, workers=1)
+        stack = load_stack(self.paths, self.stack_path, resize=(10, 10), workers=1)
+        self.assertEqual(stack.shape, (7, 10, 10))
+
+if __name__ == "__main__":
+    unittest.main()
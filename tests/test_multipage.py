@@ -0,0 +1,185 @@
+"""
+Unit tests for multi-page and animated images.
+
+This module tests streaming frames from multi-page TIFFs and animated
+images, the multi-page TIFF writer and frame mode in batch processing.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import cv2
+from PIL import Image
+
+from tests import PixelCraftTestCase
+from src.batch.engine import BatchEngine, find_images
+from src.utils.image_io import ImageIO, MultiPageWriter
+
+class TestMultiPage(PixelCraftTestCase):
+    """Test cases for frame streaming and multi-page output."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.pages = [np.full((40, 60), value, dtype=np.uint8) for value in (10, 80, 150, 220)]
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        super().tearDown()
+
+    def write_tiff(self, name, pages):
+        """Write pages to a multi-page TIFF in the temporary directory."""
+        path = os.path.join(self.temp_dir, name)
+        self.assertTrue(cv2.imwritemulti(path, pages))
+        return path
+
+    def test_iter_frames_tiff(self):
+        """Test that every page of a TIFF is read, in order."""
+        path = self.write_tiff("pages.tif", self.pages)
+
+        self.assertEqual(ImageIO.frame_count(path), 4)
+        frames = list(ImageIO.iter_frames(path, resize=None))
+        self.assertEqual(len(frames), 4)
+        for frame, page in zip(frames, self.pages):
+            np.testing.assert_array_equal(frame, page)
+
+        resized = next(ImageIO.iter_frames(path, resize=(30, 20)))
+        self.assertEqual(resized.shape, (20, 30))
+
+    def test_iter_frames_keeps_depth(self):
+        """Test that 16-bit pages keep their depth on request."""
+        pages = [np.full((10, 10), value, dtype=np.uint16) for value in (1000, 60000)]
+        path = self.write_tiff("deep.tif", pages)
+
+        frames = list(ImageIO.iter_frames(path, resize=None, any_depth=True))
+        self.assertEqual([frame.dtype for frame in frames], [np.uint16, np.uint16])
+        self.assertEqual([int(frame[0, 0]) for frame in frames], [1000, 60000])
+
+    def test_iter_frames_matches_opencv(self):
+        """Test that pages read in one pass equal the pages OpenCV reads."""
+        rng = np.random.default_rng(0)
+        files = {
+            "color.tif": [rng.integers(0, 256, (20, 30, 3), dtype=np.uint8) for _ in range(3)],
+            "alpha.tif": [rng.integers(0, 256, (20, 30, 4), dtype=np.uint8) for _ in range(2)],
+            # Pillow cannot read these at full depth, so OpenCV reads them
+            "color16.tif": [rng.integers(0, 65536, (20, 30, 3), dtype=np.uint16)
+                            for _ in range(3)],
+        }
+        for name, pages in files.items():
+            path = self.write_tiff(name, pages)
+            for grayscale in (True, False):
+                for any_depth in (False, True):
+                    flags = ImageIO.read_flags(grayscale, any_depth)
+                    success, expected = cv2.imreadmulti(path, flags=flags)
+                    self.assertTrue(success)
+                    frames = list(ImageIO.iter_frames(path, grayscale=grayscale,
+                                                      any_depth=any_depth, resize=None))
+                    self.assertEqual(len(frames), len(expected))
+                    for frame, page in zip(frames, expected):
+                        self.assertEqual(frame.dtype, page.dtype)
+                        np.testing.assert_array_equal(frame, page)
+
+    def test_iter_frames_animation(self):
+        """Test that animated GIF frames are composited in order."""
+        path = os.path.join(self.temp_dir, "animation.gif")
+        frames = [Image.fromarray(page) for page in self.pages]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=100, loop=0)
+
+        gray = list(ImageIO.iter_frames(path, resize=None))
+        self.assertEqual([int(frame.mean()) for frame in gray], [10, 80, 150, 220])
+
+        color = next(ImageIO.iter_frames(path, grayscale=False, resize=None))
+        self.assertEqual(color.shape, (40, 60, 3))
+
+        # OpenCV builds without GIF support neither count nor decode the frames
+        with mock.patch.object(cv2, "imcount", side_effect=AssertionError, create=True), \
+                mock.patch.object(cv2, "imread", return_value=None):
+            self.assertEqual(ImageIO.frame_count(path), 4)
+            still = path.replace("animation", "still")
+            frames[1].save(still)
+            self.assertEqual(int(ImageIO.read_image(still, resize=None).mean()), 80)
+
+    def test_iter_frames_still_image(self):
+        """Test that a still image yields a single frame."""
+        path = os.path.join(self.temp_dir, "still.png")
+        cv2.imwrite(path, self.pages[0])
+
+        self.assertEqual(len(list(ImageIO.iter_frames(path))), 1)
+        with self.assertRaises(FileNotFoundError):
+            list(ImageIO.iter_frames(os.path.join(self.temp_dir, "missing.tif")))
+
+    def test_writer(self):
+        """Test that written pages read back unchanged, whatever their type."""
+        pages = [self.pages[0], np.full((5, 7, 3), 9, dtype=np.uint8),
+                 np.full((8, 8), 40000, dtype=np.uint16), np.full((4, 4), 0.25, dtype=np.float32)]
+        path = os.path.join(self.temp_dir, "out", "written.tif")
+
+        with MultiPageWriter(path) as writer:
+            for page in pages:
+                writer.write(page)
+        self.assertEqual(writer.pages, 4)
+
+        success, read = cv2.imreadmulti(path, flags=cv2.IMREAD_UNCHANGED)
+        self.assertTrue(success)
+        self.assertEqual(len(read), 4)
+        for page, expected in zip(read, pages):
+            self.assertEqual(page.dtype, expected.dtype)
+            np.testing.assert_array_equal(page, expected)
+
+    def test_batch_frames(self):
+        """Test that frame mode filters every page into a multi-page TIFF."""
+        path = self.write_tiff("pages.tif", self.pages)
+        output_dir = os.path.join(self.temp_dir, "output")
+
+        engine = BatchEngine("negative", output_dir, resize=None, frames=True, sensitivity=16)
+        results = list(engine.run([path]))
+
+        self.assertEqual(len(results), 1)
+        result = results[0]
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.frames, 4)
+        self.assertEqual(len(result.report["frames"]), 4)
+
+        success, read = cv2.imreadmulti(result.output_path, flags=cv2.IMREAD_UNCHANGED)
+        self.assertTrue(success)
+        for page, expected in zip(read, self.pages):
+            np.testing.assert_array_equal(page, 255 - expected)
+
+    def test_batch_animated_directory(self):
+        """Test that directory runs pick up animated GIF and WebP files."""
+        frames = [Image.fromarray(page) for page in self.pages]
+        input_dir = os.path.join(self.temp_dir, "input")
+        os.makedirs(input_dir)
+        for name in ("animation.gif", "clip.webp"):
+            frames[0].save(os.path.join(input_dir, name), save_all=True,
+                           append_images=frames[1:], duration=100, lossless=True)
+        paths = find_images(input_dir)
+        self.assertEqual([os.path.basename(path) for path in paths],
+                         ["animation.gif", "clip.webp"])
+
+        engine = BatchEngine("negative", os.path.join(self.temp_dir, "frames"), frames=True)
+        self.assertEqual([result.frames for result in engine.run(paths)], [4, 4])
+
+        # Without frame mode the first frame is saved in the input's format
+        engine = BatchEngine("negative", os.path.join(self.temp_dir, "still"), resize=None)
+        for result in engine.run(paths):
+            self.assertTrue(result.success, result.error)
+            self.assertEqual(int(ImageIO.read_image(result.output_path, resize=None).mean()), 245)
+
+    def test_batch_frames_output_name(self):
+        """Test that frame mode writes TIFF files and needs a file input."""
+        engine = BatchEngine("negative", self.temp_dir, frames=True)
+        self.assertTrue(engine.output_path_for("animation.gif").endswith("negative_animation.tif"))
+        self.assertTrue(engine.output_path_for("scan.TIFF").endswith("negative_scan.TIFF"))
+
+        engine = BatchEngine("negative", None, frames=True)
+        result = next(engine.run([self.write_tiff("pages.tif", self.pages)]))
+        self.assertFalse(result.success)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Unit tests for batch profiling.
+
+This module tests merging of worker profiles and per-stage memory tracing.
+"""
+
+import os
+import shutil
+import pstats
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.batch.engine import BatchEngine, create_pool
+from src.batch.profiling import BatchProfiler, MemoryTracker
+
+class TestBatchProfiler(PixelCraftTestCase):
+    """Test cases for the BatchProfiler class."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.work_dir = tempfile.mkdtemp(prefix="pixelcraft-test-")
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.work_dir, f"{index}.png")
+            cv2.imwrite(path, np.full((50, 50), index * 40, dtype=np.uint8))
+            self.paths.append(path)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        super().tearDown()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def profile(self, workers, trace_memory=False):
+        """Profile a batch run and return the profiler."""
+        profiler = BatchProfiler(os.path.join(self.work_dir, "profile", "batch.prof"),
+                                 top=5, trace_memory=trace_memory)
+        engine = BatchEngine("negative", os.path.join(self.work_dir, "output"), workers=workers,
+                             profile_dir=profiler.work_dir, trace_memory=trace_memory)
+        with profiler:
+            for result in engine.run(self.paths):
+                self.assertTrue(result.success)
+        return profiler
+
+    def process_image_calls(self, path):
+        """Count the calls of ``process_image`` in a pstats file."""
+        stats = pstats.Stats(path).stats
+        return sum(entry[1] for key, entry in stats.items() if key[2] == "process_image")
+
+    def test_serial_profile(self):
+        """Test profiling a batch run in the calling process."""
+        profiler = self.profile(workers=1, trace_memory=True)
+
+        self.assertEqual(self.process_image_calls(profiler.output_path), len(self.paths))
+        with open(profiler.summary_path) as f:
+            summary = f.read()
+        self.assertIn("Profile of 1 process(es)", summary)
+        self.assertIn("read: 3 runs", summary)
+        self.assertFalse(os.path.exists(profiler.work_dir))
+
+    def test_worker_profiles_are_merged(self):
+        """Test that profiles from worker processes are merged."""
+        profiler = self.profile(workers=2)
+
+        self.assertEqual(self.process_image_calls(profiler.output_path), len(self.paths))
+        self.assertGreater(profiler.processes, 1)
+
+    def test_worker_profile_written_at_exit(self):
+        """Test that a worker writes its profile once, when it exits."""
+        profiler = BatchProfiler(os.path.join(self.work_dir, "batch.prof"), top=5)
+        executor = create_pool(1)
+        engine = BatchEngine("negative", None, workers=1, executor=executor,
+                             profile_dir=profiler.work_dir)
+        with profiler:
+            try:
+                self.assertTrue(all(result.success for result in engine.run(self.paths)))
+                self.assertEqual(os.listdir(profiler.work_dir), [])
+            finally:
+                executor.shutdown()
+            self.assertEqual(len(os.listdir(profiler.work_dir)), 1)
+
+        self.assertEqual(self.process_image_calls(profiler.output_path), len(self.paths))
+
+    def test_memory_tracker_stages(self):
+        """Test that a stage reports the memory it allocated."""
+        tracker = MemoryTracker()
+        with tracker.stage("idle"):
+            pass
+        self.assertEqual(tracker.stages, {})
+
+        tracker.start()
+        try:
+            with tracker.stage("allocate"):
+                image = np.ones((512, 512), dtype=np.uint8)
+        finally:
+            tracker.stop()
+
+        stage = tracker.as_dict()["allocate"]
+        self.assertEqual(stage["runs"], 1)
+        self.assertGreaterEqual(stage["peak"], image.nbytes)
+        self.assertGreaterEqual(max(stage["allocations"].values()), image.nbytes)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Unit tests for the image pyramid module.
+
+This module tests level construction, level selection and region lookup
+of the ImagePyramid class.
+"""
+
+import unittest
+import numpy as np
+
+from tests import PixelCraftTestCase, create_test_image
+from src.core.pyramid import ImagePyramid
+
+class TestImagePyramid(PixelCraftTestCase):
+    """Test cases for the ImagePyramid class."""
+
+    def test_levels_halve_until_min_size(self):
+        """Test that each level halves the previous one."""
+        pyramid = ImagePyramid(create_test_image(1000, 600), min_size=200)
+
+        shapes = [level.shape for level in pyramid.levels]
+        self.assertEqual(shapes, [(600, 1000), (300, 500), (150, 250), (75, 125)])
+        self.assertIs(pyramid.base, pyramid.levels[0])
+
+    def test_small_image_has_single_level(self):
+        """Test that images below the minimum size are not downsampled."""
+        pyramid = ImagePyramid(create_test_image(100, 100), min_size=256)
+        self.assertEqual(len(pyramid.levels), 1)
+
+    def test_empty_image_raises(self):
+        """Test that an empty image is rejected."""
+        with self.assertRaises(ValueError):
+            ImagePyramid(np.array([], dtype=np.uint8))
+
+    def test_level_for_zoom(self):
+        """Test that the coarsest sufficient level is selected."""
+        pyramid = ImagePyramid(create_test_image(1024, 1024), min_size=64)
+
+        self.assertEqual(pyramid.level_for_zoom(4.0), 0)
+        self.assertEqual(pyramid.level_for_zoom(1.0), 0)
+        self.assertEqual(pyramid.level_for_zoom(0.5), 1)
+        self.assertEqual(pyramid.level_for_zoom(0.3), 1)
+        self.assertEqual(pyramid.level_for_zoom(0.25), 2)
+        self.assertEqual(pyramid.level_for_zoom(0.001), len(pyramid.levels) - 1)
+
+    def test_region_is_view_into_level(self):
+        """Test that regions are views in logical coordinates."""
+        image = np.arange(400 * 400, dtype=np.uint32).reshape(400, 400).astype(np.uint8)
+        pyramid = ImagePyramid(image, min_size=100)
+
+        pixels, covered = pyramid.region(1, 10, 20, 110, 220)
+        self.assertEqual(pixels.shape, (100, 50))
+        self.assertEqual(covered, (10.0, 20.0, 110.0, 220.0))
+        self.assertTrue(np.shares_memory(pixels, pyramid.levels[1]))
+
+    def test_region_is_clipped(self):
+        """Test that regions are clipped to the image bounds."""
+        pyramid = ImagePyramid(create_test_image(200, 100))
+
+        pixels, covered = pyramid.region(0, -50, -50, 50, 50)
+        self.assertEqual(pixels.shape, (50, 50))
+        self.assertEqual(covered, (0.0, 0.0, 50.0, 50.0))
+
+        pixels, covered = pyramid.region(0, 300, 300, 400, 400)
+        self.assertIsNone(pixels)
+        self.assertIsNone(covered)
+
+    def test_proxy_scale(self):
+        """Test that a proxy pyramid reports the logical image size."""
+        pyramid = ImagePyramid(create_test_image(100, 50), scale=0.25)
+
+        self.assertEqual((pyramid.width, pyramid.height), (400.0, 200.0))
+        pixels, covered = pyramid.region(0, 0, 0, 200, 100)
+        self.assertEqual(pixels.shape, (25, 50))
+        self.assertEqual(covered, (0.0, 0.0, 200.0, 100.0))
+
+    def test_proxy(self):
+        """Test that the largest level within the size limit is used as proxy."""
+        pyramid = ImagePyramid(create_test_image(1000, 600), min_size=100)
+
+        image, scale = pyramid.proxy(600)
+        self.assertEqual(image.shape, (300, 500))
+        self.assertEqual(scale, 0.5)
+
+        image, scale = pyramid.proxy(5000)
+        self.assertIs(image, pyramid.base)
+        self.assertEqual(scale, 1.0)
+
+        # The smallest level is used when none fits
+        image, scale = pyramid.proxy(10)
+        self.assertIs(image, pyramid.levels[-1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for failure handling in batch runs.
+
+This module tests retrying transient I/O errors, ending workers that hang
+and quarantining the images that hang or crash them.
+"""
+
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.batch import engine as engine_module
+from src.batch.engine import BatchEngine, create_pool, is_transient, process_image
+from src.utils.image_io import ImageIO
+
+class TestRecovery(PixelCraftTestCase):
+    """Test cases for retries, timeouts and quarantine."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.temp_dir, f"{index}.png")
+            cv2.imwrite(path, np.full((10, 10), index * 50, dtype=np.uint8))
+            self.paths.append(path)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        super().tearDown()
+
+    def test_is_transient(self):
+        """Test which errors are worth retrying."""
+        self.assertTrue(is_transient(OSError(errno.EIO, "Input/output error")))
+        self.assertTrue(is_transient(TimeoutError()))
+        self.assertFalse(is_transient(FileNotFoundError()))
+        self.assertFalse(is_transient(PermissionError()))
+        self.assertFalse(is_transient(ValueError("Could not read image")))
+
+    def test_retries(self):
+        """Test that transient errors are retried a bounded number of times."""
+        output_path = os.path.join(self.temp_dir, "out.png")
+        save_image = ImageIO.save_image
+        for retries, failures, success in ((2, 2, True), (1, 2, False)):
+            calls = []
+
+            def flaky_save(image, path):
+                calls.append(path)
+                if len(calls) <= failures:
+                    raise OSError(errno.EIO, "Input/output error")
+                return save_image(image, path)
+
+            with mock.patch.object(ImageIO, "save_image", flaky_save), \
+                    mock.patch.object(engine_module, "RETRY_DELAY", 0):
+                result = process_image(self.paths[0], output_path, "negative", retries=retries)
+            self.assertEqual(result.success, success, result.error)
+            self.assertEqual(len(calls), retries + 1)
+
+        # Permanent errors fail at once
+        result = process_image(os.path.join(self.temp_dir, "missing.png"), output_path,
+                               "negative", retries=5)
+        self.assertFalse(result.success)
+
+        # So does a save the encoder rejects
+        calls = []
+        with mock.patch.object(ImageIO, "save_image", lambda image, path: calls.append(path)):
+            result = process_image(self.paths[0], output_path, "negative", retries=5)
+        self.assertEqual(result.error, "Failed to save processed image")
+        self.assertEqual(len(calls), 1)
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "needs named pipes")
+    def test_hang_quarantined(self):
+        """Test that an image hanging its worker is quarantined and the rest finish."""
+        # Opening a pipe without a writer blocks inside the decoder
+        fifo = os.path.join(self.temp_dir, "hang.png")
+        os.mkfifo(fifo)
+        inputs = [self.paths[0], fifo] + self.paths[1:]
+
+        # Probing for largest-first ordering must not open the pipe either
+        engine = BatchEngine("negative", None, timeout=1)
+        results = {result.input_path: result for result in engine.run(inputs)}
+        self.assertEqual(len(results), 4)
+        self.assertEqual([path for path in results if not results[path].success], [fifo])
+        self.assertEqual(results[fifo].error, "Quarantined: timed out after 1 s")
+        self.assertEqual(engine.quarantined, [(fifo, "timed out after 1 s")])
+
+        # Chunks in flight with the hanging image are rerun concurrently, and
+        # only the image that hangs again alone is quarantined
+        more = []
+        for index in range(12):
+            path = os.path.join(self.temp_dir, f"more{index}.png")
+            cv2.imwrite(path, np.full((10, 10), index, dtype=np.uint8))
+            more.append(path)
+        engine = BatchEngine("negative", None, workers=2, timeout=1, order="input")
+        results = list(engine.run(more[:6] + [fifo] + more[6:]))
+        self.assertEqual(len(results), 13)
+        self.assertEqual([result.input_path for result in results if not result.success], [fifo])
+        self.assertEqual(engine.quarantined, [(fifo, "timed out after 1 s")])
+
+        # A broken executor owned by the caller is replaced, not shut down
+        executor = create_pool(1)
+        engine = BatchEngine("negative", None, timeout=0.5, order="input", executor=executor)
+        try:
+            results = list(engine.run([fifo, self.paths[0]]))
+            self.assertEqual(sorted(result.success for result in results), [False, True])
+            self.assertIsNot(engine.executor, executor)
+            self.assertEqual(engine.executor.submit(abs, -1).result(), 1)
+        finally:
+            executor.shutdown()
+            engine.executor.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for resizing opened images.
+
+This module tests the resize modes and interpolation choice of ImageIO and
+resizing in batch processing.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.batch.engine import BatchEngine
+from src.utils.config import Config
+from src.utils.image_io import ImageIO
+
+class TestResize(PixelCraftTestCase):
+    """Test cases for aspect-preserving resizing."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.image = np.random.default_rng(7).integers(0, 256, (200, 400), dtype=np.uint8)
+
+    def test_modes(self):
+        """Test the output size of every resize mode."""
+        expected = {
+            "stretch": (100, 100),
+            "fit": (50, 100),
+            "fill": (100, 100),
+            "max": (50, 100),
+            "none": (200, 400),
+        }
+        for mode, shape in expected.items():
+            resized = ImageIO.resize_image(self.image, (100, 100), mode)
+            self.assertEqual(resized.shape, shape, mode)
+
+        self.assertEqual(ImageIO.resize_image(self.image, 100, "max").shape, (50, 100))
+        self.assertIs(ImageIO.resize_image(self.image, None), self.image)
+
+    def test_fill_crops_center(self):
+        """Test that fill keeps the center of the image."""
+        image = np.zeros((100, 300), dtype=np.uint8)
+        image[:, 100:200] = 255
+
+        filled = ImageIO.resize_image(image, (100, 100), "fill")
+        self.assertTrue(np.all(filled == 255))
+
+    def test_interpolation(self):
+        """Test that shrinking defaults to area interpolation."""
+        expected = cv2.resize(self.image, (200, 100), interpolation=cv2.INTER_AREA)
+        np.testing.assert_array_equal(ImageIO.resize_image(self.image, (200, 100)), expected)
+
+        nearest = ImageIO.resize_image(self.image, (200, 100), interpolation="nearest")
+        np.testing.assert_array_equal(nearest, self.image[::2, ::2])
+
+        with self.assertRaises(ValueError):
+            ImageIO.resize_image(self.image, (200, 100), "squash")
+        with self.assertRaises(ValueError):
+            ImageIO.resize_image(self.image, (200, 100), interpolation="bicubic")
+
+    def test_config_options(self):
+        """Test reading the resize settings from the configuration."""
+        config = Config(os.path.join(tempfile.gettempdir(), "pixelcraft-missing-config.json"))
+
+        self.assertEqual(config.resize_options(),
+                         {"resize": (450, 450), "resize_mode": "stretch", "interpolation": "auto"})
+
+    def test_batch_full_resolution(self):
+        """Test that batch processing can skip resizing."""
+        work_dir = tempfile.mkdtemp(prefix="pixelcraft-test-")
+        try:
+            path = os.path.join(work_dir, "input.png")
+            cv2.imwrite(path, self.image)
+
+            result = next(BatchEngine("negative", work_dir, resize=None).run([path]))
+            self.assertEqual(cv2.imread(result.output_path, 0).shape, self.image.shape)
+
+            result = next(BatchEngine("negative", work_dir, resize=100, resize_mode="max").run([path]))
+            self.assertEqual(cv2.imread(result.output_path, 0).shape, (50, 100))
+
+            with self.assertRaises(ValueError):
+                BatchEngine("negative", work_dir, resize_mode="squash")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Unit tests for size-aware scheduling.
+
+This module tests header probing, largest-first ordering, admission against
+a memory budget and pixel-weighted progress.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.batch.engine import BatchEngine, InMemoryImage
+from src.batch.scheduling import ChunkSizer, WorkQueue, estimate_footprint, probe_image
+from src.utils.image_io import ImageIO
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool recording the most tasks outstanding at once."""
+
+    def __init__(self, workers):
+        super().__init__(workers)
+        self.lock = threading.Lock()
+        self.outstanding = 0
+        self.most_outstanding = 0
+
+    def submit(self, function, *args):
+        with self.lock:
+            self.outstanding += 1
+            self.most_outstanding = max(self.most_outstanding, self.outstanding)
+        future = super().submit(function, *args)
+        future.add_done_callback(self.task_done)
+        return future
+
+    def task_done(self, future):
+        with self.lock:
+            self.outstanding -= 1
+
+class TestScheduling(PixelCraftTestCase):
+    """Test cases for scheduling batch inputs by size."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for name, side in (("small.png", 10), ("large.png", 40), ("medium.png", 20)):
+            path = os.path.join(self.temp_dir, name)
+            cv2.imwrite(path, np.full((side, side), 100, dtype=np.uint8))
+            self.paths.append(path)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        super().tearDown()
+
+    def test_probe_image(self):
+        """Test reading dimensions, depth and pages from headers."""
+        info = probe_image(self.paths[1])
+        self.assertEqual(info.as_dict(),
+                         {"width": 40, "height": 40, "channels": 1, "bits": 8, "pages": 1})
+
+        path = os.path.join(self.temp_dir, "deep.tif")
+        cv2.imwritemulti(path, [np.zeros((6, 8), dtype=np.uint16)] * 3)
+        info = probe_image(path)
+        self.assertEqual((info.width, info.height, info.bits, info.pages), (8, 6, 16, 3))
+        self.assertEqual(info.pixels, 144)
+        self.assertEqual(info.decoded_bytes, 96)
+
+        color = ImageIO.encode_image(np.zeros((5, 7, 3), dtype=np.uint8))
+        info = probe_image(InMemoryImage("color.png", color))
+        self.assertEqual((info.width, info.height, info.channels), (7, 5, 3))
+
+        self.assertIsNone(probe_image(InMemoryImage("bad.png", b"not an image")))
+        self.assertIsNone(probe_image(os.path.join(self.temp_dir, "missing.png")))
+
+    def test_largest_first(self):
+        """Test that inputs are taken largest first, unknown sizes last."""
+        queue = WorkQueue(["unknown.png"] + self.paths)
+        self.assertTrue(queue.probed)
+        self.assertEqual(queue.total_pixels, 100 + 1600 + 400)
+
+        names = []
+        while queue:
+            names.append(os.path.basename(queue.take()[0]))
+        self.assertEqual(names, ["large.png", "medium.png", "small.png", "unknown.png"])
+
+        queue = WorkQueue(iter(self.paths), order="input")
+        self.assertFalse(queue.probed)
+        self.assertEqual(queue.peek()[1].width, 10)
+        self.assertEqual([queue.take()[0] for _ in range(3)], self.paths)
+        self.assertIsNone(queue.take())
+
+        with self.assertRaises(ValueError):
+            WorkQueue(self.paths, order="random")
+
+    def test_estimate_footprint(self):
+        """Test the memory estimate of decoding, resizing, filtering and encoding."""
+        info = probe_image(self.paths[1])
+        # Decoded 1600, float32 working copy 6400, filtered and encoded 2 x 1600
+        self.assertEqual(estimate_footprint(info, resize=None), 11200)
+        # Resized to 20x20: 400 more, then 1600 working copy and 2 x 400
+        self.assertEqual(estimate_footprint(info, resize=(20, 20)), 1600 + 400 + 1600 + 800)
+        self.assertEqual(estimate_footprint(info, color=True, resize=None), 3 * 11200)
+        self.assertEqual(estimate_footprint(info, resize=None, report=True), 11200 + 1600)
+        self.assertEqual(estimate_footprint(None), 0)
+
+    def test_memory_budget(self):
+        """Test that images in flight are packed within the budget."""
+        queue = WorkQueue(self.paths, memory_budget=1000,
+                          footprint=lambda info: 2 * info.decoded_bytes)
+        large = queue.take()
+        self.assertEqual(large[2], 3200)
+
+        # Nothing fits next to the large image
+        self.assertIsNone(queue.take(3200))
+        # Beside a smaller image, the medium one still does not fit but the small one does
+        self.assertEqual(os.path.basename(queue.take(500)[0]), "small.png")
+        self.assertEqual(os.path.basename(queue.take(0)[0]), "medium.png")
+        self.assertIsNone(queue.take())
+
+        # In input order, inputs are probed as they are taken, so the queue still streams
+        queue = WorkQueue(iter(self.paths), order="input", memory_budget=1000,
+                          footprint=lambda info: 2 * info.decoded_bytes)
+        self.assertFalse(queue.probed)
+        self.assertEqual(queue.take()[2], 200)
+        self.assertEqual(os.path.basename(queue.take(200)[0]), "medium.png")
+
+    def test_admission(self):
+        """Test that a pool only runs what fits the memory budget."""
+        paths = self.paths * 4
+        for budget, expected in ((1, 1), (None, 4)):
+            with CountingExecutor(2) as executor:
+                engine = BatchEngine("negative", None, workers=2, executor=executor,
+                                     memory_budget=budget)
+                results = list(engine.run(paths))
+            self.assertTrue(all(result.success for result in results))
+            self.assertLessEqual(executor.most_outstanding, expected)
+            self.assertGreater(engine.peak_rss, 0)
+
+    def test_chunks(self):
+        """Test that small images are grouped and large ones taken alone."""
+        huge = os.path.join(self.temp_dir, "huge.png")
+        cv2.imwrite(huge, np.zeros((1000, 2000), dtype=np.uint8))
+        queue = WorkQueue([huge] + self.paths * 3)
+
+        self.assertEqual([entry[0] for entry in queue.take_chunk(4)], [huge])
+        self.assertEqual(len(queue.take_chunk(4)), 4)
+        self.assertEqual(len(queue.take_chunk(4)), 4)
+        self.assertEqual(len(queue.take_chunk(4)), 1)
+        self.assertEqual(queue.take_chunk(4), [])
+
+        # In input order without a budget, inputs are still probed, so a large
+        # one or one of unknown size never joins a chunk
+        unknown = os.path.join(self.temp_dir, "unknown.png")
+        queue = WorkQueue(iter(self.paths + [huge, unknown] + self.paths), order="input")
+        self.assertEqual([len(queue.take_chunk(8)) for _ in range(5)], [3, 1, 1, 3, 0])
+
+        # Chunks stop at the memory budget
+        queue = WorkQueue(self.paths * 2, memory_budget=1000,
+                          footprint=lambda info: info.decoded_bytes)
+        sizes = [[info.pixels for _, info, _ in queue.take_chunk(4, in_flight)]
+                 for in_flight in (0, 500, 0, 0)]
+        self.assertEqual(sizes, [[1600], [400], [1600], [400, 100, 100]])
+
+    def test_chunk_sizer(self):
+        """Test that chunks are sized to the measured time per image."""
+        sizer = ChunkSizer()
+        self.assertEqual(sizer.size, ChunkSizer.INITIAL_SIZE)
+        sizer.record(0.004, 4)
+        self.assertEqual(sizer.size, int(ChunkSizer.TARGET_SECONDS / 0.001))
+        for _ in range(50):
+            sizer.record(1.0, 1)
+        self.assertEqual(sizer.size, 1)
+        sizer.record(0.0, 0)
+        self.assertEqual(sizer.size, 1)
+
+    def test_chunked_run(self):
+        """Test that chunked and unchunked pool runs give the same results."""
+        paths = self.paths * 5
+        outputs = []
+        for chunking in (True, False):
+            with CountingExecutor(2) as executor:
+                engine = BatchEngine("negative", None, workers=2, executor=executor,
+                                     resize=None, chunking=chunking)
+                results = list(engine.run(paths))
+            self.assertEqual(len(results), len(paths))
+            self.assertTrue(all(result.success for result in results))
+            self.assertEqual(engine.progress, 1.0)
+            outputs.append(sorted(result.output_data for result in results))
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_progress(self):
+        """Test that progress is weighted by pixel count."""
+        engine = BatchEngine("negative", None, resize=None)
+        progress = []
+        for result in engine.run(self.paths):
+            self.assertTrue(result.success, result.error)
+            progress.append((os.path.basename(result.input_path), result.pixels, engine.progress))
+
+        self.assertEqual(progress, [("large.png", 1600, 1600 / 2100),
+                                    ("medium.png", 400, 2000 / 2100),
+                                    ("small.png", 100, 1.0)])
+
+        engine = BatchEngine("negative", None, order="input")
+        list(engine.run(iter(self.paths)))
+        self.assertIsNone(engine.progress)
+
+if __name__ == "__main__":
+    unittest.main()
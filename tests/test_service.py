@@ -0,0 +1,189 @@
+"""
+Unit tests for the batch service.
+
+This module tests job submission, event streaming and in-memory images
+through the HTTP API of the service.
+"""
+
+import os
+import json
+import base64
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import http.client
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.service import jobs as jobs_module
+from src.service.jobs import JobQueue
+from src.service.server import create_server
+from src.utils.image_io import ImageIO
+
+class TestService(PixelCraftTestCase):
+    """Test cases for the service HTTP API."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start one service for all tests."""
+        cls.jobs = JobQueue(1)
+        cls.server = create_server(cls.jobs, port=0)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the service."""
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.jobs.shutdown()
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.work_dir = tempfile.mkdtemp(prefix="pixelcraft-test-")
+        self.image = np.random.default_rng(3).integers(0, 256, (40, 50), dtype=np.uint8)
+        self.path = os.path.join(self.work_dir, "input.png")
+        cv2.imwrite(self.path, self.image)
+        # Batch processing works on images resized to the default size
+        self.expected = 255 - cv2.resize(self.image, (450, 450))
+
+    def tearDown(self):
+        """Clean up after each test."""
+        super().tearDown()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def request(self, method, path, body=None):
+        """Send a request and return the status and raw response body."""
+        connection = http.client.HTTPConnection(*self.server.server_address[:2], timeout=30)
+        try:
+            connection.request(method, path, json.dumps(body) if body is not None else None)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def stream_job(self, spec):
+        """Submit a job, stream its events and return them."""
+        status, body = self.request("POST", "/jobs?stream=1", spec)
+        self.assertEqual(status, 200)
+        return [json.loads(line) for line in body.decode("utf-8").splitlines()]
+
+    def test_health(self):
+        """Test the health endpoint."""
+        status, body = self.request("GET", "/health")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["status"], "ok")
+
+    def test_path_job(self):
+        """Test a job reading and writing files."""
+        output_dir = os.path.join(self.work_dir, "output")
+        events = self.stream_job({"filter": "negative", "inputs": [self.path],
+                                  "output_dir": output_dir})
+
+        self.assertEqual([event["event"] for event in events], ["started", "result", "finished"])
+        self.assertIsNone(events[1]["error"])
+        np.testing.assert_array_equal(cv2.imread(events[1]["output"], 0), self.expected)
+        self.assertEqual(events[-1]["status"], "finished")
+
+        status, body = self.request("GET", f"/jobs/{events[0]['id']}")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["done"], 1)
+
+    def test_in_memory_job(self):
+        """Test a job sending and receiving images in the request."""
+        data = base64.b64encode(ImageIO.encode_image(self.image)).decode("ascii")
+        events = self.stream_job({"filter": "negative",
+                                  "images": [{"name": "input.png", "data": data}]})
+
+        result = events[1]
+        self.assertIsNone(result["output"])
+        output = ImageIO.decode_image(base64.b64decode(result["data"]), resize=None)
+        np.testing.assert_array_equal(output, self.expected)
+
+        # Once delivered, neither the inputs nor the image are kept
+        job = self.jobs.get(events[0]["id"])
+        self.assertEqual((job.inputs, job.data_bytes), ([], 0))
+        status, body = self.request("GET", f"/jobs/{job.id}/events")
+        self.assertEqual(status, 200)
+        self.assertNotIn("data", json.loads(body.decode("utf-8").splitlines()[1]))
+
+    def test_finished_jobs_bounded_by_bytes(self):
+        """Test that finished jobs holding undelivered images are forgotten."""
+        data = base64.b64encode(ImageIO.encode_image(self.image)).decode("ascii")
+        status, body = self.request("POST", "/jobs", {"filter": "negative",
+                                                      "images": [{"name": "a.png", "data": data}]})
+        self.assertEqual(status, 202)
+        job = self.jobs.get(json.loads(body)["id"])
+        deadline = time.monotonic() + 30
+        while not job.is_complete and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertGreater(job.data_bytes, 0)
+
+        with mock.patch.object(jobs_module, "MAX_FINISHED_BYTES", 0), self.jobs._lock:
+            self.jobs._forget_finished_jobs()
+        self.assertIsNone(self.jobs.get(job.id))
+
+    def test_failed_image(self):
+        """Test that a missing input fails its image, not the job."""
+        events = self.stream_job({"filter": "negative",
+                                  "inputs": [os.path.join(self.work_dir, "missing.png")],
+                                  "output_dir": self.work_dir})
+
+        self.assertIsNotNone(events[1]["error"])
+        self.assertEqual(events[-1]["failed"], 1)
+
+    def test_invalid_job(self):
+        """Test that invalid jobs are rejected."""
+        status, _ = self.request("POST", "/jobs", {"filter": "unknown", "inputs": [self.path]})
+        self.assertEqual(status, 400)
+
+        status, _ = self.request("POST", "/jobs", {"filter": "negative"})
+        self.assertEqual(status, 400)
+
+        status, _ = self.request("POST", "/jobs", {"filter": 7, "inputs": [self.path]})
+        self.assertEqual(status, 400)
+
+        # Malformed inputs, images, params and sensitivities
+        data = base64.b64encode(ImageIO.encode_image(self.image)).decode("ascii")
+        for spec in ({"inputs": self.path}, {"inputs": [7]},
+                     {"images": ["input.png"]}, {"images": [{"name": "a.png", "data": "%%%"}]},
+                     {"inputs": [self.path], "params": [5]},
+                     {"inputs": [self.path], "params": {"unknown": 1}},
+                     {"images": [{"name": "a.png", "data": data}], "sensitivity": 0},
+                     {"inputs": [self.path], "sensitivity": "16"}):
+            status, body = self.request("POST", "/jobs", dict(spec, filter="negative"))
+            self.assertEqual(status, 400, (spec, body))
+
+        # Output names may not leave the output directory
+        for template in ("../{name}", "/tmp/{name}", "sub/../../{name}", "{missing}", 7):
+            status, body = self.request("POST", "/jobs", {"filter": "negative",
+                                                          "inputs": [self.path],
+                                                          "output_dir": self.work_dir,
+                                                          "name_template": template})
+            self.assertEqual(status, 400, body)
+
+        status, _ = self.request("GET", "/jobs/unknown")
+        self.assertEqual(status, 404)
+
+    def test_content_length(self):
+        """Test that a missing, negative or malformed body length is rejected."""
+        for length, expected in ((None, 411), ("-1", 400), ("abc", 400), ("1e3", 400),
+                                 (str(2 ** 40), 413)):
+            connection = http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+            try:
+                connection.putrequest("POST", "/jobs")
+                if length is not None:
+                    connection.putheader("Content-Length", length)
+                connection.endheaders()
+                self.assertEqual(connection.getresponse().status, expected, length)
+            finally:
+                connection.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Unit tests for the similarity module.
+
+This module tests the similarity percentage calculation and its agreement
+with the original pixel-by-pixel definition.
+"""
+
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase, create_test_image
+from src.core.similarity import (calculate_similarity, similarity_band,
+                                 similarity_from_difference)
+
+def reference_similarity(new_image, original_image, sensitivity):
+    """Pixel-by-pixel similarity, as originally defined."""
+    range1 = round(255/(int(sensitivity)))
+    counter = 0
+    for newp, originalp in zip(new_image.ravel().tolist(), original_image.ravel().tolist()):
+        if originalp + range1 >= newp and originalp - range1 <= newp:
+            counter += 1
+    return round(counter * 100 / new_image.size)
+
+class TestSimilarity(PixelCraftTestCase):
+    """Test cases for calculate_similarity."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        rng = np.random.default_rng(0)
+        self.original = rng.integers(0, 256, (64, 80), dtype=np.uint8)
+        noise = rng.integers(-40, 41, (64, 80))
+        self.processed = np.clip(self.original.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+    def test_identical_images(self):
+        """Test that identical images are fully similar."""
+        image = create_test_image(50, 50, 77)
+        for sensitivity in [1, 16, 255]:
+            self.assertEqual(calculate_similarity(image, image.copy(), sensitivity), 100)
+
+    def test_inverted_images(self):
+        """Test that a black image and its negative match only with the widest band."""
+        image = create_test_image(50, 50, 0)
+        self.assertEqual(calculate_similarity(255 - image, image, 255), 0)
+        self.assertEqual(calculate_similarity(255 - image, image, 1), 100)
+
+    def test_matches_reference(self):
+        """Test agreement with the pixel-by-pixel definition."""
+        for sensitivity in [1, 2, 4, 16, 32, 64, 128, 255]:
+            self.assertEqual(
+                calculate_similarity(self.processed, self.original, sensitivity),
+                reference_similarity(self.processed, self.original, sensitivity),
+                f"Mismatch at sensitivity {sensitivity}"
+            )
+
+    def test_precomputed_difference(self):
+        """Test that a precomputed difference gives the same result."""
+        difference = cv2.absdiff(self.original, self.processed)
+        for sensitivity in [4, 16, 64]:
+            self.assertEqual(
+                calculate_similarity(self.processed, self.original, sensitivity, difference=difference),
+                calculate_similarity(self.processed, self.original, sensitivity)
+            )
+            self.assertEqual(
+                similarity_from_difference(difference, sensitivity),
+                calculate_similarity(self.processed, self.original, sensitivity)
+            )
+
+    def test_similarity_band(self):
+        """Test the band derived from the sensitivity."""
+        self.assertEqual(similarity_band(1), 255)
+        self.assertEqual(similarity_band(16), 16)
+        self.assertEqual(similarity_band(255), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Startup tests for PixelCraft.
+
+This module checks which modules the command line entry points import and
+how long the interpreter takes to start them. Each check runs in a fresh
+interpreter so modules loaded by other tests do not interfere.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules too heavy to load when they are not needed
+HEAVY_MODULES = ("cv2", "numpy", "PyQt5")
+
+# Report the heavy modules loaded by the code in PROBE
+PROBE = """
+import sys
+sys.argv = {argv!r}
+import main
+try:
+    main.main()
+except SystemExit:
+    pass
+print("loaded:" + ",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+def run_python(code):
+    """Run code in a fresh interpreter and return the modules it reports as loaded."""
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    report = result.stdout.splitlines()[-1]
+    return set(filter(None, report[len("loaded:"):].split(",")))
+
+class TestStartup(PixelCraftTestCase):
+    """Test cases for command line startup."""
+
+    def loaded_modules(self, argv):
+        """Get the heavy modules loaded by running main with ``argv``."""
+        return run_python(PROBE.format(argv=["main.py"] + argv, heavy=HEAVY_MODULES))
+
+    def test_help_is_light(self):
+        """Test that --help loads no heavy modules."""
+        self.assertEqual(self.loaded_modules(["--help"]), set())
+
+    def test_packages_import_lazily(self):
+        """Test that importing the packages does not load their submodules."""
+        loaded = run_python(
+            "import sys, src.core, src.utils, src.gui, src.batch\n"
+            f"print('loaded:' + ','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+        )
+        self.assertEqual(loaded, set())
+
+    def test_batch_mode_never_imports_pyqt(self):
+        """Test that a batch run does not load PyQt5."""
+        work_dir = tempfile.mkdtemp(prefix="pixelcraft-test-")
+        try:
+            image_path = os.path.join(work_dir, "image.png")
+            cv2.imwrite(image_path, np.zeros((20, 20), dtype=np.uint8))
+            loaded = self.loaded_modules([
+                "--batch", "--filter", "negative", "--image", image_path,
+                "--output", os.path.join(work_dir, "output"),
+                "--report", os.path.join(work_dir, "report.json"),
+                "--stats", os.path.join(work_dir, "stats.json"),
+            ])
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self.assertIn("cv2", loaded)
+        self.assertNotIn("PyQt5", loaded)
+
+    def test_help_startup_time(self):
+        """Test that --help starts within a small margin of a bare interpreter."""
+        def best_of(command, runs=3):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(command, cwd=ROOT_DIR, capture_output=True, timeout=120)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        bare = best_of([sys.executable, "-c", "pass"])
+        help_time = best_of([sys.executable, "main.py", "--help"])
+
+        self.assertLess(help_time - bare, 0.5,
+                        f"--help took {help_time:.3f}s, a bare interpreter {bare:.3f}s")
+
+if __name__ == "__main__":
+    unittest.main()
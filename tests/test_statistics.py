@@ -0,0 +1,64 @@
+"""
+Unit tests for the image statistics module.
+
+This module tests histogram-derived statistics against direct NumPy
+computation and the per-image statistics cache.
+"""
+
+import gc
+import unittest
+import numpy as np
+
+from tests import PixelCraftTestCase, create_test_image
+from src.core import statistics
+from src.core.statistics import ImageStatistics, get_statistics
+
+class TestImageStatistics(PixelCraftTestCase):
+    """Test cases for ImageStatistics and get_statistics."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        rng = np.random.default_rng(3)
+        self.image = rng.integers(10, 200, (60, 90), dtype=np.uint8)
+
+    def test_statistics_match_numpy(self):
+        """Test the summary statistics against NumPy."""
+        stats = ImageStatistics.from_image(self.image)
+
+        self.assertEqual(stats.count, self.image.size)
+        self.assertEqual(stats.minimum, int(self.image.min()))
+        self.assertEqual(stats.maximum, int(self.image.max()))
+        self.assertAlmostEqual(stats.mean, float(self.image.mean()), places=6)
+        self.assertAlmostEqual(stats.std, float(self.image.std()), places=6)
+        np.testing.assert_array_equal(stats.histogram,
+                                      np.bincount(self.image.ravel(), minlength=256))
+
+    def test_entropy(self):
+        """Test entropy of uniform and two-level images."""
+        self.assertEqual(ImageStatistics.from_image(create_test_image(10, 10, 50)).entropy, 0.0)
+
+        two_level = create_test_image(10, 10, 0)
+        two_level[:5] = 255
+        self.assertAlmostEqual(ImageStatistics.from_image(two_level).entropy, 1.0)
+
+    def test_as_dict(self):
+        """Test the dictionary form used in batch reports."""
+        summary = ImageStatistics.from_image(create_test_image(4, 4, 9)).as_dict()
+        self.assertEqual(summary, {"count": 16, "min": 9, "max": 9, "mean": 9.0,
+                                   "std": 0.0, "entropy": 0.0})
+
+    def test_cache(self):
+        """Test that statistics are computed once per image and released with it."""
+        first = get_statistics(self.image)
+        self.assertIs(get_statistics(self.image), first)
+        self.assertIsNot(get_statistics(self.image.copy()), first)
+
+        key = id(self.image)
+        self.assertIn(key, statistics._cache)
+        del self.image
+        gc.collect()
+        self.assertNotIn(key, statistics._cache)
+
+if __name__ == "__main__":
+    unittest.main()
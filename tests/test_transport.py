@@ -0,0 +1,74 @@
+"""
+Unit tests for the shared memory transport.
+
+This module tests the shared memory ring and passing in-memory images to
+and from worker processes through it.
+"""
+
+import os
+import unittest
+import numpy as np
+
+from tests import PixelCraftTestCase
+from src.batch.engine import BatchEngine, InMemoryImage
+from src.batch.transport import MIN_SLOT_BYTES, SharedMemoryRing
+from src.utils.image_io import ImageIO
+
+SHM_DIR = "/dev/shm"
+
+class TestSharedMemoryTransport(PixelCraftTestCase):
+    """Test cases for shared memory slots."""
+
+    def test_ring(self):
+        """Test that slots carry data and are recycled in ring order."""
+        ring = SharedMemoryRing(2)
+        try:
+            first = ring.put("a.png", b"abc")
+            second = ring.put("b.png", bytearray(b"defg"))
+            self.assertIsNone(ring.put("c.png", b"h"))
+            self.assertEqual(ring.available, 0)
+            self.assertEqual((first.name, first.size), ("a.png", 3))
+            self.assertEqual(ring.read(second, 4), b"defg")
+
+            ring.release(first)
+            third = ring.put("c.png", b"xyz")
+            self.assertEqual((third.index, third.segment), (first.index, first.segment))
+            self.assertEqual(ring.read(third, 3), b"xyz")
+
+            # A slot grows to fit a bigger image
+            ring.release(third)
+            big = ring.put("big.png", bytes(MIN_SLOT_BYTES + 1))
+            self.assertNotEqual(big.segment, first.segment)
+            self.assertEqual(ring.read(big, 5), bytes(5))
+        finally:
+            ring.close()
+
+    @unittest.skipUnless(os.path.isdir(SHM_DIR), "needs /dev/shm")
+    def test_pool_in_memory(self):
+        """Test in-memory images processed on workers through shared memory."""
+        rng = np.random.default_rng(5)
+        images = [rng.integers(0, 256, (30, 40), dtype=np.uint8) for _ in range(6)]
+        inputs = [InMemoryImage(f"{index}.png", ImageIO.encode_image(image))
+                  for index, image in enumerate(images)]
+
+        before = set(os.listdir(SHM_DIR))
+        # Small images would otherwise be pickled in chunks
+        engine = BatchEngine("negative", None, workers=2, resize=None, chunking=False)
+        results = {result.input_path: result for result in engine.run(inputs)}
+        self.assertEqual(set(os.listdir(SHM_DIR)) - before, set())
+
+        for index, image in enumerate(images):
+            result = results[f"{index}.png"]
+            self.assertTrue(result.success, result.error)
+            self.assertIsNone(result.shared_output)
+            np.testing.assert_array_equal(ImageIO.decode_image(result.output_data, resize=None),
+                                          255 - image)
+
+        # Failed images still return their slot
+        engine = BatchEngine("negative", None, workers=2, chunking=False)
+        results = list(engine.run([InMemoryImage("bad.png", b"not an image")] + inputs[:3]))
+        self.assertEqual(sum(not result.success for result in results), 1)
+        self.assertEqual(set(os.listdir(SHM_DIR)) - before, set())
+
+if __name__ == "__main__":
+    unittest.main()
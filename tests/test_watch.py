@@ -0,0 +1,101 @@
+"""
+Unit tests for watch-folder support.
+
+This module tests reporting new and changed images once they are
+completely written, and forgetting deleted ones, with inotify and by
+polling.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import numpy as np
+import cv2
+
+from tests import PixelCraftTestCase
+from src.batch.watch import FolderWatcher, is_stale
+from src.utils.image_io import ImageIO
+
+class TestFolderWatcher(PixelCraftTestCase):
+    """Test cases for watching folders."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.data = ImageIO.encode_image(np.full((16, 16), 80, dtype=np.uint8))
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.temp_dir)
+        super().tearDown()
+
+    def check_watcher(self, watcher):
+        """Check reporting through a watcher."""
+        path = os.path.join(self.temp_dir, "new.png")
+        start = time.monotonic()
+        # A partially written file is not reported until it settles
+        with open(path, "wb") as f:
+            f.write(self.data[:10])
+            f.flush()
+            self.assertEqual(watcher.wait(timeout=0.05), [])
+            f.write(self.data[10:])
+        self.assertEqual(watcher.wait(timeout=2), [path])
+        self.assertLess(time.monotonic() - start, 1)
+
+        # Other files are ignored, unchanged images are not reported again
+        with open(os.path.join(self.temp_dir, "notes.txt"), "w") as f:
+            f.write("x")
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns))
+        self.assertEqual(watcher.wait(timeout=0.3), [])
+
+        # Replacing an image reports it again
+        with open(path, "wb") as f:
+            f.write(self.data + b"\0")
+        self.assertEqual(watcher.wait(timeout=2), [path])
+
+        # A deleted image is forgotten
+        os.remove(path)
+        self.assertEqual(watcher.wait(timeout=0.3), [])
+        self.assertEqual(watcher._reported, {})
+
+        # An image listed after the watcher started is not reported twice
+        listed = os.path.join(self.temp_dir, "listed.png")
+        with open(listed, "wb") as f:
+            f.write(self.data)
+        watcher.mark_reported(os.path.relpath(listed))
+        self.assertEqual(watcher.wait(timeout=0.3), [])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "needs inotify")
+    def test_inotify(self):
+        """Test reporting through inotify."""
+        with FolderWatcher([self.temp_dir], settle=0.1, inotify=True) as watcher:
+            self.assertTrue(watcher.uses_inotify)
+            self.check_watcher(watcher)
+
+    def test_polling(self):
+        """Test reporting by polling."""
+        with FolderWatcher([self.temp_dir], settle=0.1, poll_interval=0.05,
+                           inotify=False) as watcher:
+            self.assertFalse(watcher.uses_inotify)
+            self.check_watcher(watcher)
+
+    def test_is_stale(self):
+        """Test that only images without an up to date output are stale."""
+        input_path = os.path.join(self.temp_dir, "input.png")
+        output_path = os.path.join(self.temp_dir, "output.png")
+        cv2.imwrite(input_path, np.zeros((4, 4), dtype=np.uint8))
+        self.assertTrue(is_stale(input_path, output_path))
+
+        cv2.imwrite(output_path, np.zeros((4, 4), dtype=np.uint8))
+        os.utime(input_path, (1, 1))
+        self.assertFalse(is_stale(input_path, output_path))
+        os.utime(input_path)
+        os.utime(output_path, (1, 1))
+        self.assertTrue(is_stale(input_path, output_path))
+
+if __name__ == "__main__":
+    unittest.main()